@@ -0,0 +1,29 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Job
+from api.utils.scoring import EMBEDDING_BATCH_SIZE, backfill_scores, pending_applicants
+
+
+class Command(BaseCommand):
+    help = "Encode and score applicants that have no relevance yet (e.g. after a bulk import)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--job", dest="job_u_id", help="Only backfill this job's applicants.")
+        parser.add_argument("--chunk-size", type=int, default=EMBEDDING_BATCH_SIZE,
+                            help="Applicants encoded and bulk-updated per chunk.")
+        parser.add_argument("--limit", type=int, default=None, help="Stop after about this many applicants.")
+
+    def handle(self, *args, **options):
+        job = None
+        if options["job_u_id"]:
+            job = Job.objects.filter(u_id=options["job_u_id"]).first()
+            if not job:
+                raise CommandError(f"Job {options['job_u_id']} not found")
+
+        started = time.perf_counter()
+        scored = backfill_scores(job, chunk_size=options["chunk_size"], limit=options["limit"])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Scored {scored} applicants, {pending_applicants(job).count()} still pending ({elapsed:.2f}s)"
+        ))
@@ -0,0 +1,69 @@
+import glob, os, re, time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.utils.resume_parser import extract_entities, extract_resume_text
+
+LEGACY_SKILLS = [
+    "Python", "Java", "JavaScript", "React", "Node.js",
+    "SQL", "Machine Learning", "Docker", "Django", "Flask",
+    "AWS", "C++", "TensorFlow", "Keras", "Pandas",
+]
+
+
+def legacy_extract_entities(text):
+    """The previous per-call-regex implementation, kept as the benchmark baseline."""
+    parsed = {"text": text or ""}
+    email_match = re.search(r'[\w\.-]+@[\w\.-]+', text)
+    parsed["email"] = email_match.group(0) if email_match else ""
+    phone_match = re.search(r'\+?\d[\d\s\-]{8,15}\d', text)
+    parsed["phone"] = phone_match.group(0) if phone_match else ""
+    if parsed["email"]:
+        parsed["name"] = " ".join(text.split(parsed["email"])[0].strip().split()[:4]) or "Unknown"
+    else:
+        parsed["name"] = " ".join(text.split()[:4]) if text else "Unknown"
+    parsed["college"] = re.findall(r'([A-Z][a-zA-Z &]{2,}(?:University|College|Institute|Academy))', text)
+    parsed["skills"] = [s for s in LEGACY_SKILLS if re.search(rf'\b{re.escape(s)}\b', text, re.I)]
+    projects = []
+    for proj in re.findall(r'(?:Projects?|Portfolio|Work Done)(?:\:|\s)(.*?)(?=(?:Experience|Skills|Education|$))',
+                           text, flags=re.I | re.DOTALL):
+        projects.extend(p.strip() for p in re.split(r'•|-|·|\n|\|', proj) if p.strip())
+    parsed["projects"] = projects
+    experiences = []
+    for exp in re.findall(r'(?:Experience|Professional Experience|Work History)(?:\:|\s)(.*?)(?=(?:Projects|Skills|Education|$))',
+                          text, flags=re.I | re.DOTALL):
+        experiences.extend(e.strip() for e in re.split(r'•|-|·|\n', exp) if e.strip())
+    parsed["professional_experiences"] = experiences
+    return parsed
+
+
+class Command(BaseCommand):
+    help = "Benchmark resume_parser.extract_entities (per-resume microseconds) on the sample resumes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", default=str(settings.BASE_DIR.parent / "sample_resume"),
+                            help="Folder of PDF resumes.")
+        parser.add_argument("--repeat", type=int, default=200, help="Extraction passes over every resume.")
+
+    def _time(self, fn, texts, repeat):
+        fn(texts[0])  # warm up (skill matcher compilation, regex cache)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for text in texts:
+                fn(text)
+        return (time.perf_counter() - started) / (repeat * len(texts)) * 1e6
+
+    def handle(self, *args, **options):
+        paths = sorted(glob.glob(os.path.join(options["dir"], "*.pdf")))
+        if not paths:
+            raise CommandError(f"No PDFs found in {options['dir']}")
+        texts = [extract_resume_text(path) for path in paths]
+        words = sum(len(t.split()) for t in texts) // len(texts)
+        self.stdout.write(f"{len(texts)} resumes, {words} words on average, {options['repeat']} passes")
+
+        legacy = self._time(legacy_extract_entities, texts, options["repeat"])
+        compiled = self._time(extract_entities, texts, options["repeat"])
+        self.stdout.write(f"legacy extract_entities:   {legacy:9.1f} µs/resume")
+        self.stdout.write(f"compiled extract_entities: {compiled:9.1f} µs/resume ({legacy / compiled:.1f}x)")
+        for path, text in zip(paths, texts):
+            self.stdout.write(f"  {os.path.basename(path)}: skills {extract_entities(text)['skills']}")
@@ -0,0 +1,55 @@
+import json, subprocess, sys
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter so already-imported modules don't skew the timing.
+PROBE = """
+import json, os, time
+started = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter() - started
+modules = {}
+for name in %(modules)r:
+    t = time.perf_counter()
+    __import__(name)
+    modules[name] = time.perf_counter() - t
+from api.utils.model_registry import registry
+print(json.dumps({"setup": setup, "modules": modules, "total": time.perf_counter() - started,
+                  "loaded": registry.loaded()}))
+"""
+
+DEFAULT_MODULES = ["api.urls", "api.views", "api.utils.ingestion"]
+
+
+class Command(BaseCommand):
+    help = "Measure cold import time of the API modules and fail if models load at import."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--module", action="append", dest="modules", help="Module to import (repeatable).")
+        parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters to average over.")
+        parser.add_argument("--max-seconds", type=float, default=None,
+                            help="Fail if the average total import time exceeds this.")
+
+    def handle(self, *args, **options):
+        modules = options["modules"] or DEFAULT_MODULES
+        runs = []
+        for _ in range(options["repeat"]):
+            proc = subprocess.run([sys.executable, "-c", PROBE % {"modules": modules}],
+                                  capture_output=True, text=True)
+            if proc.returncode:
+                raise CommandError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "import failed")
+            runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+        average = lambda values: sum(values) / len(values)
+        self.stdout.write(f"django.setup(): {average([r['setup'] for r in runs]):.3f}s")
+        for name in modules:
+            self.stdout.write(f"import {name}: {average([r['modules'][name] for r in runs]):.3f}s")
+        total = average([r["total"] for r in runs])
+        self.stdout.write(f"total: {total:.3f}s over {len(runs)} runs")
+
+        loaded = sorted({name for r in runs for name in r["loaded"]})
+        if loaded:
+            raise CommandError(f"Models loaded at import time: {', '.join(loaded)}")
+        if options["max_seconds"] is not None and total > options["max_seconds"]:
+            raise CommandError(f"Import took {total:.3f}s (limit {options['max_seconds']}s)")
+        self.stdout.write(self.style.SUCCESS("No models loaded at import"))
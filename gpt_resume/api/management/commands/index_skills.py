@@ -0,0 +1,26 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Applicant, Job
+from api.utils.skill_index import reindex_skills
+
+
+class Command(BaseCommand):
+    help = "Rebuild the ApplicantSkill index from stored resume text and tech stacks (e.g. after editing SKILL_TAXONOMY)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--job", dest="job_u_id", help="Only reindex this job's applicants.")
+        parser.add_argument("--chunk-size", type=int, default=500, help="Applicants indexed per bulk write.")
+
+    def handle(self, *args, **options):
+        queryset = Applicant.objects.all()
+        if options["job_u_id"]:
+            job = Job.objects.filter(u_id=options["job_u_id"]).first()
+            if not job:
+                raise CommandError(f"Job {options['job_u_id']} not found")
+            queryset = queryset.filter(job_applied=job)
+
+        started = time.perf_counter()
+        indexed = reindex_skills(queryset, chunk_size=options["chunk_size"])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Indexed skills of {indexed} applicants ({elapsed:.2f}s)"))
@@ -0,0 +1,118 @@
+import random, threading, time
+from collections import Counter
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from api.models import Applicant, IngestionBatch, IngestionItem, Job
+from api.utils.ingestion import _finish, claim_items
+from api.utils.resume_dispatcher import ApplicantHandler
+
+SYNTHETIC_TEXT = "Jane Doe\njane@example.com\nSoftware engineer with Python, Django and PostgreSQL experience.\n" * 20
+SYNTHETIC_PARSED = {
+    "profile": {"name": "Jane Doe", "email": "jane@example.com"},
+    "relevance": 70,
+    "explanation": "Synthetic load-test resume.",
+    "college": {"name": "State University", "branch": "CS", "degree": "BSc",
+                "start_date": "2015-09-01", "end_date": "2019-06-01"},
+    "projects": [{"title": f"Project {i}", "description": "Built things.", "tech_stack": ["Python"],
+                  "relevance": 5} for i in range(3)],
+    "professional_experiences": [{"role": "Engineer", "organization": f"Company {i}", "description": "Shipped things.",
+                                  "tech_stack": ["Django"], "relevance": 6} for i in range(2)],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the database side of ingestion (claim, applicant + children inserts, score update, finish) "
+        "with concurrent workers against the configured backend. No files, models or OpenAI calls are involved."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=8, help="Concurrent worker threads.")
+        parser.add_argument("--resumes", type=int, default=400, help="Synthetic queue items to ingest.")
+        parser.add_argument("--claim-size", type=int, default=8, help="Items claimed per worker iteration.")
+        parser.add_argument("--max-claim-errors", type=int, default=5,
+                            help="Consecutive failed claims after which a worker gives up.")
+        parser.add_argument("--keep", action="store_true", help="Keep the synthetic job and applicants afterwards.")
+
+    def _worker(self, batch_id, claim_size, max_claim_errors, latencies, errors, stopped, lock):
+        close_old_connections()
+        failed_claims = 0
+        try:
+            while True:
+                try:
+                    items = claim_items(claim_size, batch_id=batch_id)
+                    failed_claims = 0
+                except Exception as e:
+                    failed_claims += 1
+                    with lock:
+                        errors["claim " + e.__class__.__name__ + ": " + str(e)[:60]] += 1
+                        if failed_claims >= max_claim_errors:
+                            stopped.append(threading.current_thread().name)
+                    if failed_claims >= max_claim_errors:
+                        return
+                    # Back off instead of hammering the database being measured
+                    time.sleep(min(2.0, 0.05 * 2 ** failed_claims))
+                    continue
+                if not items:
+                    return
+                for item in items:
+                    started = time.perf_counter()
+                    try:
+                        item.applicant = Applicant.objects.create(job_applied=item.batch.job, resume=item.resume.name)
+                        ApplicantHandler(item.applicant, text=SYNTHETIC_TEXT).apply_parsed(dict(SYNTHETIC_PARSED))
+                        Applicant.objects.filter(pk=item.applicant.pk).update(
+                            relevance=random.randint(0, 100), embedding_stored=True,
+                        )
+                        _finish(item, IngestionItem.DONE)
+                    except Exception as e:
+                        with lock:
+                            errors[e.__class__.__name__ + ": " + str(e)[:60]] += 1
+                        continue
+                    with lock:
+                        latencies.append(time.perf_counter() - started)
+        finally:
+            connection.close()
+
+    def handle(self, *args, **options):
+        job = Job.objects.create(job_title="Load test", job_description="Synthetic load-test job")
+        batch = IngestionBatch.objects.create(job=job)
+        items = [IngestionItem(batch=batch, filename=f"loadtest-{i}.pdf") for i in range(options["resumes"])]
+        for i, item in enumerate(items):
+            item.resume.name = f"resumes/loadtest-{i}.pdf"
+        IngestionItem.objects.bulk_create(items)
+
+        latencies, errors, stopped, lock = [], Counter(), [], threading.Lock()
+        threads = [
+            threading.Thread(target=self._worker, args=(
+                batch.u_id, options["claim_size"], options["max_claim_errors"], latencies, errors, stopped, lock,
+            ))
+            for _ in range(options["workers"])
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        percentile = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else 0
+        self.stdout.write(
+            f"{connection.vendor}: {len(latencies)}/{options['resumes']} resumes with {options['workers']} workers "
+            f"in {elapsed:.2f}s ({len(latencies) / elapsed:.1f}/s), "
+            f"p50 {percentile(0.5):.1f} ms, p95 {percentile(0.95):.1f} ms"
+        )
+        for message, count in errors.most_common():
+            self.stdout.write(self.style.ERROR(f"{count} x {message}"))
+        if stopped:
+            self.stdout.write(self.style.ERROR(
+                f"{len(stopped)} workers gave up after {options['max_claim_errors']} consecutive failed claims"
+            ))
+
+        if not options["keep"]:
+            job.delete()
+        if errors:
+            self.stdout.write(self.style.WARNING(f"{sum(errors.values())} errors"))
+        else:
+            self.stdout.write(self.style.SUCCESS("No errors"))
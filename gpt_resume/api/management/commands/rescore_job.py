@@ -0,0 +1,28 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Job
+from api.utils.scoring import RESCORE_CHUNK_SIZE, rescore_job
+
+
+class Command(BaseCommand):
+    help = "Recompute relevance for every applicant of a job from the stored embeddings."
+
+    def add_arguments(self, parser):
+        parser.add_argument("job_u_id", help="u_id of the Job to rescore.")
+        parser.add_argument("--chunk-size", type=int, default=RESCORE_CHUNK_SIZE, help="Rows per bulk UPDATE statement.")
+        parser.add_argument("--reencode", action="store_true",
+                            help="Also encode applicants with no vector for the current embedding model.")
+
+    def handle(self, *args, **options):
+        job = Job.objects.filter(u_id=options["job_u_id"]).first()
+        if not job:
+            raise CommandError(f"Job {options['job_u_id']} not found")
+
+        started = time.perf_counter()
+        result = rescore_job(job, chunk_size=options["chunk_size"], reencode=options["reencode"])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Rescored {result['rescored']} applicants, re-encoded {result['reencoded']}, "
+            f"{result['stale']} without a current vector ({elapsed:.2f}s)"
+        ))
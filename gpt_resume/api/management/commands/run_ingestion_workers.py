@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from api.utils.ingestion import IngestionWorkerPool, INGESTION_CLAIM_SIZE, INGESTION_WORKERS, drain_once
+from api.utils.metrics import serve_metrics
+from api.utils.pdf_extraction import get_extraction_pool
+
+
+class Command(BaseCommand):
+    help = "Run a pool of resume ingestion workers that drain the upload queue."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=INGESTION_WORKERS, help="Number of worker threads.")
+        parser.add_argument("--claim-size", type=int, default=INGESTION_CLAIM_SIZE,
+                            help="Items claimed (and batch-scored) per worker iteration.")
+        parser.add_argument("--once", action="store_true", help="Drain the queue once and exit.")
+        parser.add_argument("--metrics-port", type=int, default=None,
+                            help="Serve Prometheus metrics on this port (not needed when the web "
+                                 "process shares PROMETHEUS_MULTIPROC_DIR with these workers).")
+
+    def handle(self, *args, **options):
+        if options["metrics_port"]:
+            serve_metrics(options["metrics_port"])
+        get_extraction_pool().warm_up()
+        if options["once"]:
+            total = 0
+            while True:
+                handled = drain_once(options["claim_size"])
+                if not handled:
+                    break
+                total += handled
+            self.stdout.write(self.style.SUCCESS(f"Processed {total} queued resumes"))
+            return
+
+        pool = IngestionWorkerPool(workers=options["workers"], claim_size=options["claim_size"])
+        pool.start()
+        self.stdout.write(f"Started {options['workers']} ingestion workers (Ctrl+C to stop)")
+        try:
+            pool.join()
+        except KeyboardInterrupt:
+            pool.stop()
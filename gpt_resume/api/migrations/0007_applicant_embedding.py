@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_college_explanation_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='applicant',
+            name='embedding',
+            field=models.BinaryField(blank=True, null=True, verbose_name='Resume Embedding (float32)'),
+        ),
+        migrations.AddField(
+            model_name='applicant',
+            name='embedding_dim',
+            field=models.PositiveIntegerField(default=0, verbose_name='Embedding Dimension'),
+        ),
+        migrations.AddField(
+            model_name='applicant',
+            name='embedding_model',
+            field=models.CharField(blank=True, max_length=128, verbose_name='Embedding Model'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:15
+
+import hashlib
+import re
+
+from django.db import migrations, models
+
+
+def backfill_text_hash(apps, schema_editor):
+    Applicant = apps.get_model("api", "Applicant")
+    batch = []
+    for applicant in Applicant.objects.exclude(resume_text="").only("u_id", "resume_text").iterator():
+        normalized = re.sub(r"\s+", " ", applicant.resume_text).strip().lower()
+        applicant.text_hash = hashlib.sha256(normalized.encode("utf-8")).hexdigest() if normalized else ""
+        batch.append(applicant)
+        if len(batch) >= 500:
+            Applicant.objects.bulk_update(batch, ["text_hash"])
+            batch = []
+    if batch:
+        Applicant.objects.bulk_update(batch, ["text_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_llm_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='applicant',
+            name='text_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64, verbose_name='Normalized Text Hash'),
+        ),
+        migrations.RunPython(backfill_text_hash, migrations.RunPython.noop),
+    ]
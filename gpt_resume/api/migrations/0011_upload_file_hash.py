@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_applicant_text_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='applicant',
+            name='file_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64, verbose_name='Resume File SHA-256'),
+        ),
+        migrations.AddField(
+            model_name='ingestionitem',
+            name='file_hash',
+            field=models.CharField(blank=True, max_length=64, verbose_name='Resume File SHA-256'),
+        ),
+        migrations.AddField(
+            model_name='ingestionitem',
+            name='size',
+            field=models.PositiveIntegerField(default=0, verbose_name='File Size (bytes)'),
+        ),
+    ]
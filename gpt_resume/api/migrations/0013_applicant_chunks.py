@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_applicant_job_relevance_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicantChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField(verbose_name='Chunk Position')),
+                ('text', models.TextField(verbose_name='Chunk Text')),
+                ('embedding', models.BinaryField(verbose_name='Chunk Embedding (float32)')),
+                ('embedding_model', models.CharField(max_length=128, verbose_name='Embedding Model')),
+                ('embedding_dim', models.PositiveIntegerField(verbose_name='Embedding Dimension')),
+                ('applicant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='api.applicant')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('applicant', 'position'), name='applicant_chunk_position_uniq')],
+            },
+        ),
+    ]
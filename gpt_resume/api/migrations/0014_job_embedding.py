@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_applicant_chunks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='description_hash',
+            field=models.CharField(blank=True, max_length=64, verbose_name='Embedded Description SHA-256'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='embedding',
+            field=models.BinaryField(blank=True, null=True, verbose_name='Description Embedding (float32)'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='embedding_dim',
+            field=models.PositiveIntegerField(default=0, verbose_name='Embedding Dimension'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='embedding_model',
+            field=models.CharField(blank=True, max_length=128, verbose_name='Embedding Model'),
+        ),
+    ]
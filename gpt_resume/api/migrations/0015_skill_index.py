@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_job_embedding'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=128, unique=True, verbose_name='Skill Name')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ApplicantSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('applicant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skills', to='api.applicant')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='applicant_skills', to='api.skill')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('skill', 'applicant'), name='applicant_skill_uniq')],
+            },
+        ),
+    ]
@@ -29,6 +29,11 @@ class Job(models.Model):
     u_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     job_title = models.TextField(blank=False, verbose_name="Job Title")
     job_description = models.TextField(blank=False, verbose_name="Job Description")
+    # Cached description vector; recomputed when the description hash or model changes
+    embedding = models.BinaryField(blank=True, null=True, editable=False, verbose_name="Description Embedding (float32)")
+    embedding_model = models.CharField(max_length=128, blank=True, verbose_name="Embedding Model")
+    embedding_dim = models.PositiveIntegerField(default=0, verbose_name="Embedding Dimension")
+    description_hash = models.CharField(max_length=64, blank=True, verbose_name="Embedded Description SHA-256")
 
     def __str__(self):
         if self.job_title:
@@ -49,6 +54,8 @@ class Applicant(models.Model):
         verbose_name="Applicant's Resume File",
     )
     resume_text = models.TextField(blank=True, verbose_name="Extracted Resume Text")
+    text_hash = models.CharField(max_length=64, blank=True, db_index=True, verbose_name="Normalized Text Hash")
+    file_hash = models.CharField(max_length=64, blank=True, db_index=True, verbose_name="Resume File SHA-256")
     parsed = models.JSONField(blank=True, null=True, verbose_name="Parsed Resume Data")
     job_applied = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="applicants", verbose_name="Job Applied For")
     relevance = models.IntegerField(
@@ -57,10 +64,19 @@ class Applicant(models.Model):
         verbose_name="Relevance Score",
     )
     embedding_stored = models.BooleanField(default=False, verbose_name="Embedding Stored Flag")
+    embedding = models.BinaryField(blank=True, null=True, editable=False, verbose_name="Resume Embedding (float32)")
+    embedding_model = models.CharField(max_length=128, blank=True, verbose_name="Embedding Model")
+    embedding_dim = models.PositiveIntegerField(default=0, verbose_name="Embedding Dimension")
     
     # ✅ Already exists (keep it)
     explanation = models.TextField(blank=True, verbose_name="AI Ranking Explanation")
 
+    class Meta:
+        indexes = [
+            # Serves the per-job listing: rec/norec threshold range scans and (-relevance, u_id) ordering
+            models.Index(fields=["job_applied", "-relevance", "u_id"], name="applicant_job_relevance_idx"),
+        ]
+
     def __str__(self):
         return self.name or str(self.u_id)
 
@@ -129,3 +145,121 @@ class ProfessionalExperience(models.Model):
 
     def __str__(self):
         return f"{self.role or 'Experience'} @ {self.organization or ''}"
+
+
+class ApplicantChunk(models.Model):
+    """
+    One passage of an applicant's resume text with its own embedding.
+    The applicant's vector is pooled from these; they also locate the best-matching passage.
+    """
+    applicant = models.ForeignKey(Applicant, on_delete=models.CASCADE, related_name="chunks")
+    position = models.PositiveIntegerField(verbose_name="Chunk Position")
+    text = models.TextField(verbose_name="Chunk Text")
+    embedding = models.BinaryField(editable=False, verbose_name="Chunk Embedding (float32)")
+    embedding_model = models.CharField(max_length=128, verbose_name="Embedding Model")
+    embedding_dim = models.PositiveIntegerField(verbose_name="Embedding Dimension")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["applicant", "position"], name="applicant_chunk_position_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.applicant_id}#{self.position}"
+
+
+class Skill(models.Model):
+    """
+    Canonical skill from the skill taxonomy (see api/utils/skills.py).
+    """
+    name = models.CharField(max_length=128, unique=True, verbose_name="Skill Name")
+
+    def __str__(self):
+        return self.name
+
+
+class ApplicantSkill(models.Model):
+    """
+    Normalized skill index: one row per (skill, applicant), filled at ingestion
+    from the resume text and the parsed tech stacks.
+    """
+    applicant = models.ForeignKey(Applicant, on_delete=models.CASCADE, related_name="skills")
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name="applicant_skills")
+
+    class Meta:
+        constraints = [
+            # Skill first: the skill filter is an index range scan that yields applicant ids
+            models.UniqueConstraint(fields=["skill", "applicant"], name="applicant_skill_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.applicant_id}: {self.skill_id}"
+
+
+class IngestionBatch(models.Model):
+    """
+    One resume upload. Files are queued as IngestionItems and processed by the worker pool.
+    """
+    u_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="ingestion_batches")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def progress(self) -> dict:
+        """Per-state item counts, plus the total."""
+        counts = {state: 0 for state, _ in IngestionItem.STATE_CHOICES}
+        for row in self.items.values("state").annotate(n=models.Count("pk")):
+            counts[row["state"]] = row["n"]
+        counts["total"] = sum(counts.values())
+        return counts
+
+    def __str__(self):
+        return f"Batch {self.u_id} ({self.job})"
+
+
+class IngestionItem(models.Model):
+    """
+    A single queued resume file and its processing state.
+    """
+    QUEUED = "queued"
+    PROCESSING = "processing"
+    DONE = "done"
+    FAILED = "failed"
+    STATE_CHOICES = [
+        (QUEUED, "Queued"),
+        (PROCESSING, "Processing"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    u_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    batch = models.ForeignKey(IngestionBatch, on_delete=models.CASCADE, related_name="items")
+    filename = models.TextField(blank=True, verbose_name="Original Filename")
+    resume = models.FileField(upload_to="resumes/", verbose_name="Stored Resume File")
+    file_hash = models.CharField(max_length=64, blank=True, verbose_name="Resume File SHA-256")
+    size = models.PositiveIntegerField(default=0, verbose_name="File Size (bytes)")
+    state = models.CharField(max_length=16, choices=STATE_CHOICES, default=QUEUED, db_index=True)
+    claimed_by = models.CharField(max_length=64, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    applicant = models.ForeignKey(Applicant, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.filename or self.u_id} [{self.state}]"
+
+
+class LLMCacheEntry(models.Model):
+    """
+    Cached OpenAI result, keyed by a SHA-256 of the resume text, job text, model and prompt.
+    """
+    key = models.CharField(max_length=64, primary_key=True)
+    kind = models.CharField(max_length=32, verbose_name="Call Type")
+    value = models.JSONField(verbose_name="Cached Result")
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    hits = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.kind}:{self.key[:12]}"
@@ -0,0 +1,19 @@
+from rest_framework.pagination import CursorPagination
+
+
+class ApplicantCursorPagination(CursorPagination):
+    """
+    Keyset pagination for applicant lists, ordered by (-relevance, u_id).
+    Opt-in: plain list responses are kept unless `cursor` or `page_size`
+    is passed, so existing clients keep receiving an array.
+    """
+    ordering = ("-relevance", "u_id")
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
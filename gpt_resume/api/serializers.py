@@ -1,5 +1,7 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
-from .models import Job, Applicant, College, Project, ProfessionalExperience
+from .models import Job, Applicant, College, Project, ProfessionalExperience, IngestionBatch, IngestionItem
+from .utils.skill_index import resolve_skills
 
 
 # ---------------------------
@@ -10,7 +12,7 @@ class JobSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Job
-        fields = '__all__'
+        exclude = ['embedding', 'embedding_model', 'embedding_dim', 'description_hash']
 
 
 # ---------------------------
@@ -83,7 +85,7 @@ class ApplicantSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Applicant
-        exclude = ['resume_text']
+        exclude = ['resume_text', 'embedding', 'embedding_model', 'embedding_dim', 'text_hash', 'file_hash']
         extra_kwargs = {
             "name": {"read_only": True},
             "email": {"read_only": True},
@@ -92,6 +94,51 @@ class ApplicantSerializer(serializers.ModelSerializer):
         }
 
 
+# ---------------------------
+# Applicant List Serializer
+# ---------------------------
+class ApplicantListSerializer(serializers.ModelSerializer):
+    """
+    Lightweight row for applicant lists. `parsed` and `embedding_stored` are
+    only included when asked for through `fields`.
+    """
+    DEFAULT_FIELDS = ['u_id', 'name', 'email', 'resume', 'relevance', 'explanation']
+
+    parsed = serializers.JSONField(read_only=True)
+
+    class Meta:
+        model = Applicant
+        fields = ['u_id', 'name', 'email', 'resume', 'relevance', 'explanation', 'parsed', 'embedding_stored']
+        read_only_fields = fields
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None) or self.DEFAULT_FIELDS
+        super().__init__(*args, **kwargs)
+        for name in set(self.fields) - set(fields):
+            self.fields.pop(name)
+
+    @classmethod
+    def parse_fields(cls, value: str) -> list:
+        """Validate a comma-separated `fields=` query parameter."""
+        if not value:
+            return cls.DEFAULT_FIELDS
+        fields = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = set(fields) - set(cls.Meta.fields)
+        if unknown:
+            raise serializers.ValidationError(
+                {'fields': f"Unknown field(s): {', '.join(sorted(unknown))}. Choose from {', '.join(cls.Meta.fields)}."}
+            )
+        return fields
+
+    @staticmethod
+    def parse_skills(value: str) -> list:
+        """Validate a comma-separated `skills=` query parameter into canonical skill names."""
+        skills, unknown = resolve_skills([name for name in value.split(',') if name.strip()])
+        if unknown:
+            raise serializers.ValidationError({'skills': f"Unknown skill(s): {', '.join(unknown)}."})
+        return skills
+
+
 # ---------------------------
 # Applicant Summary Serializer
 # ---------------------------
@@ -105,25 +152,126 @@ class ApplicantSummarySerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Applicant
-        exclude = ['job_applied', 'resume_text']
+        exclude = ['job_applied', 'resume_text', 'embedding', 'embedding_model', 'embedding_dim', 'text_hash', 'file_hash']
+
+    # Children are ordered inside the Prefetch objects, so serialization reads them from memory.
+    PREFETCH = (
+        ('colleges', College, '-end_date'),
+        ('projects', Project, '-relevance'),
+        ('professional_experiences', ProfessionalExperience, '-relevance'),
+    )
+
+    @classmethod
+    def prefetch(cls, queryset):
+        """Applicants with ordered children prefetched and unused blobs deferred."""
+        return queryset.defer(*cls.Meta.exclude).prefetch_related(*(
+            Prefetch(name, queryset=model.objects.order_by(ordering)) for name, model, ordering in cls.PREFETCH
+        ))
+
+    @staticmethod
+    def _children(obj, name, ordering):
+        if name in getattr(obj, '_prefetched_objects_cache', {}):
+            return getattr(obj, name).all()
+        return getattr(obj, name).order_by(ordering)
 
     def get_college(self, obj):
-        qs = getattr(obj, 'colleges', None) or obj.college_set.all()
-        return (
-            CollegeSerializer(qs.order_by('-end_date'), many=True).data
-            if qs.exists() else []
-        )
+        return CollegeSerializer(self._children(obj, 'colleges', '-end_date'), many=True).data
 
     def get_projects(self, obj):
-        qs = getattr(obj, 'projects', None) or obj.project_set.all()
-        return (
-            ProjectSerializer(qs.order_by('-relevance'), many=True).data
-            if qs.exists() else []
-        )
+        return ProjectSerializer(self._children(obj, 'projects', '-relevance'), many=True).data
 
     def get_professional_experiences(self, obj):
-        qs = getattr(obj, 'professional_experiences', None) or obj.professionalexperience_set.all()
-        return (
-            ProfessionalExperienceSerializer(qs.order_by('-relevance'), many=True).data
-            if qs.exists() else []
-        )
+        return ProfessionalExperienceSerializer(
+            self._children(obj, 'professional_experiences', '-relevance'), many=True
+        ).data
+
+
+class ApplicantSummaryBulkSerializer(serializers.Serializer):
+    u_ids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False, max_length=200)
+
+
+# ---------------------------
+# Cross-job Search Serializers
+# ---------------------------
+def passage_data(passage):
+    """(text, cosine) from scoring.best_passages -> JSON, or None."""
+    if passage is None:
+        return None
+    text, score = passage
+    return {'text': text, 'score': round(score, 4)}
+
+
+class CandidateSearchSerializer(serializers.Serializer):
+    query = serializers.CharField(required=False, allow_blank=False)
+    job_u_id = serializers.UUIDField(required=False)
+    top_k = serializers.IntegerField(required=False, min_value=1, max_value=1000, default=100)
+    page = serializers.IntegerField(required=False, min_value=1, default=1)
+    page_size = serializers.IntegerField(required=False, min_value=1, max_value=100, default=20)
+
+    def validate(self, attrs):
+        if not attrs.get("query") and not attrs.get("job_u_id"):
+            raise serializers.ValidationError("Provide either 'query' or 'job_u_id'.")
+        return attrs
+
+
+class ApplicantSearchResultSerializer(serializers.ModelSerializer):
+    job_u_id = serializers.UUIDField(source='job_applied_id', read_only=True)
+    job_title = serializers.CharField(source='job_applied.job_title', read_only=True)
+    score = serializers.SerializerMethodField()
+    best_passage = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Applicant
+        fields = [
+            'u_id',
+            'name',
+            'email',
+            'job_u_id',
+            'job_title',
+            'relevance',
+            'score',
+            'best_passage',
+            'explanation'
+        ]
+
+    def get_score(self, obj):
+        return round(self.context.get('scores', {}).get(str(obj.u_id), 0.0), 4)
+
+    def get_best_passage(self, obj):
+        return passage_data(self.context.get('passages', {}).get(str(obj.u_id)))
+
+
+# ---------------------------
+# Ingestion Batch Serializers
+# ---------------------------
+class IngestionItemSerializer(serializers.ModelSerializer):
+    applicant_id = serializers.UUIDField(read_only=True)
+    relevance = serializers.IntegerField(source='applicant.relevance', read_only=True, default=None)
+
+    class Meta:
+        model = IngestionItem
+        fields = [
+            'u_id',
+            'filename',
+            'state',
+            'attempts',
+            'error',
+            'applicant_id',
+            'relevance',
+            'created_at',
+            'started_at',
+            'finished_at'
+        ]
+
+
+class IngestionBatchSerializer(serializers.ModelSerializer):
+    job_u_id = serializers.UUIDField(source='job_id', read_only=True)
+    progress = serializers.SerializerMethodField()
+    items = IngestionItemSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = IngestionBatch
+        fields = ['u_id', 'job_u_id', 'created_at', 'progress', 'items']
+
+    def get_progress(self, obj):
+        return obj.progress()
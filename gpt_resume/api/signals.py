@@ -0,0 +1,27 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Applicant, College, Job, ProfessionalExperience, Project
+from .utils.response_cache import invalidate
+
+
+# ---------------------------
+# Response cache invalidation
+# ---------------------------
+# Bulk writes (bulk_create/bulk_update/queryset.update) do not send these
+# signals; the code doing them calls `invalidate` itself.
+@receiver([post_save, post_delete], sender=Job)
+def job_changed(sender, instance, **kwargs):
+    invalidate(job_ids=[instance.u_id])
+
+
+@receiver([post_save, post_delete], sender=Applicant)
+def applicant_changed(sender, instance, **kwargs):
+    invalidate(job_ids=[instance.job_applied_id], applicant_ids=[instance.u_id])
+
+
+@receiver([post_save, post_delete], sender=College)
+@receiver([post_save, post_delete], sender=Project)
+@receiver([post_save, post_delete], sender=ProfessionalExperience)
+def applicant_child_changed(sender, instance, **kwargs):
+    invalidate(applicant_ids=[instance.applicant_id])
@@ -1,3 +1,879 @@
-from django.test import TestCase
+import asyncio, hashlib, json, os, shutil, subprocess, sys, tempfile, time, uuid
+from datetime import timedelta
+import httpx
+import numpy as np
+from unittest import mock
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
 
-# Create your tests here.
+from .models import (
+    Applicant, ApplicantChunk, College, IngestionBatch, IngestionItem, Job, LLMCacheEntry, ProfessionalExperience, Project,
+)
+from .serializers import ApplicantListSerializer
+from .utils import dedup, ingestion, resume_dispatcher, scoring, vector_index
+from .utils.embeddings import bytes_to_vector, chunk_text, pool_vectors, relevance_scores, store_embedding, vector_to_bytes
+from .utils.llm_cache import DatabaseCacheBackend, DiskCacheBackend, LLMCache
+from .utils.openai_dispatcher import OpenAIDispatcher
+from .utils.response_cache import invalidate
+from .utils.skill_index import index_skills, resolve_skills
+from .utils.skills import get_skill_matcher
+from .utils.uploads import store_upload
+
+
+# ---------------------------
+# Ingestion queue
+# ---------------------------
+class IngestionFailureTests(TestCase):
+    def setUp(self):
+        self.job = Job.objects.create(job_title="Backend engineer", job_description="Python, Django")
+        self.batch = IngestionBatch.objects.create(job=self.job)
+        name = default_storage.save("resumes/corrupt.pdf", ContentFile(b"not a pdf"))
+        self.addCleanup(default_storage.delete, name)
+        self.item = IngestionItem.objects.create(batch=self.batch, filename="corrupt.pdf", resume=name)
+
+    def test_corrupt_pdf_fails_once_without_leaving_an_applicant(self):
+        ingestion.process_items(ingestion.claim_items(batch_id=self.batch.pk))
+
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.state, IngestionItem.FAILED)
+        self.assertEqual(self.item.attempts, 1)
+        self.assertIsNone(self.item.applicant_id)
+        self.assertFalse(Applicant.objects.filter(job_applied=self.job).exists())
+
+    def test_retried_item_keeps_its_applicant(self):
+        item = ingestion.claim_items(batch_id=self.batch.pk)[0]
+        item.applicant = Applicant.objects.create(job_applied=self.job, resume=item.resume.name)
+        ingestion._fail(item, "database is locked")
+
+        item.refresh_from_db()
+        self.assertEqual(item.state, IngestionItem.QUEUED)
+        self.assertIsNotNone(item.applicant_id)
+
+        ingestion._fail(item, "database is locked")
+        ingestion._fail(item, "database is locked")
+        self.assertEqual(IngestionItem.objects.get(pk=item.pk).state, IngestionItem.FAILED)
+        self.assertFalse(Applicant.objects.filter(job_applied=self.job).exists())
+
+    def test_stale_items_count_as_attempts(self):
+        stale_since = timezone.now() - timedelta(seconds=ingestion.INGESTION_STALE_SECONDS + 60)
+        item = ingestion.claim_items(batch_id=self.batch.pk)[0]
+        item.applicant = Applicant.objects.create(job_applied=self.job, resume=item.resume.name)
+        item.save(update_fields=["applicant"])
+
+        for attempt in range(1, ingestion.INGESTION_MAX_ATTEMPTS + 1):
+            IngestionItem.objects.filter(pk=item.pk).update(state=IngestionItem.PROCESSING, started_at=stale_since)
+            self.assertEqual(ingestion.requeue_stale_items(), 1)
+            item.refresh_from_db()
+            self.assertEqual(item.attempts, attempt)
+
+        self.assertEqual(item.state, IngestionItem.FAILED)
+        self.assertFalse(Applicant.objects.filter(job_applied=self.job).exists())
+        self.assertEqual(ingestion.requeue_stale_items(), 0)
+
+
+class IngestionParseFailureTests(TestCase):
+    def setUp(self):
+        import fitz
+
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media_root, INGESTION_AUTOSTART=False)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        document = fitz.open()
+        document.new_page().insert_text((72, 72), f"Jane Doe, Python developer {os.urandom(8).hex()}")
+        name = default_storage.save("resumes/cv.pdf", ContentFile(document.tobytes()))
+        self.job = Job.objects.create(job_title="Backend engineer", job_description="Python, Django")
+        self.item = IngestionItem.objects.create(
+            batch=IngestionBatch.objects.create(job=self.job), filename="cv.pdf", resume=name,
+        )
+
+    def test_failed_llm_parse_retries_the_item(self):
+        rate_limited = OpenAIDispatcher(
+            api_key="test", base_url="http://openai.test/v1", max_retries=0,
+            transport=httpx.MockTransport(lambda request: httpx.Response(429, request=request, json={"error": {}})),
+        )
+        with mock.patch.object(resume_dispatcher, "get_dispatcher", return_value=rate_limited), \
+                mock.patch.dict(ingestion.RESUME_DEDUP, ENABLED=False):
+            ingestion.process_items(ingestion.claim_items(batch_id=self.item.batch_id))
+
+            self.item.refresh_from_db()
+            self.assertEqual(self.item.state, IngestionItem.QUEUED)
+            self.assertEqual(self.item.attempts, 1)
+            self.assertIn("429", self.item.error)
+
+            for _ in range(ingestion.INGESTION_MAX_ATTEMPTS - 1):
+                ingestion.process_items(ingestion.claim_items(batch_id=self.item.batch_id))
+
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.state, IngestionItem.FAILED)
+        self.assertFalse(Applicant.objects.filter(job_applied=self.job).exists())
+
+
+# ---------------------------
+# Uploads
+# ---------------------------
+class UploadTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media_root, INGESTION_AUTOSTART=False)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.job = Job.objects.create(job_title="Backend engineer", job_description="Python, Django")
+
+    def test_in_memory_upload_is_stored_and_hashed(self):
+        content = b"%PDF-1.4 small resume"
+        stored = store_upload(SimpleUploadedFile("cv.pdf", content))
+
+        with open(stored.path, "rb") as f:
+            self.assertEqual(f.read(), content)
+        self.assertEqual(stored.sha256, hashlib.sha256(content).hexdigest())
+        self.assertEqual(stored.size, len(content))
+
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=0)
+    def test_disk_backed_upload_is_moved_into_place(self):
+        content = b"%PDF-1.4 " + os.urandom(64 * 1024)
+        response = self.client.post("/api/resumes/upload/", {
+            "job_u_id": str(self.job.u_id), "files": [SimpleUploadedFile("cv.pdf", content)],
+        })
+
+        self.assertEqual(response.status_code, 202)
+        item = IngestionItem.objects.get(batch__u_id=response.json()["batch_id"])
+        self.assertEqual(item.file_hash, hashlib.sha256(content).hexdigest())
+        self.assertEqual(item.size, len(content))
+        with open(item.resume.path, "rb") as f:
+            self.assertEqual(f.read(), content)
+
+
+# ---------------------------
+# Metrics
+# ---------------------------
+class MetricsEndpointTests(TestCase):
+    def test_metrics_include_stage_counters_and_database_gauges(self):
+        job = Job.objects.create(job_title="Backend engineer", job_description="Python, Django")
+        IngestionItem.objects.create(batch=IngestionBatch.objects.create(job=job), filename="cv.pdf")
+        self.client.get(f"/api/get-applicant-list/{job.u_id}/")
+
+        response = self.client.get("/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('resume_stage_duration_seconds_count{stage="listing"}', body)
+        self.assertIn('ingestion_queue_depth{state="queued"} 1.0', body)
+        self.assertIn("applicants_pending_scoring 0.0", body)
+
+
+# ---------------------------
+# Skills
+# ---------------------------
+class SkillMatcherTests(SimpleTestCase):
+    def test_aliases_resolve_to_canonical_names(self):
+        matcher = get_skill_matcher()
+
+        self.assertEqual(matcher.normalize("k8s"), "Kubernetes")
+        self.assertEqual(matcher.normalize("  Postgres "), "PostgreSQL")
+        self.assertEqual(matcher.find("Deployed on K8S with postgres and golang"), ["Go", "PostgreSQL", "Kubernetes"])
+        self.assertEqual(resolve_skills(["js", "JavaScript", "cobol-ish"]), (["JavaScript"], ["cobol-ish"]))
+
+    def test_matches_whole_tokens_only(self):
+        matcher = get_skill_matcher()
+
+        self.assertEqual(matcher.find("Senior JavaScript developer"), ["JavaScript"])
+        self.assertEqual(matcher.find("Java, C++ and C++11x"), ["Java", "C++"])
+        self.assertEqual(matcher.find("Javanese translator, cppcheck user"), [])
+
+    def test_common_words_need_their_exact_case(self):
+        matcher = get_skill_matcher()
+
+        self.assertEqual(matcher.find("Services written in Go"), ["Go"])
+        self.assertEqual(matcher.find("Ready to go, good with git and excel"), [])
+        self.assertEqual(matcher.find_in_list(["go", "k8s", "Docker Compose"]), ["Go", "Docker", "Kubernetes"])
+
+
+# ---------------------------
+# Scoring
+# ---------------------------
+DIM = 8
+
+
+def _vector(seed: str) -> np.ndarray:
+    vector = np.random.default_rng(int(hashlib.sha256(seed.encode()).hexdigest()[:8], 16)).standard_normal(DIM)
+    return (vector / np.linalg.norm(vector)).astype(np.float32)
+
+
+class HashEmbedder:
+    """Stands in for the SentenceTransformer: one fixed unit vector per text."""
+
+    def encode(self, texts, **kwargs):
+        return np.vstack([_vector(text) for text in texts])
+
+
+def _with_vector(obj, seed: str):
+    store_embedding(obj, _vector(seed))
+    return obj
+
+
+def _embedded_job(description: str = "Python, Django") -> Job:
+    job = _with_vector(Job(job_title="Backend engineer", job_description=description), description)
+    job.description_hash = hashlib.sha256(description.encode()).hexdigest()
+    job.save()
+    return job
+
+
+class ChunkingTests(SimpleTestCase):
+    def words(self, start: int, stop: int) -> str:
+        return " ".join(f"w{i}" for i in range(start, stop))
+
+    def test_short_paragraphs_are_packed_up_to_the_limit(self):
+        text = "\n\n".join([self.words(0, 4), self.words(4, 8), self.words(8, 12)])
+
+        self.assertEqual(chunk_text(text, max_words=8, overlap=2), [self.words(0, 8), self.words(8, 12)])
+        self.assertEqual(chunk_text("", max_words=8, overlap=2), [])
+
+    def test_long_paragraph_uses_overlapping_windows(self):
+        chunks = chunk_text(self.words(0, 20), max_words=8, overlap=3)
+
+        self.assertEqual(chunks, [self.words(0, 8), self.words(5, 13), self.words(10, 18), self.words(15, 20)])
+        for previous, current in zip(chunks, chunks[1:]):
+            self.assertEqual(previous.split()[-3:], current.split()[:3])
+
+    def test_window_ends_exactly_at_the_last_word(self):
+        self.assertEqual(chunk_text(self.words(0, 13), max_words=8, overlap=3), [self.words(0, 8), self.words(5, 13)])
+
+    def test_pooled_vectors_are_normalised(self):
+        vectors = np.array([[3.0, 1.0], [1.0, 4.0]], dtype=np.float32)
+
+        np.testing.assert_allclose(pool_vectors(vectors, "mean"), np.array([2.0, 2.5]) / np.hypot(2.0, 2.5), rtol=1e-6)
+        np.testing.assert_allclose(pool_vectors(vectors, "max"), [0.6, 0.8], rtol=1e-6)
+        np.testing.assert_allclose(pool_vectors(np.array([[1.0, -1.0], [-1.0, 1.0]]), "mean"), [0.0, 0.0])
+        self.assertEqual(pool_vectors(vectors).dtype, np.float32)
+
+
+class ScoringTests(TestCase):
+    def setUp(self):
+        self.job = _embedded_job()
+        self.job_vector = _vector(self.job.job_description)
+
+    def test_write_relevance_groups_rows_by_score(self):
+        applicants = [Applicant.objects.create(job_applied=self.job) for _ in range(5)]
+        scores = [40, 90, 40, 40, 90]
+
+        # One UPDATE per (score, chunk of ids) inside one transaction
+        with self.assertNumQueries(2 + 3):
+            scoring.write_relevance([a.u_id for a in applicants], scores, chunk_size=2)
+
+        for applicant, score in zip(applicants, scores):
+            applicant.refresh_from_db()
+            self.assertEqual(applicant.relevance, score)
+            self.assertTrue(applicant.embedding_stored)
+
+    def test_rescore_counts_and_indexes_reencoded_applicants(self):
+        current = [_with_vector(Applicant(job_applied=self.job), f"cv {i}") for i in range(3)]
+        for applicant in current:
+            applicant.save()
+        stale = [Applicant.objects.create(job_applied=self.job, resume_text=f"Django developer {i}") for i in range(3)]
+
+        with mock.patch.object(scoring, "index_applicants") as index_applicants:
+            self.assertEqual(scoring.rescore_job(self.job), {"rescored": 3, "reencoded": 0, "stale": 3})
+            index_applicants.assert_not_called()
+
+            with mock.patch.object(scoring, "get_embedder", return_value=HashEmbedder()):
+                counts = scoring.rescore_job(self.job, chunk_size=2, reencode=True)
+
+        self.assertEqual(counts, {"rescored": 3, "reencoded": 3, "stale": 0})
+        self.assertEqual(index_applicants.call_count, 2)
+        indexed = [a.u_id for call in index_applicants.call_args_list for a in call.args[0]]
+        self.assertCountEqual(indexed, [a.u_id for a in stale])
+        for applicant, seed in [(a, f"cv {i}") for i, a in enumerate(current)] + [(a, a.resume_text) for a in stale]:
+            applicant.refresh_from_db()
+            self.assertEqual(applicant.relevance, relevance_scores(self.job_vector, _vector(seed)[None])[0])
+            self.assertTrue(applicant.embedding_stored)
+
+
+# ---------------------------
+# Applicant lists
+# ---------------------------
+class ApplicantListTests(TestCase):
+    def setUp(self):
+        self.job = Job.objects.create(job_title="Backend engineer", job_description="Python, Django")
+        self.applicants = [
+            Applicant.objects.create(job_applied=self.job, name=f"Applicant {i}", relevance=relevance, embedding_stored=True)
+            for i, relevance in enumerate([80, 50, 80, 80, 50, 90])
+        ]
+        self.url = f"/api/jobs/{self.job.u_id}/applicants/"
+
+    def expected_order(self) -> list:
+        return [str(a.u_id) for a in sorted(self.applicants, key=lambda a: (-a.relevance, str(a.u_id)))]
+
+    def test_plain_list_without_page_size(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.json(), list)
+        self.assertEqual([row["u_id"] for row in response.json()], self.expected_order())
+
+    def test_cursor_pages_follow_relevance_then_u_id(self):
+        seen, url = [], f"{self.url}?page_size=2"
+        while url:
+            page = self.client.get(url).json()
+            self.assertLessEqual(len(page["results"]), 2)
+            seen += [row["u_id"] for row in page["results"]]
+            url = page["next"]
+
+        self.assertEqual(seen, self.expected_order())
+
+    def test_fields_whitelist(self):
+        rows = self.client.get(f"{self.url}?fields=u_id,relevance,embedding_stored").json()
+        self.assertEqual(set(rows[0]), {"u_id", "relevance", "embedding_stored"})
+
+        self.assertEqual(set(self.client.get(self.url).json()[0]), set(ApplicantListSerializer.DEFAULT_FIELDS))
+
+        response = self.client.get(f"{self.url}?fields=u_id,resume_text")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("resume_text", response.json()["fields"])
+
+
+class SkillFilterTests(TestCase):
+    def setUp(self):
+        self.job = Job.objects.create(job_title="Backend engineer", job_description="Python, Django")
+        skills = {
+            "both": ["Python", "Kubernetes"], "python": ["Python"], "k8s": ["Kubernetes", "Docker"], "none": [],
+        }
+        self.applicants = {name: Applicant.objects.create(job_applied=self.job, name=name) for name in skills}
+        index_skills([(self.applicants[name], names) for name, names in skills.items()])
+
+    def names(self, skills: str) -> set:
+        response = self.client.get(f"/api/jobs/{self.job.u_id}/applicants/", {"skills": skills})
+        self.assertEqual(response.status_code, 200)
+        return {row["name"] for row in response.json()}
+
+    def test_every_requested_skill_is_required(self):
+        self.assertEqual(self.names("Python"), {"both", "python"})
+        self.assertEqual(self.names("python,kubernetes"), {"both"})
+        self.assertEqual(self.names("Python,Kubernetes,Docker"), set())
+
+    def test_aliases_are_accepted(self):
+        self.assertEqual(self.names("k8s"), {"both", "k8s"})
+        self.assertEqual(self.names("K8S, docker"), {"k8s"})
+
+    def test_unknown_skill_is_a_400(self):
+        response = self.client.get(f"/api/jobs/{self.job.u_id}/applicants/", {"skills": "Python,Klingon"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Klingon", response.json()["skills"])
+
+
+class ApplicantSummaryBulkTests(TestCase):
+    def setUp(self):
+        job = Job.objects.create(job_title="Backend engineer", job_description="Python, Django")
+        self.applicants = []
+        for i in range(6):
+            applicant = Applicant.objects.create(job_applied=job, name=f"Applicant {i}")
+            College.objects.create(applicant=applicant, name="State University")
+            Project.objects.create(applicant=applicant, title=f"Project {i}", relevance=i)
+            Project.objects.create(applicant=applicant, title=f"Side project {i}", relevance=i + 10)
+            ProfessionalExperience.objects.create(applicant=applicant, role="Developer")
+            self.applicants.append(applicant)
+
+    def post(self, u_ids):
+        return self.client.post("/api/applicants/summaries/", {"u_ids": [str(u_id) for u_id in u_ids]},
+                                content_type="application/json")
+
+    def test_query_count_does_not_grow_with_applicants(self):
+        # Applicants, then one query per prefetched child table
+        for count in (1, 6):
+            with self.assertNumQueries(4):
+                response = self.post([a.u_id for a in self.applicants[:count]])
+            self.assertEqual(len(response.json()["results"]), count)
+
+    def test_results_keep_request_order_and_report_missing(self):
+        missing = uuid.uuid4()
+        u_ids = [self.applicants[3].u_id, missing, self.applicants[0].u_id, self.applicants[3].u_id]
+
+        body = self.post(u_ids).json()
+
+        self.assertEqual([row["u_id"] for row in body["results"]], [str(u_ids[0]), str(u_ids[2])])
+        self.assertEqual(body["missing"], [str(missing)])
+        self.assertEqual([p["project_title"] for p in body["results"][0]["projects"]], ["Side project 3", "Project 3"])
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+                   INGESTION_AUTOSTART=False)
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        self.job = _embedded_job()
+        self.applicant = Applicant.objects.create(job_applied=self.job, name="Jane", relevance=70, embedding_stored=True)
+        self.list_url = f"/api/jobs/{self.job.u_id}/applicants/"
+        self.summary_url = f"/api/applicants/{self.applicant.u_id}/summary/"
+
+    def write(self, fn):
+        # Tokens are bumped once the write commits
+        with self.captureOnCommitCallbacks(execute=True):
+            return fn()
+
+    def test_unchanged_listing_is_a_304(self):
+        first = self.client.get(self.list_url)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+    def test_applicant_writes_invalidate_listing_and_summary(self):
+        listing = self.client.get(self.list_url)
+        summary = self.client.get(self.summary_url)
+
+        added = self.write(lambda: Applicant.objects.create(job_applied=self.job, name="John", relevance=90))
+        self.applicant.name = "Jane Doe"
+        self.write(self.applicant.save)
+
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=listing["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["name"] for row in response.json()], ["John", "Jane Doe"])
+        response = self.client.get(self.summary_url, HTTP_IF_NONE_MATCH=summary["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["name"], "Jane Doe")
+
+        self.client.get(self.list_url)  # cached again
+        self.write(added.delete)
+        self.assertEqual([row["name"] for row in self.client.get(self.list_url).json()], ["Jane Doe"])
+
+    def test_job_writes_invalidate_summary(self):
+        summary = self.client.get(self.summary_url)
+        self.write(lambda: Applicant.objects.filter(pk=self.applicant.pk).update(relevance=10))
+        self.assertEqual(self.client.get(self.summary_url, HTTP_IF_NONE_MATCH=summary["ETag"]).status_code, 304)
+
+        # Bulk updates skip signals; scoring invalidates the job instead
+        self.write(lambda: invalidate(job_ids=[self.job.u_id]))
+        response = self.client.get(self.summary_url, HTTP_IF_NONE_MATCH=summary["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["relevance"], 10)
+
+    def test_pending_scoring_header_is_replayed_from_cache(self):
+        Applicant.objects.create(job_applied=self.job, resume_text="Django developer")
+
+        first = self.client.get(self.list_url)
+        with self.assertNumQueries(0):
+            cached = self.client.get(self.list_url)
+
+        self.assertEqual(first["X-Pending-Scoring"], "1")
+        self.assertEqual(cached["X-Pending-Scoring"], "1")
+        self.assertEqual(cached.content, first.content)
+
+
+# ---------------------------
+# Vector index
+# ---------------------------
+class VectorIndexTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        for patcher in (mock.patch.dict(vector_index.VECTOR_INDEX, DIRECTORY=self.directory),
+                        mock.patch.dict(vector_index._indexes, clear=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.job = _embedded_job()
+
+    def applicant(self, seed: str, job: Job = None, **fields) -> Applicant:
+        applicant = _with_vector(Applicant(job_applied=job or self.job, **fields), seed)
+        applicant.save()
+        return applicant
+
+    def test_snapshot_and_shards_are_reloaded(self):
+        index = vector_index.VectorIndex("test", DIM, directory=self.directory)
+        index.add(["a", "b", "c"], np.vstack([_vector(seed) for seed in "abc"]))
+        index.save()
+        index.add(["d", "e"], np.vstack([_vector(seed) for seed in "de"]))
+        index.flush()
+        self.assertEqual(len(index._disk_shards()), 1)
+
+        reloaded = vector_index.VectorIndex("test", DIM, directory=self.directory)
+        self.assertTrue(reloaded.load())
+
+        self.assertEqual(reloaded.ids, ["a", "b", "c", "d", "e"])
+        self.assertEqual(reloaded.search(_vector("d"), 1)[0][0], "d")
+
+    def test_sync_adds_new_rows_after_deletes(self):
+        old = [self.applicant(f"cv {i}") for i in range(3)]
+        index = vector_index.job_index(self.job, DIM)
+        self.assertEqual(len(index), 3)
+
+        # Fewer stored vectors than indexed ids, but one of them is new
+        Applicant.objects.filter(u_id__in=[old[0].u_id, old[1].u_id]).delete()
+        new = self.applicant("cv new")
+
+        self.assertEqual(vector_index.sync_index(index, Applicant.objects.filter(job_applied=self.job)), 1)
+        self.assertIn(str(new.u_id), index.positions)
+        self.assertEqual(vector_index.sync_index(index, Applicant.objects.filter(job_applied=self.job)), 0)
+
+    def test_top_k_for_job_orders_by_similarity(self):
+        best = self.applicant(self.job.job_description)
+        others = [self.applicant(f"cv {i}") for i in range(4)]
+        job_vector = _vector(self.job.job_description)
+
+        hits = vector_index.top_k_for_job(self.job, job_vector, 3)
+
+        self.assertEqual(len(hits), 3)
+        self.assertEqual(hits[0][0], str(best.u_id))
+        ranked = sorted(others, key=lambda a: -float(bytes_to_vector(a.embedding) @ job_vector))
+        self.assertEqual([u_id for u_id, _ in hits[1:]], [str(a.u_id) for a in ranked[:2]])
+
+    def test_search_all_jobs_skips_duplicate_resumes(self):
+        other_job = _embedded_job("Data engineer")
+        first = self.applicant("query", text_hash="same")
+        self.applicant("query", job=other_job, text_hash="same")
+        rest = [self.applicant(f"cv {i}", job=other_job, text_hash=f"h{i}") for i in range(3)]
+
+        page, has_more = vector_index.search_all_jobs(_vector("query"), offset=0, limit=2, max_results=10)
+
+        self.assertEqual(len(page), 2)
+        self.assertIn(page[0][0], {str(a.u_id) for a in Applicant.objects.filter(text_hash="same")})
+        self.assertIn(page[1][0], {str(a.u_id) for a in rest})
+        self.assertTrue(has_more)
+        page, has_more = vector_index.search_all_jobs(_vector("query"), offset=2, limit=5, max_results=10)
+        self.assertEqual(len(page), 2)
+        self.assertFalse(has_more)
+        self.assertNotIn(str(first.u_id), [u_id for u_id, _ in page])
+
+
+class JobVectorReadTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        for patcher in (mock.patch.dict(vector_index.VECTOR_INDEX, DIRECTORY=directory),
+                        mock.patch.dict(vector_index._indexes, clear=True),
+                        mock.patch.object(scoring, "get_embedder", return_value=HashEmbedder())):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.job = Job.objects.create(job_title="Backend engineer", job_description="Python, Django")
+        self.applicants = [_with_vector(Applicant(job_applied=self.job, relevance=i), f"cv {i}") for i in range(4)]
+        for applicant in self.applicants:
+            applicant.save()
+        ApplicantChunk.objects.create(
+            applicant=self.applicants[0], position=0, text="Django developer", embedding=vector_to_bytes(_vector("cv 0")),
+            embedding_model=scoring.EMBEDDING_MODEL_NAME, embedding_dim=DIM,
+        )
+
+    def test_reads_never_encode_the_job(self):
+        with override_settings(INGESTION_AUTOSTART=False), mock.patch.object(scoring, "encode_long_texts") as encode:
+            rows = self.client.get(f"/api/jobs/{self.job.u_id}/applicants/?top_k=2").json()
+            summary = self.client.get(f"/api/applicants/{self.applicants[0].u_id}/summary/").json()
+        encode.assert_not_called()
+
+        # No stored job vector yet: no shortlist and no passage
+        self.assertEqual(len(rows), 4)
+        self.assertIsNone(summary["best_passage"])
+        self.assertIsNone(Job.objects.get(pk=self.job.pk).embedding)
+
+    def test_backfill_encodes_the_job_for_later_reads(self):
+        self.assertEqual(scoring.backfill_job_vectors(), 1)
+        self.assertEqual(scoring.backfill_job_vectors(), 0)
+
+        with mock.patch.object(scoring, "encode_long_texts") as encode:
+            rows = self.client.get(f"/api/jobs/{self.job.u_id}/applicants/?top_k=2").json()
+            summary = self.client.get(f"/api/applicants/{self.applicants[0].u_id}/summary/").json()
+        encode.assert_not_called()
+
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(summary["best_passage"]["text"], "Django developer")
+
+
+# ---------------------------
+# Duplicate resumes
+# ---------------------------
+class DedupTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        for patcher in (mock.patch.dict(vector_index.VECTOR_INDEX, DIRECTORY=directory),
+                        mock.patch.dict(vector_index._indexes, clear=True),
+                        mock.patch.object(ingestion, "explain_many")):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.job = _embedded_job()
+        self.other_job = _embedded_job("Data engineer")
+        self.source = self.parsed_applicant(self.job, "source")
+
+    def parsed_applicant(self, job: Job, seed: str, **fields) -> Applicant:
+        applicant = _with_vector(Applicant(
+            job_applied=job, name="Jane", resume_text=f"Resume {seed}", text_hash=f"text-{seed}",
+            file_hash=f"file-{seed}", parsed={"profile": {"name": "Jane"}}, relevance=77, explanation="Fits",
+            embedding_stored=True, **fields,
+        ), seed)
+        applicant.save()
+        College.objects.create(applicant=applicant, name="State University", explanation="Good")
+        Project.objects.create(applicant=applicant, title="Search engine", relevance=80, explanation="Relevant")
+        ApplicantChunk.objects.create(
+            applicant=applicant, position=0, text=f"Resume {seed}", embedding=vector_to_bytes(_vector(seed)),
+            embedding_model=scoring.EMBEDDING_MODEL_NAME, embedding_dim=DIM,
+        )
+        index_skills([(applicant, ["Python", "Django"])])
+        vector_index.index_applicants([applicant])
+        return applicant
+
+    def item(self, job: Job, applicant: Applicant = None) -> IngestionItem:
+        applicant = applicant or Applicant.objects.create(job_applied=job)
+        batch = IngestionBatch.objects.create(job=job)
+        return IngestionItem.objects.create(
+            batch=batch, filename="cv.pdf", applicant=applicant, state=IngestionItem.PROCESSING,
+        )
+
+    def test_exact_duplicate_matches_parsed_resumes_by_file_or_text(self):
+        new = Applicant.objects.create(job_applied=self.other_job)
+        unparsed = Applicant.objects.create(job_applied=self.job, file_hash="file-unparsed")
+
+        self.assertEqual(dedup.exact_duplicate(new, file_hash="file-source"), self.source)
+        self.assertEqual(dedup.exact_duplicate(new, text_hash="text-source"), self.source)
+        self.assertIsNone(dedup.exact_duplicate(new, file_hash="file-unparsed"))
+        self.assertIsNone(dedup.exact_duplicate(self.source, file_hash="file-source"))
+        self.assertIsNone(dedup.exact_duplicate(unparsed))
+        with mock.patch.dict(dedup.RESUME_DEDUP, ENABLED=False):
+            self.assertIsNone(dedup.exact_duplicate(new, file_hash="file-source"))
+
+    def test_near_duplicate_threshold(self):
+        new = Applicant.objects.create(job_applied=self.other_job)
+        source_vector = _vector("source")
+        # Unit vectors at a known cosine from the source
+        orthogonal = _vector("other") - (_vector("other") @ source_vector) * source_vector
+        orthogonal /= np.linalg.norm(orthogonal)
+
+        def at(cosine: float) -> np.ndarray:
+            return cosine * source_vector + np.sqrt(1 - cosine ** 2) * orthogonal
+
+        self.assertEqual(dedup.near_duplicate(new, at(0.99)), self.source)
+        self.assertIsNone(dedup.near_duplicate(new, at(0.95)))
+        with mock.patch.dict(dedup.RESUME_DEDUP, NEAR_DUPLICATE_SIMILARITY=0.9):
+            self.assertEqual(dedup.near_duplicate(new, at(0.95)), self.source)
+        with mock.patch.dict(dedup.RESUME_DEDUP, NEAR_DUPLICATE_CANDIDATES=0):
+            self.assertIsNone(dedup.near_duplicate(new, at(0.99)))
+
+    def test_copy_parsed_leaves_job_specific_fields_behind(self):
+        target = Applicant.objects.create(job_applied=self.other_job)
+
+        dedup.copy_parsed(self.source, target)
+
+        target.refresh_from_db()
+        self.assertEqual((target.name, target.resume_text, target.text_hash), ("Jane", "Resume source", "text-source"))
+        self.assertEqual(target.embedding, self.source.embedding)
+        self.assertEqual((target.explanation, target.embedding_stored), ("", False))
+        self.assertEqual(list(target.colleges.values_list("name", "explanation")), [("State University", "")])
+        self.assertEqual(list(target.projects.values_list("title", "relevance", "explanation")), [("Search engine", 0, "")])
+        self.assertEqual(set(target.skills.values_list("skill__name", flat=True)), {"Python", "Django"})
+        self.assertEqual(list(target.chunks.values_list("text", flat=True)), ["Resume source"])
+        # The source keeps its own rows
+        self.assertEqual(self.source.projects.get().relevance, 80)
+
+    def test_duplicates_within_a_chunk_point_at_the_first_item(self):
+        items = [self.item(self.job) for _ in range(3)]
+        keys = {items[0].pk: "a", items[1].pk: "b", items[2].pk: "a"}
+
+        originals, duplicates = ingestion._split_exact_duplicates(
+            items, lambda item: keys[item.pk], lambda item, digest: None, match="file",
+        )
+
+        self.assertEqual(originals, items[:2])
+        self.assertEqual(duplicates, [(items[2], items[0])])
+
+    def test_same_job_duplicate_reuses_the_applicant(self):
+        item = self.item(self.job)
+        created = item.applicant
+
+        ingestion._apply_duplicates(self.job, [(item, self.source)])
+
+        item.refresh_from_db()
+        self.assertEqual(item.state, IngestionItem.DONE)
+        self.assertEqual(item.applicant, self.source)
+        self.assertFalse(Applicant.objects.filter(pk=created.pk).exists())
+        self.assertEqual(Applicant.objects.filter(job_applied=self.job).count(), 1)
+
+    def test_other_job_duplicate_is_copied_and_scored(self):
+        item = self.item(self.other_job)
+
+        with mock.patch.object(scoring, "encode_long_texts") as encode:
+            ingestion._apply_duplicates(self.other_job, [(item, self.source)])
+        encode.assert_not_called()
+
+        item.refresh_from_db()
+        copy = item.applicant
+        self.assertEqual(item.state, IngestionItem.DONE)
+        self.assertNotEqual(copy.pk, self.source.pk)
+        self.assertEqual(copy.job_applied, self.other_job)
+        self.assertEqual(copy.resume_text, self.source.resume_text)
+        self.assertTrue(copy.embedding_stored)
+        self.assertEqual(copy.relevance, relevance_scores(_vector("Data engineer"), _vector("source")[None])[0])
+        self.assertEqual(set(copy.skills.values_list("skill__name", flat=True)), {"Python", "Django"})
+
+    def test_duplicate_of_an_unparsed_item_is_retried(self):
+        first, second = self.item(self.job), self.item(self.job)
+
+        ingestion._apply_duplicates(self.job, [(second, first)])
+
+        second.refresh_from_db()
+        self.assertEqual(second.state, IngestionItem.QUEUED)
+        self.assertEqual(second.attempts, 1)
+
+
+# ---------------------------
+# LLM response cache
+# ---------------------------
+class LLMCacheTests(TestCase):
+    def test_hit_after_set_and_empty_values_are_not_cached(self):
+        cache = LLMCache(DatabaseCacheBackend(ttl=3600, max_entries=100))
+
+        self.assertIsNone(cache.get("a"))
+        cache.set("a", "parse", {"profile": {"name": "Jane"}})
+        self.assertEqual(cache.get("a"), {"profile": {"name": "Jane"}})
+        for empty in (None, {}, ""):
+            cache.set("b", "parse", empty)
+            self.assertIsNone(cache.get("b"))
+
+        self.assertEqual((cache.hits, cache.misses), (1, 4))
+        self.assertEqual(LLMCacheEntry.objects.get(key="a").hits, 1)
+        self.assertFalse(LLMCacheEntry.objects.filter(key="b").exists())
+
+    def test_expired_entries_are_misses(self):
+        backend = DatabaseCacheBackend(ttl=60, max_entries=100)
+        backend.set("old", "parse", "value")
+        backend.set("new", "parse", "value")
+        LLMCacheEntry.objects.filter(key="old").update(created_at=timezone.now() - timedelta(seconds=61))
+
+        self.assertIsNone(backend.get("old"))
+        self.assertEqual(backend.get("new"), "value")
+        self.assertFalse(LLMCacheEntry.objects.filter(key="old").exists())
+
+    def test_least_recently_used_entries_are_evicted(self):
+        backend = DatabaseCacheBackend(ttl=0, max_entries=2)
+        for age, key in enumerate(("c", "b", "a")):
+            backend.set(key, "parse", key)
+            LLMCacheEntry.objects.filter(key=key).update(last_used_at=timezone.now() - timedelta(minutes=10 - age))
+        backend.get("c")
+
+        self.assertEqual(backend.evict(), 1)
+        self.assertEqual(set(LLMCacheEntry.objects.values_list("key", flat=True)), {"a", "c"})
+
+    def test_disk_backend_expiry_and_eviction(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        backend = DiskCacheBackend(directory, ttl=60, max_entries=2)
+        for age, key in enumerate(("cc", "bb", "aa")):
+            backend.set(key, "parse", key)
+            stamp = time.time() - 30 + age
+            os.utime(backend._path(key), (stamp, stamp))
+        backend.get("cc")
+
+        self.assertEqual(backend.evict(), 1)
+        self.assertIsNone(backend.get("bb"))
+        self.assertEqual(backend.get("aa"), "aa")
+
+        with open(backend._path("aa"), "w", encoding="utf-8") as f:
+            json.dump({"kind": "parse", "value": "aa", "created_at": time.time() - 61}, f)
+        self.assertIsNone(backend.get("aa"))
+        self.assertFalse(os.path.exists(backend._path("aa")))
+
+
+# ---------------------------
+# Import cost
+# ---------------------------
+class ImportTests(SimpleTestCase):
+    HEAVY = ("torch", "sentence_transformers", "spacy", "keybert", "docx")
+
+    def test_resume_filter_does_not_import_model_libraries(self):
+        # A fresh interpreter, so modules imported by other tests don't count
+        probe = (
+            "import json, sys; import api.utils.resume_filter; "
+            f"print(json.dumps(sorted(m for m in {self.HEAVY!r} if m in sys.modules)))"
+        )
+        proc = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, cwd=settings.BASE_DIR)
+
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertEqual(json.loads(proc.stdout.strip().splitlines()[-1]), [])
+
+    def test_resume_parser_imports_as_a_plain_module(self):
+        # test_resume_filter.py runs from api/utils and imports `resume_parser` directly
+        proc = subprocess.run([sys.executable, "-c", "import resume_parser"], capture_output=True, text=True,
+                              cwd=os.path.join(settings.BASE_DIR, "api", "utils"))
+
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+
+
+# ---------------------------
+# OpenAI dispatcher
+# ---------------------------
+def _completion(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, request=request, json={
+        "id": "chatcmpl-test", "object": "chat.completion", "created": 0, "model": "gpt-test",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "ok"}}],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+    })
+
+
+class OpenAIDispatcherTests(SimpleTestCase):
+    REQUEST = {"model": "gpt-test", "messages": [{"role": "user", "content": "resume"}], "max_tokens": 10}
+
+    def dispatcher(self, handler, **kwargs) -> OpenAIDispatcher:
+        options = {"api_key": "test", "base_url": "http://openai.test/v1", "backoff_base": 0.01, **kwargs}
+        return OpenAIDispatcher(transport=httpx.MockTransport(handler), **options)
+
+    def test_rate_limited_request_is_retried_after_retry_after(self):
+        calls = []
+
+        def handler(request):
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                return httpx.Response(429, request=request, headers={"retry-after": "0.3"}, json={"error": {}})
+            return _completion(request)
+
+        [response] = self.dispatcher(handler).run([self.REQUEST])
+
+        self.assertEqual(response.choices[0].message.content, "ok")
+        self.assertEqual(len(calls), 2)
+        self.assertGreaterEqual(calls[1] - calls[0], 0.3)
+
+    def test_gives_up_after_max_retries(self):
+        import openai
+
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(429, request=request, json={"error": {}})
+
+        [result] = self.dispatcher(handler, max_retries=2).run([self.REQUEST])
+
+        self.assertIsInstance(result, openai.RateLimitError)
+        self.assertEqual(len(calls), 3)
+
+    def test_client_errors_are_not_retried(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(400, request=request, json={"error": {}})
+
+        [result] = self.dispatcher(handler).run([self.REQUEST])
+
+        self.assertIsInstance(result, Exception)
+        self.assertEqual(len(calls), 1)
+
+    def test_concurrency_is_capped(self):
+        in_flight, peak = 0, 0
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.05)
+            in_flight -= 1
+            return _completion(request)
+
+        results = self.dispatcher(handler, max_concurrency=3).run([self.REQUEST] * 12)
+
+        self.assertEqual(len(results), 12)
+        self.assertFalse(any(isinstance(result, Exception) for result in results))
+        self.assertEqual(peak, 3)
@@ -2,10 +2,14 @@ from django.urls import path
 from .views import (
     JobListAPI,
     JobCreateAPI,
+    JobRescoreAPI,
     ApplicantListAPI,
     ApplicantSummaryAPI,
+    ApplicantSummaryBulkAPI,
     ResumeUploadAPI,
     ResumeUploadWithJobAPI,
+    IngestionBatchStatusAPI,
+    CandidateSearchAPI,
 )
 
 urlpatterns = [
@@ -14,12 +18,16 @@ urlpatterns = [
     # ---------------------------
     path("jobs/", JobListAPI.as_view(), name="job-list"),             # GET: list all jobs
     path("jobs/create/", JobCreateAPI.as_view(), name="job-create"),  # POST: create a new job
+    path("jobs/<uuid:job_u_id>/rescore/", JobRescoreAPI.as_view(), name="job-rescore"),  # POST: recompute relevance
 
     # ---------------------------
     # Applicant API Endpoints
     # ---------------------------
     path("jobs/<uuid:job_u_id>/applicants/", ApplicantListAPI.as_view(), name="applicant-list"),  # GET applicants by job
     path("applicants/<uuid:u_id>/summary/", ApplicantSummaryAPI.as_view(), name="applicant-summary"),  # GET single applicant summary
+    path("applicants/summaries/", ApplicantSummaryBulkAPI.as_view(), name="applicant-summaries"),  # POST: summaries for many u_ids
+
+    path("search/", CandidateSearchAPI.as_view(), name="candidate-search"),  # POST: top-k applicants across all jobs
 
     # ---------------------------
     # Resume Upload APIs
@@ -30,6 +38,9 @@ urlpatterns = [
     # Alias for frontend or Thunder Client POST
     path("post-resume-with-job/", ResumeUploadWithJobAPI.as_view(), name="post-resume-with-job"),
 
+    # Upload progress (uploads return 202 + batch_id and are processed by the worker pool)
+    path("batches/<uuid:u_id>/", IngestionBatchStatusAPI.as_view(), name="batch-status"),  # GET per-file state
+
     # ---------------------------
     # Frontend-specific Endpoints
     # ---------------------------
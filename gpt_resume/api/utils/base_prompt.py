@@ -3,6 +3,7 @@ from .prompts.projects_dict import projects_function_prompt
 from .prompts.relevancy_score_dict import relevancy_score_function_prompt
 from .prompts.academic_exp_dict import academic_experience_function_prompt
 from .prompts.professional_exp_dict import professional_experience_function_prompt
+from .prompts.explanation_dict import explanation_function_prompt
 
 base_function_prompt = [
     {
@@ -20,3 +21,18 @@ base_function_prompt = [
         },
     }
 ]
+
+# Single-call variant: the same parser also returns the ranking explanation,
+# so no second round trip (with the whole resume again) is needed.
+single_call_function_prompt = [
+    {
+        **base_function_prompt[0],
+        "parameters": {
+            **base_function_prompt[0]["parameters"],
+            "properties": {
+                **base_function_prompt[0]["parameters"]["properties"],
+                "explanation": explanation_function_prompt,
+            },
+        },
+    }
+]
@@ -0,0 +1,111 @@
+import uuid
+import numpy as np
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Q
+
+from ..models import Applicant, ApplicantChunk, ApplicantSkill, College, ProfessionalExperience, Project
+from .embeddings import EMBEDDING_MODEL_NAME, stack_vectors
+from .metrics import stage_timer
+from .response_cache import invalidate
+from .vector_index import global_index
+
+RESUME_DEDUP = {
+    "ENABLED": True,
+    # Cosine similarity of the resume vectors above which two resumes count as the same
+    "NEAR_DUPLICATE_SIMILARITY": 0.98,
+    # Global index hits checked per resume (0 disables near-duplicate detection)
+    "NEAR_DUPLICATE_CANDIDATES": 5,
+    **getattr(settings, "RESUME_DEDUP", {}),
+}
+
+
+# ---------------------------
+# Lookup
+# ---------------------------
+def parsed_applicants():
+    """Applicants whose resume went through the LLM parse (only then is resume_text stored)."""
+    return Applicant.objects.exclude(resume_text="")
+
+
+def exact_duplicate(applicant, file_hash: str = "", text_hash: str = ""):
+    """Parsed applicant with the same file or normalized-text hash, preferring one with a stored vector."""
+    if not RESUME_DEDUP["ENABLED"]:
+        return None
+    match = Q()
+    if file_hash:
+        match |= Q(file_hash=file_hash)
+    if text_hash:
+        match |= Q(text_hash=text_hash)
+    if not match:
+        return None
+    return parsed_applicants().filter(match).exclude(pk=applicant.pk).order_by("-embedding_stored").first()
+
+
+def near_duplicate(applicant, vector):
+    """
+    Parsed applicant whose stored resume vector is nearly identical to `vector`:
+    candidates come from the global vector index, then the exact cosine is checked.
+    """
+    candidates = RESUME_DEDUP["NEAR_DUPLICATE_CANDIDATES"]
+    if not RESUME_DEDUP["ENABLED"] or not candidates:
+        return None
+    vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+    hits = global_index(vector.shape[0]).search(vector, candidates)
+    rows = list(
+        parsed_applicants().filter(
+            u_id__in=[u_id for u_id, _ in hits], embedding_model=EMBEDDING_MODEL_NAME, embedding_dim=vector.shape[0],
+        ).exclude(pk=applicant.pk).values_list("u_id", "embedding")
+    )
+    if not rows:
+        return None
+    matrix = stack_vectors([blob for _, blob in rows], vector.shape[0])
+    norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(vector) or 1.0)
+    similarities = (matrix @ vector) / np.where(norms == 0, 1.0, norms)
+    best = int(np.argmax(similarities))
+    if similarities[best] < RESUME_DEDUP["NEAR_DUPLICATE_SIMILARITY"]:
+        return None
+    return Applicant.objects.filter(u_id=rows[best][0]).first()
+
+
+# ---------------------------
+# Copy
+# ---------------------------
+# Fields that only hold for the job the source applied to
+JOB_SPECIFIC_CHILD_FIELDS = {"relevance": 0, "explanation": ""}
+
+
+def _copy_rows(rows: list, **values) -> list:
+    """Turn fetched rows into unsaved copies with new primary keys and `values` set."""
+    for row in rows:
+        row.pk = uuid.uuid4() if isinstance(row._meta.pk, models.UUIDField) else None
+        row._state.adding = True
+        for name, value in values.items():
+            setattr(row, name, value)
+    return rows
+
+
+def copy_parsed(source: Applicant, target: Applicant) -> None:
+    """
+    Give `target` (an applicant for another job) the parse results of
+    `source`: profile, colleges, projects, experiences, skills, resume vector
+    and passage vectors. Nothing is extracted, sent to the LLM or encoded.
+    Relevance and explanations are job-specific and left for `target`'s job.
+    """
+    for name in ("resume_text", "text_hash", "name", "email", "parsed", "embedding", "embedding_model", "embedding_dim"):
+        setattr(target, name, getattr(source, name))
+    target.explanation = ""
+    target.embedding_stored = False
+
+    with stage_timer("db_write"), transaction.atomic():
+        target.save(update_fields=[
+            "resume_text", "text_hash", "name", "email", "parsed", "explanation", "embedding_stored",
+            "embedding", "embedding_model", "embedding_dim",
+        ])
+        for model in (College, Project, ProfessionalExperience):
+            fields = {name: value for name, value in JOB_SPECIFIC_CHILD_FIELDS.items() if hasattr(model, name)}
+            rows = _copy_rows(list(model.objects.filter(applicant=source)), applicant=target, **fields)
+            model.objects.bulk_create(rows)
+        ApplicantChunk.objects.bulk_create(_copy_rows(list(ApplicantChunk.objects.filter(applicant=source)), applicant=target))
+        ApplicantSkill.objects.bulk_create(_copy_rows(list(ApplicantSkill.objects.filter(applicant=source)), applicant=target))
+        invalidate(job_ids=[target.job_applied_id], applicant_ids=[target.pk])
@@ -0,0 +1,118 @@
+import re
+import numpy as np
+from django.conf import settings
+
+EMBEDDING_MODEL_NAME = getattr(settings, "EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2")
+EMBEDDING_DTYPE = np.float32
+# all-MiniLM-L6-v2 truncates at 256 word pieces (~190 words); longer texts are chunked.
+EMBEDDING_CHUNK_WORDS = getattr(settings, "EMBEDDING_CHUNK_WORDS", 180)
+EMBEDDING_CHUNK_OVERLAP = getattr(settings, "EMBEDDING_CHUNK_OVERLAP", 40)
+EMBEDDING_POOLING = getattr(settings, "EMBEDDING_POOLING", "mean")  # "mean" or "max"
+
+
+# ---------------------------
+# Helper: Vector <-> bytes
+# ---------------------------
+def vector_to_bytes(vector) -> bytes:
+    """Serialize a 1-D embedding into compact float32 bytes."""
+    return np.asarray(vector, dtype=EMBEDDING_DTYPE).reshape(-1).tobytes()
+
+
+def bytes_to_vector(blob, dim: int = None) -> np.ndarray:
+    """Deserialize float32 bytes back into a 1-D embedding."""
+    vector = np.frombuffer(bytes(blob), dtype=EMBEDDING_DTYPE)
+    if dim is not None and vector.shape[0] != dim:
+        raise ValueError(f"Stored embedding has {vector.shape[0]} dims, expected {dim}")
+    return vector
+
+
+def stack_vectors(blobs, dim: int) -> np.ndarray:
+    """Stack stored embeddings into one (n, dim) matrix without per-row copies."""
+    if not blobs:
+        return np.empty((0, dim), dtype=EMBEDDING_DTYPE)
+    return np.frombuffer(b"".join(bytes(b) for b in blobs), dtype=EMBEDDING_DTYPE).reshape(-1, dim)
+
+
+# ---------------------------
+# Chunking & pooling
+# ---------------------------
+def chunk_text(text: str, max_words: int = EMBEDDING_CHUNK_WORDS, overlap: int = EMBEDDING_CHUNK_OVERLAP) -> list:
+    """
+    Split text into passages of at most `max_words` words. Paragraphs (resume
+    sections are separated by blank lines) are packed together; a paragraph
+    longer than the limit is cut with a sliding window of `overlap` words.
+    """
+    chunks, current = [], []
+    for paragraph in re.split(r"\n\s*\n", text or ""):
+        words = paragraph.split()
+        if not words:
+            continue
+        if current and len(current) + len(words) > max_words:
+            chunks.append(" ".join(current))
+            current = []
+        if len(words) <= max_words:
+            current.extend(words)
+            continue
+        step = max(1, max_words - overlap)
+        for start in range(0, len(words), step):
+            chunks.append(" ".join(words[start:start + max_words]))
+            if start + max_words >= len(words):
+                break
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def pool_vectors(vectors: np.ndarray, mode: str = EMBEDDING_POOLING) -> np.ndarray:
+    """Combine chunk vectors into one L2-normalised document vector."""
+    pooled = vectors.max(axis=0) if mode == "max" else vectors.mean(axis=0)
+    norm = np.linalg.norm(pooled)
+    return (pooled / norm if norm else pooled).astype(EMBEDDING_DTYPE)
+
+
+# ---------------------------
+# Encoding & scoring
+# ---------------------------
+def encode_texts(embedder, texts: list, batch_size: int = 32) -> np.ndarray:
+    """Encode texts into L2-normalised float32 vectors so dot product == cosine."""
+    vectors = embedder.encode(
+        list(texts), batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True,
+    )
+    return np.asarray(vectors, dtype=EMBEDDING_DTYPE).reshape(len(texts), -1)
+
+
+def relevance_scores(job_vector, matrix: np.ndarray) -> np.ndarray:
+    """Cosine relevance (0-100) of every row in `matrix` against the job vector."""
+    if matrix.shape[0] == 0:
+        return np.empty(0, dtype=int)
+    scores = matrix @ np.asarray(job_vector, dtype=EMBEDDING_DTYPE).reshape(-1)
+    return np.clip(np.rint(scores * 100), 0, 100).astype(int)
+
+
+def store_embedding(obj, vector) -> None:
+    """Attach a vector to an (unsaved) applicant or job along with its model name and size."""
+    vector = np.asarray(vector, dtype=EMBEDDING_DTYPE).reshape(-1)
+    obj.embedding = vector_to_bytes(vector)
+    obj.embedding_model = EMBEDDING_MODEL_NAME
+    obj.embedding_dim = vector.shape[0]
+
+
+def encode_documents(embedder, texts: list, batch_size: int = 32) -> tuple:
+    """
+    Chunk every text, encode all chunks of all texts in one batched call and
+    pool them per text. Returns (pooled (n, dim) matrix, [(chunks, chunk_vectors)]).
+    """
+    per_text = [chunk_text(text) or [text or ""] for text in texts]
+    flat = [chunk for chunks in per_text for chunk in chunks]
+    vectors = encode_texts(embedder, flat, batch_size=batch_size)
+
+    pooled, chunked, start = [], [], 0
+    for chunks in per_text:
+        chunk_vectors = vectors[start:start + len(chunks)]
+        start += len(chunks)
+        pooled.append(pool_vectors(chunk_vectors))
+        chunked.append((chunks, chunk_vectors))
+    return np.vstack(pooled) if pooled else np.empty((0, 0), dtype=EMBEDDING_DTYPE), chunked
+
+
+EMBEDDING_FIELDS = ["embedding", "embedding_model", "embedding_dim"]
@@ -0,0 +1,21 @@
+import hashlib, json, re
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def sha256(value) -> str:
+    """Hex SHA-256 of a string, or of a JSON-serialisable value."""
+    if not isinstance(value, str):
+        value = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def normalize_text(text: str) -> str:
+    """Case- and whitespace-insensitive form of resume text, used for content hashing."""
+    return _WHITESPACE.sub(" ", text or "").strip().lower()
+
+
+def text_hash(text: str) -> str:
+    """Content hash of resume text; empty string when there is no text."""
+    normalized = normalize_text(text)
+    return sha256(normalized) if normalized else ""
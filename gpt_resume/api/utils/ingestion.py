@@ -0,0 +1,415 @@
+import uuid, logging, threading, time
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from ..models import Applicant, IngestionBatch, IngestionItem
+from .resume_dispatcher import ApplicantHandler, explain_many, populate_many
+from .pdf_extraction import get_extraction_pool
+from .dedup import RESUME_DEDUP, copy_parsed, exact_duplicate, near_duplicate
+from .embeddings import store_embedding
+from .hashing import text_hash
+from .metrics import INGESTION_DUPLICATES, INGESTION_ITEMS
+from .scoring import backfill_job_vectors, backfill_scores, encode_job, encode_long_texts, score_applicants, store_chunks
+from .vector_index import index_applicants
+from .uploads import store_upload
+
+logger = logging.getLogger(__name__)
+
+INGESTION_WORKERS = getattr(settings, "INGESTION_WORKERS", 2)
+INGESTION_CLAIM_SIZE = getattr(settings, "INGESTION_CLAIM_SIZE", 16)
+INGESTION_POLL_SECONDS = getattr(settings, "INGESTION_POLL_SECONDS", 2.0)
+INGESTION_STALE_SECONDS = getattr(settings, "INGESTION_STALE_SECONDS", 30 * 60)
+INGESTION_MAX_ATTEMPTS = getattr(settings, "INGESTION_MAX_ATTEMPTS", 3)
+# How often a running pool looks for items left in "processing" by a dead worker
+INGESTION_STALE_CHECK_SECONDS = getattr(settings, "INGESTION_STALE_CHECK_SECONDS", 60)
+# Unscored applicants handled per idle poll, so queued uploads keep priority
+INGESTION_BACKFILL_LIMIT = getattr(settings, "INGESTION_BACKFILL_LIMIT", 512)
+
+
+# ---------------------------
+# Producer side
+# ---------------------------
+def enqueue_upload(files, job) -> IngestionBatch:
+    """Store uploaded files (one streaming, hashing pass each) and queue one work item per file."""
+    batch = IngestionBatch.objects.create(job=job)
+    items = []
+    for file_obj in files:
+        stored = store_upload(file_obj)
+        item = IngestionItem(batch=batch, filename=stored.original_name, file_hash=stored.sha256, size=stored.size)
+        item.resume.name = stored.name
+        items.append(item)
+    IngestionItem.objects.bulk_create(items)
+    return batch
+
+
+# ---------------------------
+# Consumer side
+# ---------------------------
+def requeue_stale_items() -> int:
+    """
+    Put back items whose worker died mid-processing. Each one counts as a
+    failed attempt, so a file that keeps killing its worker ends up failed.
+    Returns the number of stale items found.
+    """
+    cutoff = timezone.now() - timedelta(seconds=INGESTION_STALE_SECONDS)
+    token = uuid.uuid4().hex
+    # Claimed first, so two pools checking at once don't count the same attempt twice
+    IngestionItem.objects.filter(state=IngestionItem.PROCESSING, started_at__lt=cutoff).update(claimed_by=token)
+    stale = list(IngestionItem.objects.filter(state=IngestionItem.PROCESSING, claimed_by=token).select_related("applicant"))
+    for item in stale:
+        logger.warning("Requeueing stale ingestion item", extra={"file": item.filename, "attempts": item.attempts + 1})
+        _fail(item, f"Worker stopped while processing (no progress for {INGESTION_STALE_SECONDS}s)")
+    return len(stale)
+
+
+def claim_items(limit: int = INGESTION_CLAIM_SIZE, batch_id=None) -> list:
+    """
+    Atomically claim up to `limit` queued items of the oldest pending batch
+    (or of `batch_id`). Claiming is a conditional UPDATE, so concurrent
+    workers (threads or processes) never pick up the same item.
+    """
+    head = batch_id or (
+        IngestionItem.objects.filter(state=IngestionItem.QUEUED)
+        .order_by("created_at")
+        .values_list("batch_id", flat=True)
+        .first()
+    )
+    if head is None:
+        return []
+
+    ids = list(
+        IngestionItem.objects.filter(state=IngestionItem.QUEUED, batch_id=head)
+        .order_by("created_at")
+        .values_list("pk", flat=True)[:limit]
+    )
+    token = uuid.uuid4().hex
+    IngestionItem.objects.filter(pk__in=ids, state=IngestionItem.QUEUED).update(
+        state=IngestionItem.PROCESSING, claimed_by=token, started_at=timezone.now(),
+    )
+    return list(IngestionItem.objects.filter(claimed_by=token).select_related("batch__job"))
+
+
+def _finish(item: IngestionItem, state: str, error: str = "") -> None:
+    INGESTION_ITEMS.labels(outcome=state).inc()
+    item.state = state
+    item.error = error
+    item.finished_at = timezone.now()
+    item.save(update_fields=["state", "error", "applicant", "finished_at"])
+
+
+def _fail(item: IngestionItem, error: str, retry: bool = True) -> None:
+    """
+    Requeue the item, or mark it failed once it ran out of attempts (or
+    right away when `retry` is False: the same file would fail the same way).
+    The applicant created for the item is kept across retries and deleted
+    when the item finally fails, so it never shows up half-empty in listings.
+    """
+    item.attempts += 1
+    if retry and item.attempts < INGESTION_MAX_ATTEMPTS:
+        INGESTION_ITEMS.labels(outcome="retried").inc()
+        item.state = IngestionItem.QUEUED
+        item.claimed_by = ""
+        item.error = error
+        item.save(update_fields=["state", "claimed_by", "attempts", "error", "applicant"])
+        return
+    applicant = item.applicant if item.applicant_id is not None else None
+    # Only the applicant created from this item's file, never a duplicate's source
+    if applicant is not None and applicant.resume.name == item.resume.name:
+        applicant.delete()
+        item.applicant = None
+    item.save(update_fields=["attempts"])
+    _finish(item, IngestionItem.FAILED, error)
+
+
+def _split_exact_duplicates(items: list, key, lookup, match: str) -> tuple:
+    """
+    Split items into (originals, [(item, source)]). The source is a parsed
+    applicant found by `lookup`, or an earlier item of this chunk with the
+    same `key` (handled once that one has been parsed).
+    """
+    originals, duplicates, first = [], [], {}
+    for item in items:
+        digest = key(item)
+        source = lookup(item, digest) or first.get(digest)
+        if source is not None:
+            INGESTION_DUPLICATES.labels(match=match).inc()
+            duplicates.append((item, source))
+            continue
+        if digest:
+            first[digest] = item
+        originals.append(item)
+    return originals, duplicates
+
+
+def _split_near_duplicates(parsed: list, handlers: list) -> tuple:
+    """
+    Encode the new resumes now and drop the ones whose vector is nearly the
+    same as a stored, parsed resume. The others keep their vectors and
+    passage vectors, so scoring does not encode them again.
+    """
+    if not RESUME_DEDUP["ENABLED"] or not RESUME_DEDUP["NEAR_DUPLICATE_CANDIDATES"]:
+        return parsed, handlers, []
+    pairs = [(item, handler) for item, handler in zip(parsed, handlers) if handler.text.strip()]
+    if not pairs:
+        return parsed, handlers, []
+    try:
+        vectors, chunked = encode_long_texts([handler.text for _, handler in pairs])
+    except Exception as e:
+        logger.exception(f"Near-duplicate check failed: {e}")
+        return parsed, handlers, []
+
+    near, encoded = {}, []
+    for (item, _), vector, chunks in zip(pairs, vectors, chunked):
+        source = near_duplicate(item.applicant, vector)
+        if source is not None:
+            INGESTION_DUPLICATES.labels(match="vector").inc()
+            near[item.pk] = source
+            continue
+        store_embedding(item.applicant, vector)
+        encoded.append((item.applicant, chunks))
+    if encoded:
+        store_chunks([applicant for applicant, _ in encoded], [chunks for _, chunks in encoded])
+    keep = [(item, handler) for item, handler in zip(parsed, handlers) if item.pk not in near]
+    return [item for item, _ in keep], [handler for _, handler in keep], [(item, near[item.pk]) for item in parsed if item.pk in near]
+
+
+def _apply_duplicates(job, duplicates: list) -> None:
+    """
+    Finish duplicate items from their source's parse. The same job keeps one
+    applicant (the item points at the existing one); another job gets a copy
+    of the parsed data, so only its explanation and scoring are computed.
+    """
+    copies = []
+    for item, source in duplicates:
+        if isinstance(source, IngestionItem):
+            source = Applicant.objects.filter(pk=source.applicant_id).exclude(resume_text="").first()
+            if source is None:
+                # Retried on its own once the first copy is no longer pending
+                _fail(item, "Duplicate of a resume in the same upload that could not be parsed")
+                continue
+        try:
+            if source.job_applied_id == job.u_id:
+                created, item.applicant = item.applicant, source
+                _finish(item, IngestionItem.DONE)
+                created.delete()
+            else:
+                copy_parsed(source, item.applicant)
+                copies.append(item)
+            logger.info("Duplicate resume reused an earlier parse", extra={
+                "file": item.filename, "source_applicant": str(source.u_id),
+            })
+        except Exception as e:
+            logger.exception(f"Error reusing parsed data for {item.filename}: {e}")
+            _fail(item, str(e))
+    if not copies:
+        return
+
+    applicants = [item.applicant for item in copies]
+    try:
+        explain_many([ApplicantHandler(applicant, text=applicant.resume_text) for applicant in applicants])
+    except Exception as e:
+        logger.exception(f"Error explaining duplicate resumes for job {job.u_id}: {e}")
+    try:
+        # Stored vectors are reused: this is only the job-specific scoring
+        score_applicants(applicants, encode_job(job))
+        index_applicants(applicants)
+    except Exception as e:
+        logger.exception(f"Failed to score duplicate resumes for job {job.u_id}: {e}")
+    for item in copies:
+        _finish(item, IngestionItem.DONE)
+
+
+def process_items(items: list) -> None:
+    """
+    Parse every claimed item (LLM calls run concurrently), then score them
+    together. Duplicates of already-parsed resumes (same file, same
+    normalized text or a near-identical vector) reuse that parse instead.
+    """
+    if not items:
+        return
+    job = items[0].batch.job
+
+    claimed = []
+    for item in items:
+        try:
+            if item.applicant_id is None:
+                item.applicant = Applicant.objects.create(
+                    job_applied=job, resume=item.resume.name, file_hash=item.file_hash,
+                )
+            claimed.append(item)
+        except Exception as e:
+            logger.exception(f"Error processing resume {item.filename}: {e}")
+            _fail(item, str(e))
+
+    # Known files skip extraction altogether
+    claimed, duplicates = _split_exact_duplicates(
+        claimed, lambda item: item.file_hash, lambda item, digest: exact_duplicate(item.applicant, file_hash=digest),
+        match="file",
+    )
+
+    # CPU-bound text extraction runs on the process pool; each worker reads its file once
+    results = get_extraction_pool().extract_many([item.resume.path for item in claimed])
+
+    extracted, texts = [], {}
+    for item, result in zip(claimed, results):
+        if result.error:
+            logger.warning("Text extraction failed", extra={
+                "stage": "pdf_extract", "file": item.filename, "error": result.error,
+            })
+            # Extraction is deterministic: a corrupt or hanging PDF fails the same way again
+            _fail(item, result.error, retry=False)
+            continue
+        logger.info("Extracted resume text", extra={
+            "stage": "pdf_extract", "file": item.filename, "pages": result.page_count,
+            "elapsed_ms": round(result.elapsed_ms),
+        })
+        texts[item.pk] = result.text
+        extracted.append(item)
+
+    parsed, same_text = _split_exact_duplicates(
+        extracted, lambda item: text_hash(texts[item.pk]),
+        lambda item, digest: exact_duplicate(item.applicant, text_hash=digest), match="text",
+    )
+    duplicates += same_text
+    handlers = [ApplicantHandler(item.applicant, text=texts[item.pk]) for item in parsed]
+    parsed, handlers, near = _split_near_duplicates(parsed, handlers)
+    duplicates += near
+
+    if parsed:
+        try:
+            errors = populate_many(handlers)
+        except Exception as e:
+            logger.exception(f"Error parsing resumes for job {job.u_id}: {e}")
+            errors = [e] * len(parsed)
+        for item, error in zip(parsed, errors):
+            if error is not None:
+                _fail(item, str(error) or type(error).__name__)
+        parsed = [item for item, error in zip(parsed, errors) if error is None]
+
+    if parsed:
+        try:
+            applicants = [item.applicant for item in parsed]
+            score_applicants(applicants, encode_job(job))
+            index_applicants(applicants)
+        except Exception as e:
+            logger.exception(f"Failed to compute embeddings for job {job.u_id}: {e}")
+
+        for item in parsed:
+            _finish(item, IngestionItem.DONE)
+
+    # After the originals, so duplicates within this chunk can reuse their parse
+    if duplicates:
+        _apply_duplicates(job, duplicates)
+
+
+def drain_once(limit: int = INGESTION_CLAIM_SIZE) -> int:
+    """Claim and process one chunk. Returns the number of items handled."""
+    items = claim_items(limit)
+    process_items(items)
+    return len(items)
+
+
+# ---------------------------
+# Local worker pool
+# ---------------------------
+class IngestionWorkerPool:
+    """
+    Threads that drain the DB-backed queue and, when it is empty, backfill
+    relevance for unscored applicants. Several pools (e.g. one per
+    gunicorn worker plus `manage.py run_ingestion_workers`) can share the
+    same queue safely.
+    """
+
+    def __init__(self, workers: int = INGESTION_WORKERS, claim_size: int = INGESTION_CLAIM_SIZE,
+                 poll_seconds: float = INGESTION_POLL_SECONDS):
+        self.workers = workers
+        self.claim_size = claim_size
+        self.poll_seconds = poll_seconds
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._backfill_lock = threading.Lock()
+        self._stale_lock = threading.Lock()
+        self._stale_checked_at = 0.0
+        self._threads = []
+
+    def start(self) -> None:
+        if self.is_running():
+            return
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"ingestion-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def is_running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def stop(self, timeout: float = None) -> None:
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def join(self) -> None:
+        for thread in self._threads:
+            thread.join()
+
+    def _backfill(self) -> int:
+        """When the queue is empty, one thread encodes missing job vectors and scores unscored applicants."""
+        if not self._backfill_lock.acquire(blocking=False):
+            return 0
+        try:
+            return backfill_job_vectors(limit=INGESTION_BACKFILL_LIMIT) + backfill_scores(limit=INGESTION_BACKFILL_LIMIT)
+        finally:
+            self._backfill_lock.release()
+
+    def _requeue_stale(self) -> None:
+        """Every INGESTION_STALE_CHECK_SECONDS, one thread requeues items of dead workers."""
+        if time.monotonic() - self._stale_checked_at < INGESTION_STALE_CHECK_SECONDS:
+            return
+        if not self._stale_lock.acquire(blocking=False):
+            return
+        try:
+            self._stale_checked_at = time.monotonic()
+            requeue_stale_items()
+        finally:
+            self._stale_lock.release()
+
+    def _run(self) -> None:
+        try:
+            while not self._stop.is_set():
+                close_old_connections()
+                try:
+                    self._requeue_stale()
+                    handled = drain_once(self.claim_size) or self._backfill()
+                except Exception as e:
+                    logger.exception(f"Ingestion worker error: {e}")
+                    handled = 0
+                if not handled:
+                    self._wake.wait(self.poll_seconds)
+                    self._wake.clear()
+        finally:
+            connection.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def ensure_workers() -> IngestionWorkerPool:
+    """Start the in-process worker pool on first use and wake it up."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = IngestionWorkerPool()
+        if getattr(settings, "INGESTION_AUTOSTART", True):
+            _pool.start()
+    _pool.wake()
+    return _pool
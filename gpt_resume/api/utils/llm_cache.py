@@ -0,0 +1,210 @@
+import json, logging, os, threading, time
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import LLMCacheEntry
+from .hashing import sha256
+from .metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE = {
+    "BACKEND": "db",          # "db" (LLMCacheEntry table), "disk" or "none"
+    "TTL": 30 * 24 * 3600,    # seconds; 0 disables expiry
+    "MAX_ENTRIES": 50_000,    # least-recently-used entries beyond this are evicted
+    "DIRECTORY": os.path.join(settings.MEDIA_ROOT, "llm_cache"),
+    **getattr(settings, "LLM_CACHE", {}),
+}
+
+# Evict at most once every N writes to keep `set` cheap.
+EVICT_EVERY = 64
+
+
+def cache_key(kind: str, text: str, job_text: str, model: str, prompt_hash: str) -> str:
+    """One key per (call type, resume text, job text, model, prompt)."""
+    parts = [kind, sha256(text or ""), sha256(job_text or ""), model, prompt_hash]
+    return sha256("\x1f".join(parts))
+
+
+# ---------------------------
+# Backends
+# ---------------------------
+class DatabaseCacheBackend:
+    """Stores entries in the LLMCacheEntry table."""
+
+    def __init__(self, ttl: int, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    def get(self, key: str):
+        entry = LLMCacheEntry.objects.filter(key=key).first()
+        if entry is None:
+            return None
+        now = timezone.now()
+        if self.ttl and entry.created_at < now - timedelta(seconds=self.ttl):
+            entry.delete()
+            return None
+        LLMCacheEntry.objects.filter(key=key).update(last_used_at=now, hits=F("hits") + 1)
+        return entry.value
+
+    def set(self, key: str, kind: str, value) -> None:
+        now = timezone.now()
+        LLMCacheEntry.objects.update_or_create(
+            key=key, defaults={"kind": kind, "value": value, "created_at": now, "last_used_at": now},
+        )
+
+    def evict(self) -> int:
+        removed = 0
+        if self.ttl:
+            cutoff = timezone.now() - timedelta(seconds=self.ttl)
+            removed += LLMCacheEntry.objects.filter(created_at__lt=cutoff).delete()[0]
+        overflow = LLMCacheEntry.objects.count() - self.max_entries
+        if overflow > 0:
+            stale = LLMCacheEntry.objects.order_by("last_used_at").values_list("key", flat=True)[:overflow]
+            removed += LLMCacheEntry.objects.filter(key__in=list(stale)).delete()[0]
+        return removed
+
+    def clear(self) -> None:
+        LLMCacheEntry.objects.all().delete()
+
+
+class DiskCacheBackend:
+    """One JSON file per entry under DIRECTORY; mtime doubles as last-used time."""
+
+    def __init__(self, directory: str, ttl: int, max_entries: int):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self.ttl and entry.get("created_at", 0) < time.time() - self.ttl:
+            self._remove(path)
+            return None
+        os.utime(path)
+        return entry.get("value")
+
+    def set(self, key: str, kind: str, value) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"kind": kind, "value": value, "created_at": time.time()}, f)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _entries(self) -> list:
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        entries.append((os.path.getmtime(path), path))
+                    except OSError:
+                        pass
+        return entries
+
+    def evict(self) -> int:
+        entries = sorted(self._entries())
+        overflow = max(0, len(entries) - self.max_entries)
+        for _, path in entries[:overflow]:
+            self._remove(path)
+        removed = overflow
+        if self.ttl:
+            # mtime is refreshed on reads, so only files untouched for TTL are dropped here;
+            # `get` enforces the TTL on creation time.
+            cutoff = time.time() - self.ttl
+            for mtime, path in entries[overflow:]:
+                if mtime < cutoff:
+                    self._remove(path)
+                    removed += 1
+        return removed
+
+    def clear(self) -> None:
+        for _, path in self._entries():
+            self._remove(path)
+
+
+# ---------------------------
+# Cache front
+# ---------------------------
+class LLMCache:
+    """Thin wrapper adding hit/miss counters and periodic eviction to a backend."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        if self.backend is None:
+            return None
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"LLM cache read failed: {e}")
+            value = None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        CACHE_REQUESTS.labels(cache="llm", result="miss" if value is None else "hit").inc()
+        return value
+
+    def set(self, key: str, kind: str, value) -> None:
+        if self.backend is None or value in (None, {}, ""):
+            return
+        try:
+            self.backend.set(key, kind, value)
+            with self._lock:
+                self._writes += 1
+                evict = self._writes % EVICT_EVERY == 0
+            if evict:
+                self.backend.evict()
+        except Exception as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "backend": LLM_CACHE["BACKEND"],
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+            }
+
+
+def _build_backend():
+    name = LLM_CACHE["BACKEND"]
+    if name == "db":
+        return DatabaseCacheBackend(LLM_CACHE["TTL"], LLM_CACHE["MAX_ENTRIES"])
+    if name == "disk":
+        return DiskCacheBackend(LLM_CACHE["DIRECTORY"], LLM_CACHE["TTL"], LLM_CACHE["MAX_ENTRIES"])
+    if name in ("none", None, ""):
+        return None
+    raise ValueError(f"Unknown LLM_CACHE backend: {name}")
+
+
+llm_cache = LLMCache(_build_backend())
@@ -0,0 +1,142 @@
+import os, time
+from contextlib import contextmanager
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram
+from prometheus_client import generate_latest, multiprocess, start_http_server
+from prometheus_client.core import GaugeMetricFamily
+
+# ---------------------------
+# Registry
+# ---------------------------
+# With PROMETHEUS_MULTIPROC_DIR set (before this module is imported), every
+# process (gunicorn workers, run_ingestion_workers) writes its samples to
+# files in that directory and a scrape of any one of them adds them all up.
+# Without it, each process only exposes its own values.
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR", "")
+if MULTIPROC_DIR:
+    os.makedirs(MULTIPROC_DIR, exist_ok=True)
+
+
+# ---------------------------
+# Pipeline metrics
+# ---------------------------
+# Stages: pdf_extract, openai_parse, openai_explain, embedding, db_write, listing
+STAGE_SECONDS = Histogram(
+    "resume_stage_duration_seconds", "Time spent per pipeline stage call.", ("stage",),
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+STAGE_ERRORS = Counter("resume_stage_errors_total", "Failed pipeline stage calls.", ("stage",))
+STAGE_ITEMS = Counter("resume_stage_items_total", "Resumes (or rows) handled per pipeline stage.", ("stage",))
+
+OPENAI_TOKENS = Counter(
+    "openai_tokens_total", "OpenAI token usage reported in response.usage.", ("kind", "type"),
+)
+OPENAI_REQUESTS = Counter("openai_requests_total", "OpenAI chat completion requests.", ("kind", "outcome"))
+OPENAI_RETRIES = Counter("openai_retries_total", "OpenAI requests retried after a retryable error.")
+
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups by cache and result.", ("cache", "result"))
+
+INGESTION_ITEMS = Counter("ingestion_items_total", "Queue items finished, by outcome.", ("outcome",))
+INGESTION_DUPLICATES = Counter("ingestion_duplicates_total", "Resumes that reused an earlier parse.", ("match",))
+
+
+# ---------------------------
+# Database gauges (read at scrape time, the same for every process)
+# ---------------------------
+def _queue_depth() -> dict:
+    from django.db.models import Count
+    from ..models import IngestionItem
+
+    states = (IngestionItem.QUEUED, IngestionItem.PROCESSING)
+    depth = dict.fromkeys(states, 0)
+    rows = IngestionItem.objects.filter(state__in=states).values_list("state").annotate(n=Count("pk"))
+    for state, n in rows:
+        depth[state] = n
+    return depth
+
+
+def _pending_scoring() -> int:
+    from .scoring import pending_applicants
+
+    return pending_applicants().count()
+
+
+class PipelineCollector:
+    """Queue depth and scoring backlog, queried from the database on each scrape."""
+
+    def _families(self) -> tuple:
+        return (
+            GaugeMetricFamily("ingestion_queue_depth", "Queue items waiting or being processed.", labels=("state",)),
+            GaugeMetricFamily("applicants_pending_scoring", "Applicants with text but no relevance yet."),
+        )
+
+    def describe(self):
+        # Lets the registry check names without running the queries
+        return self._families()
+
+    def collect(self):
+        queue_depth, pending = self._families()
+        for state, n in _queue_depth().items():
+            queue_depth.add_metric((state,), n)
+        pending.add_metric((), _pending_scoring())
+        return queue_depth, pending
+
+
+PIPELINE_COLLECTOR = PipelineCollector()
+REGISTRY.register(PIPELINE_COLLECTOR)
+
+
+def scrape_registry():
+    """Registry to expose: every process's samples in multiprocess mode, else this process's."""
+    if not MULTIPROC_DIR:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(PIPELINE_COLLECTOR)
+    return registry
+
+
+def render() -> bytes:
+    return generate_latest(scrape_registry())
+
+
+def serve_metrics(port: int, addr: str = "0.0.0.0") -> None:
+    """Expose the metrics on their own HTTP port (for processes without the Django endpoint)."""
+    start_http_server(port, addr, registry=scrape_registry())
+
+
+# ---------------------------
+# Helpers
+# ---------------------------
+def observe_stage(stage: str, seconds: float, items: int = 1, error: bool = False) -> None:
+    """Record one call of a pipeline stage that handled `items` resumes/rows."""
+    STAGE_SECONDS.labels(stage=stage).observe(seconds)
+    STAGE_ITEMS.labels(stage=stage).inc(items)
+    if error:
+        STAGE_ERRORS.labels(stage=stage).inc()
+
+
+@contextmanager
+def stage_timer(stage: str, items: int = 1):
+    """Time the `with` block as one call of `stage`; an exception counts as an error."""
+    started = time.perf_counter()
+    error = False
+    try:
+        yield
+    except Exception:
+        error = True
+        raise
+    finally:
+        observe_stage(stage, time.perf_counter() - started, items, error)
+
+
+def record_openai_response(kind: str, response=None, error: Exception = None) -> None:
+    """Count one OpenAI call of `kind` (parse / explain) and its token usage."""
+    OPENAI_REQUESTS.labels(kind=kind, outcome="error" if error is not None else "ok").inc()
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    for name in ("prompt_tokens", "completion_tokens"):
+        tokens = getattr(usage, name, None)
+        if tokens:
+            OPENAI_TOKENS.labels(kind=kind, type=name.split("_")[0]).inc(tokens)
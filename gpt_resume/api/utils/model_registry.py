@@ -0,0 +1,122 @@
+import logging, os, threading, time
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------
+# Registry
+# ---------------------------
+class ModelRegistry:
+    """
+    Loads each model on first use and keeps one instance per process.
+    Nothing heavy is imported until a model is requested, so management
+    commands and migrations start without paying for SBERT/spaCy.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._instances = {}
+        self._fork_safe = {}
+        self.load_times = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, loader, fork_safe: bool = True) -> None:
+        """`fork_safe=False` drops the instance in forked children (e.g. HTTP clients)."""
+        self._loaders[name] = loader
+        self._fork_safe[name] = fork_safe
+
+    def get(self, name: str):
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._lock:
+            if name not in self._instances:
+                started = time.perf_counter()
+                self._instances[name] = self._loaders[name]()
+                self.load_times[name] = time.perf_counter() - started
+                logger.info(f"Loaded model '{name}' in {self.load_times[name]:.2f}s")
+            return self._instances[name]
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def loaded(self) -> list:
+        return list(self._instances)
+
+    def preload(self, names=None) -> None:
+        for name in self._loaders if names is None else names:
+            self.get(name)
+
+    def _after_fork(self) -> None:
+        # The lock may have been held by another thread at fork time.
+        self._lock = threading.RLock()
+        for name, safe in self._fork_safe.items():
+            if not safe:
+                self._instances.pop(name, None)
+
+
+registry = ModelRegistry()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=registry._after_fork)
+
+
+# ---------------------------
+# Loaders
+# ---------------------------
+def _setting(name: str, default):
+    # resume_filter can be used as a plain library without Django configured
+    return getattr(settings, name, default) if settings.configured else default
+
+
+def _load_embedder():
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(_setting("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2"))
+
+
+def _load_nlp():
+    import spacy
+
+    return spacy.load(_setting("SPACY_MODEL", "en_core_web_sm"))
+
+
+def _load_keybert():
+    from keybert import KeyBERT
+
+    # Reuse the SBERT backbone instead of loading a second copy
+    return KeyBERT(model=get_embedder())
+
+
+def _load_openai():
+    from openai import OpenAI
+
+    return OpenAI(api_key=settings.OPENAI_API_KEY, base_url=getattr(settings, "OPENAI_BASE_URL", None))
+
+
+registry.register("embedder", _load_embedder)
+registry.register("nlp", _load_nlp)
+registry.register("keybert", _load_keybert)
+registry.register("openai", _load_openai, fork_safe=False)
+
+
+def get_embedder():
+    return registry.get("embedder")
+
+
+def get_nlp():
+    return registry.get("nlp")
+
+
+def get_keybert():
+    return registry.get("keybert")
+
+
+def get_openai_client():
+    return registry.get("openai")
+
+
+def preload_models(names=None) -> None:
+    """Load `names` (default settings.MODEL_PRELOAD) now, e.g. from a gunicorn post_fork hook."""
+    names = names if names is not None else _setting("MODEL_PRELOAD", [])
+    registry.preload(names)
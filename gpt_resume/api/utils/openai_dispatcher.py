@@ -0,0 +1,193 @@
+import asyncio, logging, random, threading, time
+from django.conf import settings
+
+from .metrics import OPENAI_RETRIES, observe_stage, record_openai_response
+
+logger = logging.getLogger(__name__)
+
+OPENAI_MAX_CONCURRENCY = getattr(settings, "OPENAI_MAX_CONCURRENCY", 8)
+OPENAI_REQUESTS_PER_MINUTE = getattr(settings, "OPENAI_REQUESTS_PER_MINUTE", 500)
+OPENAI_TOKENS_PER_MINUTE = getattr(settings, "OPENAI_TOKENS_PER_MINUTE", 200_000)
+OPENAI_MAX_RETRIES = getattr(settings, "OPENAI_MAX_RETRIES", 5)
+OPENAI_BACKOFF_BASE = getattr(settings, "OPENAI_BACKOFF_BASE", 1.0)
+OPENAI_BACKOFF_MAX = getattr(settings, "OPENAI_BACKOFF_MAX", 60.0)
+
+
+# ---------------------------
+# Rate limiting
+# ---------------------------
+class TokenBucket:
+    """
+    Refills `rate_per_minute` units per minute up to `capacity`.
+    Reservations are taken under a thread lock and may drive the level
+    negative; the caller then sleeps for the deficit. That keeps one bucket
+    valid across threads and event loops (each worker runs its own loop).
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: float = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` units and return how long to wait before using them."""
+        with self._lock:
+            self._refill()
+            self.level -= min(amount, self.capacity)
+            return 0.0 if self.level >= 0 else -self.level / self.rate
+
+    def refund(self, amount: float) -> None:
+        if amount <= 0:
+            return
+        with self._lock:
+            self._refill()
+            self.level = min(self.capacity, self.level + amount)
+
+    async def acquire(self, amount: float = 1) -> None:
+        delay = self.reserve(amount)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def estimate_tokens(request: dict) -> int:
+    """Rough prompt + completion token count (~4 chars per token)."""
+    chars = sum(len(str(m.get("content") or "")) for m in request.get("messages", []))
+    chars += len(str(request.get("functions") or ""))
+    return chars // 4 + int(request.get("max_tokens") or 0)
+
+
+def _is_retryable(error: Exception) -> bool:
+    import openai
+
+    if isinstance(error, (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+def _retry_after(error: Exception):
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+# ---------------------------
+# Dispatcher
+# ---------------------------
+class OpenAIDispatcher:
+    """
+    Runs many chat completion requests concurrently against AsyncOpenAI,
+    bounded by a semaphore and by process-wide request/token buckets, with
+    jittered exponential backoff on 429, 5xx and connection errors.
+    """
+
+    def __init__(self, max_concurrency: int = OPENAI_MAX_CONCURRENCY,
+                 requests_per_minute: int = OPENAI_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: int = OPENAI_TOKENS_PER_MINUTE,
+                 max_retries: int = OPENAI_MAX_RETRIES,
+                 backoff_base: float = OPENAI_BACKOFF_BASE, backoff_max: float = OPENAI_BACKOFF_MAX,
+                 api_key: str = None, base_url: str = None, transport=None):
+        self.max_concurrency = max_concurrency
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.api_key = api_key or settings.OPENAI_API_KEY
+        self.base_url = base_url or getattr(settings, "OPENAI_BASE_URL", None)
+        # Optional httpx.AsyncBaseTransport (e.g. httpx.MockTransport in tests)
+        self.transport = transport
+
+    def _client(self):
+        # Imported here: the openai package alone costs ~1s of startup.
+        from openai import AsyncOpenAI
+
+        http_client = None
+        if self.transport is not None:
+            import httpx
+
+            http_client = httpx.AsyncClient(transport=self.transport)
+        # SDK retries are disabled; the dispatcher owns backoff so limits stay accurate.
+        return AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0, http_client=http_client)
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            return retry_after + random.uniform(0, self.backoff_base)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def _create(self, client, semaphore: asyncio.Semaphore, request: dict, kind: str = "chat"):
+        estimate = estimate_tokens(request)
+        for attempt in range(self.max_retries + 1):
+            await self.request_bucket.acquire(1)
+            await self.token_bucket.acquire(estimate)
+            started = time.perf_counter()
+            try:
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.chat.completions.create(**request)
+            except Exception as e:
+                if not _is_retryable(e) or attempt == self.max_retries:
+                    observe_stage(f"openai_{kind}", time.perf_counter() - started, error=True)
+                    record_openai_response(kind, error=e)
+                    raise
+                delay = self._backoff(attempt, e)
+                OPENAI_RETRIES.inc()
+                logger.warning(
+                    "OpenAI call failed, retrying",
+                    extra={"kind": kind, "error": e.__class__.__name__, "attempt": attempt + 1, "delay_s": round(delay, 1)},
+                )
+                await asyncio.sleep(delay)
+                continue
+
+            observe_stage(f"openai_{kind}", time.perf_counter() - started)
+            record_openai_response(kind, response)
+
+            usage = getattr(response, "usage", None)
+            if usage is not None and getattr(usage, "total_tokens", None):
+                self.token_bucket.refund(estimate - usage.total_tokens)
+            return response
+
+    async def gather(self, requests: list, kinds: list = None) -> list:
+        """
+        Run all requests; each slot holds a response or the exception it raised.
+        `kinds` labels each request in the metrics (e.g. "parse", "explain").
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        client = self._client()
+        kinds = kinds or ["chat"] * len(requests)
+        try:
+            return await asyncio.gather(
+                *(self._create(client, semaphore, request, kind) for request, kind in zip(requests, kinds)),
+                return_exceptions=True,
+            )
+        finally:
+            await client.close()
+
+    def run(self, requests: list, kinds: list = None) -> list:
+        """Blocking entry point for sync callers (views, worker threads, commands)."""
+        if not requests:
+            return []
+        return asyncio.run(self.gather(requests, kinds))
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> OpenAIDispatcher:
+    """Process-wide dispatcher so every worker thread shares the same rate limits."""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = OpenAIDispatcher()
+    return _dispatcher
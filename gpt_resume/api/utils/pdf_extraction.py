@@ -0,0 +1,218 @@
+import logging, multiprocessing, os, re, threading, time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+
+from .metrics import observe_stage
+
+logger = logging.getLogger(__name__)
+
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+
+
+@dataclass
+class ExtractionResult:
+    text: str = ""
+    page_count: int = 0
+    elapsed_ms: float = 0.0
+    error: str = ""
+
+
+# ---------------------------
+# Worker side (runs in the pool processes)
+# ---------------------------
+def _warm_up() -> None:
+    """Pool initializer: import PyMuPDF once per worker instead of on the first file."""
+    import fitz  # noqa: F401
+
+
+def normalize_text(text: str) -> str:
+    """Collapse runs of blank lines and trailing spaces left by page-by-page extraction."""
+    lines = (line.rstrip() for line in text.splitlines())
+    return _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
+
+
+def extract_pdf(source, max_pages: int = 3) -> ExtractionResult:
+    """Extract text from the first `max_pages` pages of a PDF given as a path or bytes."""
+    import fitz
+
+    started = time.perf_counter()
+    try:
+        if isinstance(source, (bytes, bytearray)):
+            data = bytes(source)
+        else:
+            with open(source, "rb") as f:
+                data = f.read()
+        with fitz.open(stream=data, filetype="pdf") as doc:
+            pages = []
+            for i, page in enumerate(doc):
+                if max_pages and i >= max_pages:
+                    break
+                pages.append(page.get_text())
+            page_count = doc.page_count
+        return ExtractionResult(normalize_text("\n".join(pages)), page_count, (time.perf_counter() - started) * 1000)
+    except Exception as e:
+        return ExtractionResult(elapsed_ms=(time.perf_counter() - started) * 1000, error=str(e))
+
+
+# ---------------------------
+# Pool
+# ---------------------------
+class ExtractionPool:
+    """
+    CPU-bound PDF extraction on a ProcessPoolExecutor so it scales with cores
+    and stays off the GIL. Workers are spawned (not forked: the web process
+    runs ingestion threads) and warmed up by importing PyMuPDF. A file that
+    runs past `timeout` seconds after it started is reported as failed and
+    the pool is recycled, since a stuck worker process cannot be interrupted
+    otherwise.
+    """
+
+    def __init__(self, workers: int, timeout: float, max_pages: int):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self._executor = None
+        self._lock = threading.Lock()
+        # Shared by every thread using the pool: no more files in flight than processes
+        self._slots = threading.BoundedSemaphore(max(1, workers))
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """
+        The current executor; a new one has every process started and warmed
+        up before it is returned, so process start-up never counts against a
+        file's timeout.
+        """
+        with self._lock:
+            if self._executor is None:
+                executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_up,
+                )
+                for future in [executor.submit(_warm_up) for _ in range(self.workers)]:
+                    future.result()
+                self._executor = executor
+            return self._executor
+
+    def warm_up(self) -> None:
+        """Start every worker process now rather than on the first batch."""
+        if self.workers > 0:
+            self._get_executor()
+
+    def _recycle(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        # ProcessPoolExecutor has no public way to kill a busy worker.
+        for process in list(getattr(executor, "_processes", {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def extract_many(self, sources: list) -> list:
+        """Extract every source (path or bytes); results come back in input order."""
+        results = self._extract_many(sources)
+        for result in results:
+            observe_stage("pdf_extract", result.elapsed_ms / 1000, error=bool(result.error))
+        return results
+
+    def _extract_many(self, sources: list) -> list:
+        """
+        At most `workers` files are in flight across all threads, so a
+        submitted file starts right away and its deadline runs from
+        submission. A file past its deadline fails with a timeout; the pool
+        is then recycled (a stuck process cannot be interrupted otherwise)
+        and the other in-flight files are resubmitted. Files in flight when
+        a worker crashed are retried alone, and fail if it crashes again.
+        """
+        if self.workers <= 0:
+            return [extract_pdf(source, self.max_pages) for source in sources]
+
+        results = [None] * len(sources)
+        crashes = [0] * len(sources)
+        todo = list(range(len(sources)))
+        in_flight = {}  # future -> (source index, deadline)
+        executor = self._get_executor()
+        while todo or in_flight:
+            while todo:
+                # Files in flight during a crash are retried one at a time, so a second crash is theirs
+                if crashes[todo[0]] and in_flight:
+                    break
+                # Wait for a free process only when there is nothing of ours to wait on
+                if not self._slots.acquire(blocking=not in_flight):
+                    break
+                i = todo.pop(0)
+                try:
+                    future = executor.submit(extract_pdf, sources[i], self.max_pages)
+                except RuntimeError:  # recycled (or broken) by another thread
+                    self._recycle(executor)
+                    executor = self._get_executor()
+                    future = executor.submit(extract_pdf, sources[i], self.max_pages)
+                in_flight[future] = (i, time.monotonic() + self.timeout)
+                if crashes[i]:
+                    break
+
+            next_deadline = min(deadline for _, deadline in in_flight.values())
+            done, _ = wait(in_flight, timeout=max(0.0, next_deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            broken = False
+            for future in done:
+                i, _ = in_flight.pop(future)
+                self._slots.release()
+                try:
+                    results[i] = future.result()
+                except BrokenProcessPool as e:
+                    crashes[i] += 1
+                    broken = True
+                    if crashes[i] >= 2:
+                        results[i] = ExtractionResult(error=str(e))
+                    else:
+                        todo.insert(0, i)
+                except Exception as e:
+                    results[i] = ExtractionResult(error=str(e))
+
+            now = time.monotonic()
+            expired = [future for future, (_, deadline) in in_flight.items() if deadline <= now]
+            for future in expired:
+                i, _ = in_flight.pop(future)
+                self._slots.release()
+                results[i] = ExtractionResult(
+                    elapsed_ms=self.timeout * 1000, error=f"Extraction timed out after {self.timeout}s",
+                )
+                logger.warning(f"PDF extraction timed out: {sources[i]!r:.120}")
+            if broken or expired:
+                # Healthy files in flight on the old pool start over on a fresh one
+                todo[:0] = [i for i, _ in in_flight.values()]
+                for _ in in_flight:
+                    self._slots.release()
+                in_flight = {}
+                self._recycle(executor)
+                executor = self._get_executor()
+        return results
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_extraction_pool() -> ExtractionPool:
+    """Process-wide extraction pool configured from settings.PDF_EXTRACTION."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            from django.conf import settings
+
+            config = {
+                "WORKERS": max(1, (os.cpu_count() or 2) - 1),
+                "TIMEOUT": 30,
+                "MAX_PAGES": 3,
+                # resume_filter can be used as a plain library without Django configured
+                **(getattr(settings, "PDF_EXTRACTION", {}) if settings.configured else {}),
+            }
+            _pool = ExtractionPool(config["WORKERS"], config["TIMEOUT"], config["MAX_PAGES"])
+    return _pool
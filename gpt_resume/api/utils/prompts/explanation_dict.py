@@ -0,0 +1,4 @@
+explanation_function_prompt = {
+    "type": "string",
+    "description": "Explain in 2-3 sentences why this candidate is suitable for the job, based on the resume and the job description. Mention the most relevant skills, projects or experiences. If the candidate is not a good fit, say so and explain why.",
+}
@@ -0,0 +1,117 @@
+import hashlib, uuid
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from rest_framework.renderers import JSONRenderer
+
+from .hashing import sha256
+from .metrics import CACHE_REQUESTS
+
+RESPONSE_CACHE_ALIAS = getattr(settings, "RESPONSE_CACHE_ALIAS", "default")
+RESPONSE_CACHE_TIMEOUT = getattr(settings, "RESPONSE_CACHE_TIMEOUT", 3600)
+
+
+def _cache():
+    return caches[RESPONSE_CACHE_ALIAS]
+
+
+# ---------------------------
+# Version tokens
+# ---------------------------
+# Every cached response records the tokens of what it was built from
+# (the job, the applicant). Writes replace those tokens, which makes every
+# dependent entry stale without having to know their keys.
+def job_token_key(job_id) -> str:
+    return f"rc:job:{job_id}"
+
+
+def applicant_token_key(applicant_id) -> str:
+    return f"rc:applicant:{applicant_id}"
+
+
+def current_tokens(keys: list) -> dict:
+    """Current token for every key, creating missing ones."""
+    cache = _cache()
+    tokens = cache.get_many(keys)
+    missing = {key: uuid.uuid4().hex for key in keys if key not in tokens}
+    if missing:
+        cache.set_many(missing, None)
+        tokens.update(missing)
+    return tokens
+
+
+def _bump(keys: list) -> None:
+    if keys:
+        _cache().set_many({key: uuid.uuid4().hex for key in keys}, None)
+
+
+def invalidate(job_ids=(), applicant_ids=()) -> None:
+    """
+    Mark cached responses of these jobs/applicants stale once the current
+    transaction commits (so a concurrent reader cannot cache pre-commit data
+    under the new token). Call this after bulk writes that skip signals.
+    """
+    keys = [job_token_key(i) for i in set(job_ids) if i] + [applicant_token_key(i) for i in set(applicant_ids) if i]
+    if keys:
+        transaction.on_commit(lambda: _bump(keys))
+
+
+# ---------------------------
+# View mixin
+# ---------------------------
+class CachedResponseMixin:
+    """
+    Caches the rendered JSON of a GET and serves it with an ETag; a request
+    whose If-None-Match matches gets a 304 without touching the database.
+    Views define `cache_key_parts()` and `cache_dependencies()`.
+    """
+    cache_prefix = "rc:view"
+    # Response headers stored with the body and replayed on hits
+    cached_headers = ()
+
+    def cache_key_parts(self) -> list:
+        raise NotImplementedError
+
+    def cache_dependencies(self) -> list:
+        raise NotImplementedError
+
+    def _cache_key(self) -> str:
+        params = "&".join(f"{k}={v}" for k, v in sorted(self.request.query_params.items()))
+        return f"{self.cache_prefix}:{':'.join(map(str, self.cache_key_parts()))}:{sha256(params)[:16]}"
+
+    def _serve(self, request, entry):
+        if request.headers.get("If-None-Match") == entry["etag"]:
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(entry["body"], content_type="application/json")
+        response["ETag"] = entry["etag"]
+        for name, value in entry["headers"].items():
+            response[name] = value
+        return response
+
+    def get(self, request, *args, **kwargs):
+        cache = _cache()
+        key = self._cache_key()
+        entry = cache.get(key)
+        if entry is not None and cache.get_many(list(entry["tokens"])) == entry["tokens"]:
+            CACHE_REQUESTS.labels(cache="response", result="hit").inc()
+            return self._serve(request, entry)
+        CACHE_REQUESTS.labels(cache="response", result="miss").inc()
+
+        # Tokens are read before building the response, so a write that lands
+        # meanwhile leaves this entry stale instead of hiding the write.
+        tokens = current_tokens(self.cache_dependencies())
+        response = super().get(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+
+        body = JSONRenderer().render(response.data)
+        entry = {
+            "etag": f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            "body": body,
+            "headers": {name: response[name] for name in self.cached_headers if response.has_header(name)},
+            "tokens": tokens,
+        }
+        cache.set(key, entry, RESPONSE_CACHE_TIMEOUT)
+        return self._serve(request, entry)
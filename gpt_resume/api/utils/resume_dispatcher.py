@@ -1,16 +1,41 @@
-from .base_prompt import base_function_prompt
+from .base_prompt import base_function_prompt, single_call_function_prompt
+from .openai_dispatcher import get_dispatcher
+from .llm_cache import cache_key, llm_cache
+from .hashing import sha256, text_hash
+from .model_registry import get_openai_client
+from .pdf_extraction import extract_pdf, get_extraction_pool
+from .metrics import observe_stage, record_openai_response, stage_timer
+from .skill_index import applicant_skill_names, index_skills, parsed_tech_stacks
 from ..serializers import ApplicantSerializer  # Fixed import
 from ..models import Applicant, College, Project, ProfessionalExperience, Job
-import os, json
+import os, json, logging, time
 from django.conf import settings
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import fitz
-from openai import OpenAI
+from django.db import transaction
 from dotenv import load_dotenv
 from datetime import datetime
 
 load_dotenv()
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+logger = logging.getLogger(__name__)
+OPENAI_MODEL = getattr(settings, "OPENAI_MODEL", "gpt-3.5-turbo")
+# One OpenAI call per resume (parse + explanation). Set False to use the separate explanation call.
+OPENAI_SINGLE_CALL = getattr(settings, "OPENAI_SINGLE_CALL", True)
+parse_function_prompt = single_call_function_prompt if OPENAI_SINGLE_CALL else base_function_prompt
+
+
+def _allowed_fields(model) -> frozenset:
+    """Concrete fields the LLM output may set (primary key and FK are filled in here)."""
+    return frozenset(f.name for f in model._meta.concrete_fields if f.name not in ("u_id", "applicant"))
+
+
+# Field whitelists are computed once at import instead of per created row.
+COLLEGE_FIELDS = _allowed_fields(College)
+PROJECT_FIELDS = _allowed_fields(Project)
+PROFESSIONAL_EXPERIENCE_FIELDS = _allowed_fields(ProfessionalExperience)
+APPLICANT_PARSE_FIELDS = ["resume_text", "text_hash", "name", "email", "relevance", "explanation", "embedding_stored"]
+
+EXPLAIN_INSTRUCTION = "Explain in 2-3 sentences why this candidate is suitable for the job."
+PARSE_PROMPT_HASH = sha256(parse_function_prompt)
+EXPLAIN_PROMPT_HASH = sha256(EXPLAIN_INSTRUCTION)
 
 
 # ---------------------------
@@ -44,20 +69,24 @@ def normalize_date(value):
 
 
 class ApplicantHandler:
-    def __init__(self, applicant: Applicant):
+    def __init__(self, applicant: Applicant, pdf_bytes: bytes = None, text: str = None):
         self.applicant = applicant
-        self.openai = client
-        self.text = self._extract_text_data_from_pdf()
+        # `text` comes pre-extracted from the ingestion extraction pool
+        self.text = text if text is not None else self._extract_text_data_from_pdf(pdf_bytes)
+        self.parsed = {}
 
-    def _update_resume(self, data: dict, relevance: int) -> None:
+    def _update_resume(self, data: dict, relevance: int, explanation: str = None) -> None:
         self.applicant.resume_text = self.text or ""
+        self.applicant.text_hash = text_hash(self.text)
         self.applicant.name = data.get("name", "")
         self.applicant.email = data.get("email", "")
         self.applicant.relevance = relevance
+        if explanation:
+            self.applicant.explanation = explanation
         self.applicant.embedding_stored = False
-        self.applicant.save()
+        self.applicant.save(update_fields=APPLICANT_PARSE_FIELDS)
 
-    def _create_college(self, data: dict) -> None:
+    def _build_college(self, data: dict):
         if data:
             if "start_date" in data:
                 data["start_date"] = normalize_date(data["start_date"])
@@ -69,18 +98,16 @@ class ApplicantHandler:
                 data["branch"] = "Unknown"
 
             # ✅ Filter only valid fields
-            allowed_fields = {f.name for f in College._meta.get_fields()}
-            clean_data = {k: v for k, v in data.items() if k in allowed_fields}
-            College.objects.create(**clean_data, applicant=self.applicant)
+            clean_data = {k: v for k, v in data.items() if k in COLLEGE_FIELDS}
+            return College(**clean_data, applicant=self.applicant)
 
-    def _create_project(self, data: dict) -> None:
+    def _build_project(self, data: dict):
         if data:
             # ✅ Filter invalid keys like duration_months
-            allowed_fields = {f.name for f in Project._meta.get_fields()}
-            clean_data = {k: v for k, v in data.items() if k in allowed_fields}
-            Project.objects.create(**clean_data, applicant=self.applicant)
+            clean_data = {k: v for k, v in data.items() if k in PROJECT_FIELDS}
+            return Project(**clean_data, applicant=self.applicant)
 
-    def _create_professional_experience(self, data: dict) -> None:
+    def _build_professional_experience(self, data: dict):
         if data:
             if "start_date" in data:
                 data["start_date"] = normalize_date(data["start_date"])
@@ -88,98 +115,278 @@ class ApplicantHandler:
                 data["end_date"] = normalize_date(data["end_date"])
 
             # ✅ Filter invalid keys safely
-            allowed_fields = {f.name for f in ProfessionalExperience._meta.get_fields()}
-            clean_data = {k: v for k, v in data.items() if k in allowed_fields}
-            ProfessionalExperience.objects.create(**clean_data, applicant=self.applicant)
+            clean_data = {k: v for k, v in data.items() if k in PROFESSIONAL_EXPERIENCE_FIELDS}
+            return ProfessionalExperience(**clean_data, applicant=self.applicant)
 
-    def _extract_text_data_from_pdf(self) -> str:
-        if not getattr(self.applicant.resume, "path", None):
+    def _extract_text_data_from_pdf(self, pdf_bytes: bytes = None) -> str:
+        if pdf_bytes is None and not self.applicant.resume.name:
             return ""
+        # Same extraction as the process pool, run inline for one-off handlers
+        source = pdf_bytes if pdf_bytes is not None else os.path.abspath(self.applicant.resume.path)
+        result = extract_pdf(source, get_extraction_pool().max_pages)
+        observe_stage("pdf_extract", result.elapsed_ms / 1000, error=bool(result.error))
+        if result.error:
+            logger.error("Error reading PDF", extra={
+                "stage": "pdf_extract", "applicant": str(self.applicant.u_id), "file": str(self.applicant.resume),
+                "error": result.error,
+            })
+        return result.text
+
+    def _cache_key(self, kind: str, prompt_hash: str) -> str:
+        job = self.applicant.job_applied
+        job_text = f"{job.job_title}\n{job.job_description}"
+        return cache_key(kind, self.text, job_text, OPENAI_MODEL, prompt_hash)
+
+    def parse_cache_key(self) -> str:
+        return self._cache_key("parse", PARSE_PROMPT_HASH)
+
+    def explain_cache_key(self) -> str:
+        return self._cache_key("explain", EXPLAIN_PROMPT_HASH)
+
+    def parse_request(self) -> dict:
+        """Chat completion kwargs for the structured parse call."""
+        return dict(
+            model=OPENAI_MODEL,
+            messages=[
+                {"role": "user", "content": self.text},
+                {"role": "user",
+                 "content": f"Job Title: {self.applicant.job_applied.job_title}\n"
+                            f"Job Description: {self.applicant.job_applied.job_description}"},
+            ],
+            functions=parse_function_prompt,
+            function_call="auto",
+            temperature=1,
+            max_tokens=2000,
+            top_p=1,
+        )
+
+    @staticmethod
+    def parse_response(response) -> dict:
+        # ✅ Fixed for latest SDK
+        arguments = None
+        if hasattr(response.choices[0].message, "function_call"):
+            arguments = response.choices[0].message.function_call.arguments
+        elif hasattr(response.choices[0].message, "function"):
+            arguments = response.choices[0].message.function.arguments
+
+        return json.loads(arguments) if arguments else {}
+
+    @staticmethod
+    def _complete(kind: str, request: dict):
+        """One synchronous chat completion, timed and counted under `kind`."""
+        started = time.perf_counter()
         try:
-            file_path = os.path.abspath(self.applicant.resume.path)
-            doc = fitz.open(file_path)
-            text = ""
-            for i, page in enumerate(doc):
-                text += page.get_text() + "\n"
-                if i >= 2:  # only first 3 pages
-                    break
-            doc.close()
-            return text.strip()
+            response = get_openai_client().chat.completions.create(**request)
         except Exception as e:
-            print(f"Error reading PDF {self.applicant.resume}: {e}")
-            return ""
+            observe_stage(f"openai_{kind}", time.perf_counter() - started, error=True)
+            record_openai_response(kind, error=e)
+            raise
+        observe_stage(f"openai_{kind}", time.perf_counter() - started)
+        record_openai_response(kind, response)
+        return response
 
     def parse_resume(self):
         if not self.text:
             return {}
+        key = self.parse_cache_key()
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return cached
         try:
-            response = self.openai.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "user", "content": self.text},
-                    {"role": "user",
-                     "content": f"Job Title: {self.applicant.job_applied.job_title}\n"
-                                f"Job Description: {self.applicant.job_applied.job_description}"},
-                ],
-                functions=base_function_prompt,
-                function_call="auto",
-                temperature=1,
-                max_tokens=2000,
-                top_p=1,
-            )
-
-            # ✅ Fixed for latest SDK
-            arguments = None
-            if hasattr(response.choices[0].message, "function_call"):
-                arguments = response.choices[0].message.function_call.arguments
-            elif hasattr(response.choices[0].message, "function"):
-                arguments = response.choices[0].message.function.arguments
-
-            return json.loads(arguments) if arguments else {}
+            data = self.parse_response(self._complete("parse", self.parse_request()))
         except Exception as e:
-            print(f"OpenAI API error: {e}")
+            logger.error("OpenAI parse failed", extra={
+                "stage": "openai_parse", "applicant": str(self.applicant.u_id), "error": str(e),
+            })
             return {}
+        llm_cache.set(key, "parse", data)
+        return data
+
+    def explain_request(self) -> dict:
+        """Chat completion kwargs for the ranking explanation call."""
+        return dict(
+            model=OPENAI_MODEL,
+            messages=[{"role": "user",
+                       "content": f"Resume:\n{self.text}\n\nJob Title: {self.applicant.job_applied.job_title}\n"
+                                  f"Job Description:\n{self.applicant.job_applied.job_description}\n"
+                                  f"{EXPLAIN_INSTRUCTION}"}],
+            temperature=0.7,
+            max_tokens=200
+        )
+
+    @staticmethod
+    def explain_response(response) -> str:
+        return response.choices[0].message.content.strip()
+
+    def save_explanation(self, explanation: str) -> str:
+        self.applicant.explanation = explanation
+        self.applicant.save(update_fields=["explanation"])
+        return explanation
+
+    def generate_explanation(self):
+        """Explanation text from the cache or a new OpenAI call; None on failure."""
+        if not self.text or not self.applicant.job_applied:
+            return None
+        key = self.explain_cache_key()
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return cached
+        try:
+            explanation = self.explain_response(self._complete("explain", self.explain_request()))
+        except Exception as e:
+            logger.error("OpenAI explanation failed", extra={
+                "stage": "openai_explain", "applicant": str(self.applicant.u_id), "error": str(e),
+            })
+            return None
+        llm_cache.set(key, "explain", explanation)
+        return explanation
 
     def explain_ranking(self) -> str:
         """Generate explanation for applicant using OpenAI."""
         if not self.text or not self.applicant.job_applied:
             return "No resume text or job info available."
-        try:
-            response = self.openai.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user",
-                           "content": f"Resume:\n{self.text}\n\nJob Title: {self.applicant.job_applied.job_title}\n"
-                                      f"Job Description:\n{self.applicant.job_applied.job_description}\n"
-                                      f"Explain in 2-3 sentences why this candidate is suitable for the job."}],
-                temperature=0.7,
-                max_tokens=200
-            )
-            explanation = response.choices[0].message.content.strip()
-            self.applicant.explanation = explanation
-            self.applicant.save(update_fields=["explanation"])
-            return explanation
-        except Exception as e:
-            print(f"OpenAI explanation error: {e}")
+        explanation = self.generate_explanation()
+        if explanation is None:
             return "No explanation available."
+        return self.save_explanation(explanation)
+
+    def apply_parsed(self, final_data: dict, explanation: str = None) -> bool:
+        """
+        Persist parsed profile, colleges, projects and experiences in one
+        transaction: one applicant UPDATE plus one bulk INSERT per child table.
+        Returns False if nothing was parsed.
+        """
+        if not final_data:
+            return False
+        self.parsed = final_data
+
+        if explanation is None and OPENAI_SINGLE_CALL:
+            explanation = (final_data.get("explanation") or "").strip()
+
+        colleges = [self._build_college(final_data.get("college"))]
+        projects = [self._build_project(p) for p in (final_data.get("projects") or [])]
+        experiences = [self._build_professional_experience(e) for e in (final_data.get("professional_experiences") or [])]
+
+        with stage_timer("db_write"), transaction.atomic():
+            self._update_resume(final_data.get("profile", {}), final_data.get("relevance", 0), explanation)
+            for model, rows in ((College, colleges), (Project, projects), (ProfessionalExperience, experiences)):
+                rows = [row for row in rows if row is not None]
+                if rows:
+                    model.objects.bulk_create(rows)
+        return True
+
+    def skill_entry(self) -> tuple:
+        """(applicant, canonical skills) from the resume text and the parsed tech stacks."""
+        return self.applicant, applicant_skill_names(self.text, parsed_tech_stacks(self.parsed))
+
+    def needs_explanation(self) -> bool:
+        """True if the parse step did not already fill in the explanation."""
+        return not self.applicant.explanation
 
     def populate_fields(self):
         """Parse resume, populate fields, and generate explanation."""
         final_data = self.parse_resume()
         if not final_data:
             return
+        # Two-call mode: fetch the explanation first so the applicant is written once.
+        explanation = None if OPENAI_SINGLE_CALL else self.generate_explanation()
+        applied = self.apply_parsed(final_data, explanation)
+        index_skills([self.skill_entry()])
+        if applied and self.needs_explanation():
+            self.explain_ranking()
+
+
+def _resolve_calls(calls: list) -> list:
+    """
+    Resolve LLM calls given as (cache key, request builder, response parser,
+    kind). Cache hits are returned as-is and all misses go out concurrently
+    through the dispatcher; calls sharing a cache key (the same resume twice
+    in one batch) are sent once. Slots hold the result or the exception raised.
+    """
+    results = [llm_cache.get(key) for key, _, _, _ in calls]
+    misses = {}
+    for i, result in enumerate(results):
+        if result is None:
+            misses.setdefault(calls[i][0], []).append(i)
+
+    responses = get_dispatcher().run(
+        [calls[slots[0]][1]() for slots in misses.values()], kinds=[calls[slots[0]][3] for slots in misses.values()],
+    )
+    for slots, response in zip(misses.values(), responses):
+        if not isinstance(response, Exception):
+            key, _, parse, kind = calls[slots[0]]
+            try:
+                response = parse(response)
+                llm_cache.set(key, kind, response)
+            except Exception as e:
+                response = e
+        for i in slots:
+            results[i] = response
+    return results
+
+
+def _explain_call(handler):
+    return (handler.explain_cache_key(), handler.explain_request, handler.explain_response, "explain")
+
+
+def populate_many(handlers: list) -> list:
+    """
+    Same as calling `populate_fields` on every handler, but cached results
+    are reused and every remaining call goes out concurrently through the
+    async dispatcher. In two-call mode parse and explanation calls run side
+    by side, so each applicant is still persisted in a single step.
+    Returns one entry per handler: None, or the exception its parse (or
+    save) ended with, so the caller can retry or fail that resume.
+    """
+    errors = [None] * len(handlers)
+    positions = [i for i, h in enumerate(handlers) if h.text]
+    with_text = [handlers[i] for i in positions]
+    calls = [(h.parse_cache_key(), h.parse_request, h.parse_response, "parse") for h in with_text]
+    if not OPENAI_SINGLE_CALL:
+        calls += [_explain_call(h) for h in with_text]
+    results = _resolve_calls(calls)
+    explanations = results[len(with_text):] or [None] * len(with_text)
+
+    applied = []
+    for position, handler, result, explanation in zip(positions, with_text, results, explanations):
+        if isinstance(result, Exception):
+            logger.error("OpenAI parse failed", extra={
+                "stage": "openai_parse", "applicant": str(handler.applicant.u_id), "error": str(result),
+            })
+            errors[position] = result
+            continue
+        if isinstance(explanation, Exception):
+            logger.error("OpenAI explanation failed", extra={
+                "stage": "openai_explain", "applicant": str(handler.applicant.u_id), "error": str(explanation),
+            })
+            explanation = None
+        try:
+            if handler.apply_parsed(result, explanation):
+                applied.append(handler)
+        except Exception as e:
+            logger.exception("Saving parsed resume failed", extra={
+                "stage": "db_write", "applicant": str(handler.applicant.u_id), "error": str(e),
+            })
+            errors[position] = e
 
-        self._update_resume(final_data.get("profile", {}), final_data.get("relevance", 0))
-
-        if final_data.get("college"):
-            self._create_college(final_data.get("college"))
+    # Skills index for the whole batch (text-only skills when the parse failed)
+    index_skills([h.skill_entry() for h in with_text])
 
-        for project in (final_data.get("projects") or []):
-            self._create_project(project)
+    # Single-call mode fallback: the model left the explanation field empty.
+    explain_many(applied)
+    return errors
 
-        for exp in (final_data.get("professional_experiences") or []):
-            self._create_professional_experience(exp)
 
-        self.explain_ranking()
+def explain_many(handlers: list) -> None:
+    """Fetch and save the ranking explanation of every handler that has none yet, concurrently."""
+    missing = [h for h in handlers if h.text and h.needs_explanation()]
+    for handler, result in zip(missing, _resolve_calls([_explain_call(h) for h in missing])):
+        if isinstance(result, Exception):
+            logger.error("OpenAI explanation failed", extra={
+                "stage": "openai_explain", "applicant": str(handler.applicant.u_id), "error": str(result),
+            })
+            continue
+        handler.save_explanation(result)
 
 
 # ---------------------------
@@ -201,13 +408,33 @@ def handle_applicant(file_path: str, job: Job):
 
 def manage_pdf_files(files: list, job: Job):
     responses = []
-    with ThreadPoolExecutor(max_workers=2) as executor:
-        futures = {executor.submit(handle_applicant, f, job): f for f in files}
-        for future in as_completed(futures):
-            try:
-                responses.append(future.result())
-            except Exception as e:
-                print(f"Error processing {futures[future]}: {e}")
+    created = []
+    for f in files:
+        serializer = ApplicantSerializer(data={"resume": f, "job_applied": job.u_id})
+        if not serializer.is_valid():
+            responses.append({"success": False, "errors": serializer.errors})
+            continue
+        created.append((serializer.save(), serializer))
+
+    handlers = []
+    for applicant, serializer in created:
+        try:
+            handlers.append((ApplicantHandler(applicant), serializer))
+        except Exception as e:
+            applicant.delete()
+            responses.append({"success": False, "message": str(e), "resume": serializer.data})
+
+    try:
+        errors = populate_many([handler for handler, _ in handlers])
+    except Exception as e:
+        logger.exception("Error processing resume batch", extra={"job": str(job.u_id), "error": str(e)})
+        errors = [e] * len(handlers)
+    for (handler, serializer), error in zip(handlers, errors):
+        if error is not None:
+            handler.applicant.delete()
+            responses.append({"success": False, "message": str(error), "resume": serializer.data})
+            continue
+        responses.append({"success": True, "message": "Resume added successfully", "resume": serializer.data})
     return responses
 
 
@@ -1,72 +1,122 @@
 import os
 import re
-import docx
+import logging
 import numpy as np
-import faiss
-import spacy
-from keybert import KeyBERT
-from sentence_transformers import SentenceTransformer
-from pdfminer.high_level import extract_text
 
-# -------------------------------
-# Load NLP models once
-# -------------------------------
-nlp = spacy.load("en_core_web_sm")
-kw_model = KeyBERT()
-embedder = SentenceTransformer("all-MiniLM-L6-v2")
+from .model_registry import get_embedder, get_keybert, get_nlp
+from .pdf_extraction import get_extraction_pool
+
+logger = logging.getLogger(__name__)
 
 
 # -------------------------------
 # Extract text from resumes
 # -------------------------------
-def extract_resume_text(file_path: str) -> str:
+def _normalize(text: str) -> str:
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def _extract_other(file_path: str) -> str:
+    """Text of a .docx or .txt resume (PDFs go through the extraction pool)."""
     text = ""
     try:
-        if file_path.endswith(".pdf"):
-            text = extract_text(file_path)
-        elif file_path.endswith(".docx"):
+        if file_path.endswith(".docx"):
+            import docx  # only needed for .docx resumes
+
             doc = docx.Document(file_path)
             text = " ".join([p.text for p in doc.paragraphs])
         elif file_path.endswith(".txt"):
             with open(file_path, "r", encoding="utf-8") as f:
                 text = f.read()
-        # Normalize text
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = _normalize(text)
     except Exception as e:
-        print(f"[ERROR] Failed to extract text from {file_path}: {e}")
+        logger.error("Failed to extract text", extra={"file": file_path, "error": str(e)})
     return text
 
 
+def extract_resume_text(file_path: str) -> str:
+    """Text of a .pdf, .docx or .txt resume ("" if it cannot be read)."""
+    return extract_resume_texts([file_path])[0]
+
+
+def extract_resume_texts(file_paths: list) -> list:
+    """
+    Extract many resumes; order is preserved. PDFs run on the shared
+    extraction pool, so PDF_EXTRACT_TIMEOUT and PDF_MAX_PAGES apply and a
+    bad file comes back empty instead of hanging the batch.
+    """
+    texts = [_extract_other(path) if not path.endswith(".pdf") else "" for path in file_paths]
+    pdfs = [i for i, path in enumerate(file_paths) if path.endswith(".pdf")]
+    for i, result in zip(pdfs, get_extraction_pool().extract_many([file_paths[i] for i in pdfs])):
+        if result.error:
+            logger.error("Failed to extract text", extra={"file": file_paths[i], "error": result.error})
+            continue
+        texts[i] = _normalize(result.text)
+    return texts
+
+
 # -------------------------------
 # Extract structured entities
 # -------------------------------
-def extract_entities(text: str, top_n_keywords: int = 10) -> dict:
-    doc = nlp(text)
-    emails = re.findall(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}", text)
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}")
 
-    # Extract names using spaCy
-    names = [ent.text for ent in doc.ents if ent.label_ == "PERSON"]
 
-    # Extract keywords/skills using KeyBERT
-    skills = [kw[0] for kw in kw_model.extract_keywords(
-        text,
+def _ner_pipes(nlp) -> list:
+    """Pipes needed for NER: `ner` plus a shared tok2vec if `ner` listens to it."""
+    keep = ["ner"]
+    for name, pipe in nlp.pipeline:
+        if "ner" in getattr(pipe, "listening_components", []):
+            keep.append(name)
+    return keep
+
+
+def extract_entities_batch(texts: list, top_n_keywords: int = 10, batch_size: int = 32,
+                           n_process: int = 1, doc_embeddings: np.ndarray = None) -> list:
+    """
+    Entities for many resumes at once.
+    - Names: one `nlp.pipe` stream with every pipe except NER disabled.
+    - Skills: KeyBERT on the shared SBERT model. Resume vectors are computed
+      in one batched encode (or passed in as `doc_embeddings`, e.g. the stored
+      ones) so KeyBERT does not embed each resume again.
+    """
+    if not texts:
+        return []
+
+    nlp = get_nlp()
+    disabled = [name for name in nlp.pipe_names if name not in _ner_pipes(nlp)]
+    names = [
+        [ent.text for ent in doc.ents if ent.label_ == "PERSON"]
+        for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process, disable=disabled)
+    ]
+
+    if doc_embeddings is None:
+        doc_embeddings = get_embedder().encode(texts, batch_size=batch_size)
+    keywords = get_keybert().extract_keywords(
+        texts,
         keyphrase_ngram_range=(1, 2),
         stop_words="english",
-        top_n=top_n_keywords
-    )]
+        top_n=top_n_keywords,
+        doc_embeddings=np.asarray(doc_embeddings),
+    )
+    # A single document comes back as a flat list of (keyword, score)
+    if len(texts) == 1:
+        keywords = [keywords]
+
+    return [
+        {"names": doc_names, "emails": EMAIL_RE.findall(text), "skills": [kw[0] for kw in doc_keywords]}
+        for text, doc_names, doc_keywords in zip(texts, names, keywords)
+    ]
 
-    return {
-        "names": names,
-        "emails": emails,
-        "skills": skills
-    }
+
+def extract_entities(text: str, top_n_keywords: int = 10) -> dict:
+    return extract_entities_batch([text], top_n_keywords)[0]
 
 
 # -------------------------------
 # Get embedding for a text
 # -------------------------------
 def get_embedding(text: str) -> np.ndarray:
-    vec = embedder.encode([text])[0]
+    vec = get_embedder().encode([text])[0]
     return np.array(vec, dtype="float32")
 
 
@@ -74,6 +124,8 @@ def get_embedding(text: str) -> np.ndarray:
 # Build FAISS index from resume texts
 # -------------------------------
 def build_faiss_index(resume_texts: list):
+    import faiss
+
     embeddings = [get_embedding(text) for text in resume_texts if text.strip()]
     if not embeddings:
         raise ValueError("No valid resume texts found.")
@@ -1,10 +1,17 @@
 import os
 import re
+import logging
 import fitz  # PyMuPDF
-import docx
 import numpy as np
 import faiss
 
+try:
+    from .skills import trie_pattern, get_skill_matcher, lower_aligned
+except ImportError:  # imported as a top-level module, e.g. by test_resume_filter.py
+    from skills import trie_pattern, get_skill_matcher, lower_aligned
+
+logger = logging.getLogger(__name__)
+
 # ---------------------------
 # Extract text from PDF, DOCX, or TXT
 # ---------------------------
@@ -22,17 +29,19 @@ def extract_resume_text(file_path):
 
         elif file_path.lower().endswith(".docx"):
             try:
+                import docx  # optional dependency, only needed for .docx resumes
+
                 doc = docx.Document(file_path)
                 text = " ".join([p.text for p in doc.paragraphs])
             except Exception as e:
-                print(f"[ERROR] Reading DOCX {file_path}: {e}")
+                logger.error("Error reading DOCX", extra={"file": file_path, "error": str(e)})
 
         elif file_path.lower().endswith(".txt"):
             with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
                 text = f.read()
 
     except Exception as e:
-        print(f"[ERROR] Reading file {file_path}: {e}")
+        logger.error("Error reading resume file", extra={"file": file_path, "error": str(e)})
 
     # Normalize text
     text = text.replace("\n", " ").strip()
@@ -43,69 +52,121 @@ def extract_resume_text(file_path):
 # ---------------------------
 # Extract structured entities
 # ---------------------------
+# Compiled once at import; extract_entities makes one pass per pattern.
+EMAIL_RE = re.compile(r'[\w\.-]+@[\w\.-]+')
+PHONE_RE = re.compile(r'\+?\d[\d\s\-]{8,15}\d')
+COLLEGE_KEYWORD_RE = re.compile(r'University|College|Institute|Academy')
+_UPPER_RE = re.compile(r'[A-Z]')
+_COLLEGE_NAME_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ &")
+
+
+def find_colleges(text: str) -> list:
+    """
+    Same matches as findall(r'[A-Z][a-zA-Z &]{2,}(?:University|College|Institute|Academy)'),
+    but anchored on the keywords: each run of name characters around a keyword
+    is walked once instead of being backtracked from every capital letter.
+    """
+    colleges = []
+    run_end, match = -1, None
+    for keyword in COLLEGE_KEYWORD_RE.finditer(text):
+        k = keyword.start()
+        if k >= run_end:
+            # First keyword of a new run of name characters
+            if match:
+                colleges.append(text[match[0]:match[1]])
+                match = None
+            run_start = k
+            while run_start and text[run_start - 1] in _COLLEGE_NAME_CHARS:
+                run_start -= 1
+            run_end = keyword.end()
+            while run_end < len(text) and text[run_end] in _COLLEGE_NAME_CHARS:
+                run_end += 1
+            first_upper = _UPPER_RE.search(text, run_start, k + 1).start()
+        # The name runs from the run's first capital to its last keyword
+        if k - first_upper >= 3:
+            match = (first_upper, keyword.end())
+    if match:
+        colleges.append(text[match[0]:match[1]])
+    return colleges
+
+
+# Section headers, found in a single scan of the lower-cased text.
+SECTION_HEADERS = {
+    "projects": ["Projects", "Project", "Portfolio", "Work Done"],
+    "experience": ["Professional Experience", "Work History", "Experience"],
+    "skills": ["Skills"],
+    "education": ["Education"],
+}
+SECTION_KINDS = {header.lower(): kind for kind, headers in SECTION_HEADERS.items() for header in headers}
+# Prefix-factored, so "Professional Experience" is one header rather than "Experience"
+SECTION_RE = re.compile(rf'(?<![a-z0-9_])({trie_pattern(list(SECTION_KINDS))})(?=[:\s]|$)')
+# A section runs until the next header of one of these kinds
+SECTION_ENDS = {
+    "projects": {"experience", "skills", "education"},
+    "experience": {"projects", "skills", "education"},
+}
+PROJECT_SPLIT_RE = re.compile(r'•|-|·|\n|\|')
+EXPERIENCE_SPLIT_RE = re.compile(r'•|-|·|\n')
+
+
+def find_sections(text: str, lowered: str = None) -> dict:
+    """Body text of every projects/experience section, from one scan for headers."""
+    lowered = lowered if lowered is not None else lower_aligned(text)
+    headers = [
+        (SECTION_KINDS[" ".join(m.group(1).split())], m.start(), m.end()) for m in SECTION_RE.finditer(lowered)
+    ]
+    sections = {kind: [] for kind in SECTION_ENDS}
+    i = 0
+    while i < len(headers):
+        kind, _, body_start = headers[i]
+        if kind not in SECTION_ENDS:
+            i += 1
+            continue
+        j = i + 1
+        while j < len(headers) and headers[j][0] not in SECTION_ENDS[kind]:
+            j += 1
+        body_end = headers[j][1] if j < len(headers) else len(text)
+        sections[kind].append(text[body_start:body_end].lstrip(":"))
+        i = j
+    return sections
+
+
 def extract_entities(text):
     """
     Extracts structured information from resume text.
     Returns a dictionary suitable for Applicant.parsed.
     """
-    parsed = {}
-    parsed["text"] = text or ""
+    text = text or ""
+    parsed = {"text": text}
 
-    # ---------------- Email ----------------
-    email_match = re.search(r'[\w\.-]+@[\w\.-]+', text)
+    # ---------------- Email / Phone ----------------
+    email_match = EMAIL_RE.search(text)
     parsed["email"] = email_match.group(0) if email_match else ""
-
-    # ---------------- Phone ----------------
-    phone_match = re.search(r'\+?\d[\d\s\-]{8,15}\d', text)
+    phone_match = PHONE_RE.search(text)
     parsed["phone"] = phone_match.group(0) if phone_match else ""
 
     # ---------------- Name ----------------
-    if parsed["email"]:
-        before_email = text.split(parsed["email"])[0].strip()
-        parsed["name"] = " ".join(before_email.split()[:4]) or "Unknown"
-    else:
-        parsed["name"] = " ".join(text.split()[:4]) if text else "Unknown"
+    # First words before the email address (or of the text)
+    head = text[:email_match.start()] if email_match else text[:200]
+    parsed["name"] = " ".join(head.split()[:4]) or "Unknown"
 
     # ---------------- Colleges ----------------
-    colleges = re.findall(
-        r'([A-Z][a-zA-Z &]{2,}(?:University|College|Institute|Academy))',
-        text
-    )
-    parsed["college"] = colleges if colleges else []
+    parsed["college"] = find_colleges(text)
 
     # ---------------- Skills ----------------
-    skill_list = [
-        "Python", "Java", "JavaScript", "React", "Node.js",
-        "SQL", "Machine Learning", "Docker", "Django", "Flask",
-        "AWS", "C++", "TensorFlow", "Keras", "Pandas"
+    # Skills and section headers are matched on one lower-cased copy
+    lowered = lower_aligned(text)
+    parsed["skills"] = get_skill_matcher().find(text, lowered)
+
+    # ---------------- Projects / Professional Experiences ----------------
+    sections = find_sections(text, lowered)
+    parsed["projects"] = [
+        item.strip() for body in sections["projects"] for item in PROJECT_SPLIT_RE.split(body) if item.strip()
     ]
-    parsed["skills"] = [
-        skill for skill in skill_list
-        if re.search(rf'\b{re.escape(skill)}\b', text, re.I)
+    parsed["professional_experiences"] = [
+        item.strip() for body in sections["experience"] for item in EXPERIENCE_SPLIT_RE.split(body) if item.strip()
     ]
 
-    # ---------------- Projects ----------------
-    projects = []
-    proj_matches = re.findall(
-        r'(?:Projects?|Portfolio|Work Done)(?:\:|\s)(.*?)(?=(?:Experience|Skills|Education|$))',
-        text, flags=re.I | re.DOTALL
-    )
-    for proj in proj_matches:
-        items = re.split(r'•|-|·|\n|\|', proj)
-        projects.extend([p.strip() for p in items if p.strip()])
-    parsed["projects"] = projects
-
-    # ---------------- Professional Experiences ----------------
-    experiences = []
-    exp_matches = re.findall(
-        r'(?:Experience|Professional Experience|Work History)(?:\:|\s)(.*?)(?=(?:Projects|Skills|Education|$))',
-        text, flags=re.I | re.DOTALL
-    )
-    for exp in exp_matches:
-        items = re.split(r'•|-|·|\n', exp)
-        experiences.extend([e.strip() for e in items if e.strip()])
-    parsed["professional_experiences"] = experiences
-
     return parsed
 
 
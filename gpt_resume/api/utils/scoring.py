@@ -0,0 +1,273 @@
+import logging, threading
+import numpy as np
+from collections import OrderedDict
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from ..models import Applicant, ApplicantChunk, Job
+from .model_registry import get_embedder
+from .hashing import sha256
+from .metrics import CACHE_REQUESTS, stage_timer
+from .response_cache import invalidate
+from .vector_index import index_applicants
+from .embeddings import (
+    EMBEDDING_DTYPE, EMBEDDING_FIELDS, EMBEDDING_MODEL_NAME, bytes_to_vector, encode_documents, encode_texts,
+    relevance_scores, stack_vectors, store_embedding, vector_to_bytes,
+)
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_BATCH_SIZE = getattr(settings, "EMBEDDING_BATCH_SIZE", 64)
+RESCORE_CHUNK_SIZE = getattr(settings, "RESCORE_CHUNK_SIZE", 1000)
+JOB_EMBEDDING_CACHE_SIZE = getattr(settings, "JOB_EMBEDDING_CACHE_SIZE", 256)
+
+
+def encode_batch(texts: list):
+    """Encode many texts in one batched SentenceTransformer call."""
+    with stage_timer("embedding", items=len(texts)):
+        return encode_texts(get_embedder(), texts, batch_size=EMBEDDING_BATCH_SIZE)
+
+
+def encode_long_texts(texts: list) -> tuple:
+    """Chunk + pool encoding for texts that may exceed the model's input length."""
+    with stage_timer("embedding", items=len(texts)):
+        return encode_documents(get_embedder(), texts, batch_size=EMBEDDING_BATCH_SIZE)
+
+
+# ---------------------------
+# Job vectors
+# ---------------------------
+# Small in-process LRU in front of the vector stored on the Job row.
+_job_vectors = OrderedDict()
+_job_vectors_lock = threading.Lock()
+
+
+def _remember_job_vector(key: tuple, vector) -> None:
+    with _job_vectors_lock:
+        _job_vectors[key] = vector
+        _job_vectors.move_to_end(key)
+        while len(_job_vectors) > JOB_EMBEDDING_CACHE_SIZE:
+            _job_vectors.popitem(last=False)
+
+
+def stored_job_vector(job):
+    """
+    Job description vector from the LRU or the Job row, or None when it has
+    to be (re)encoded. Never encodes or writes, so read requests can use it.
+    """
+    description = job.job_description or ""
+    digest = sha256(description)
+    key = (str(job.u_id), digest, EMBEDDING_MODEL_NAME)
+    with _job_vectors_lock:
+        vector = _job_vectors.get(key)
+        if vector is not None:
+            _job_vectors.move_to_end(key)
+            CACHE_REQUESTS.labels(cache="job_embedding", result="hit").inc()
+            return vector
+
+    if job.embedding and job.description_hash == digest and job.embedding_model == EMBEDDING_MODEL_NAME:
+        CACHE_REQUESTS.labels(cache="job_embedding", result="stored").inc()
+        vector = bytes_to_vector(job.embedding, job.embedding_dim)
+        _remember_job_vector(key, vector)
+        return vector
+    CACHE_REQUESTS.labels(cache="job_embedding", result="miss").inc()
+    return None
+
+
+def encode_job(job):
+    """
+    Job description vector. Served from the LRU, else from the Job row when its
+    description hash and model still match; encoded and stored otherwise.
+    """
+    vector = stored_job_vector(job)
+    if vector is not None:
+        return vector
+    description = job.job_description or ""
+    digest = sha256(description)
+    vector = encode_long_texts([description])[0][0]
+    store_embedding(job, vector)
+    job.description_hash = digest
+    # update() rather than save(): no signals, the cached responses don't change
+    Job.objects.filter(pk=job.pk).update(
+        embedding=job.embedding, embedding_model=job.embedding_model,
+        embedding_dim=job.embedding_dim, description_hash=digest,
+    )
+    _remember_job_vector((str(job.u_id), digest, EMBEDDING_MODEL_NAME), vector)
+    return vector
+
+
+def applicant_text(applicant) -> str:
+    """Text used for scoring: parsed text if present, else the extracted resume text."""
+    parsed_text = ""
+    if applicant.parsed:
+        # parsed can be dict or string; handle both
+        parsed_text = applicant.parsed.get("text", "") if isinstance(applicant.parsed, dict) else str(applicant.parsed)
+    return (parsed_text or applicant.resume_text or "").strip()
+
+
+def store_chunks(applicants: list, chunked: list) -> None:
+    """Replace the stored chunk vectors of `applicants` (one (chunks, vectors) pair each)."""
+    rows = [
+        ApplicantChunk(
+            applicant=applicant, position=position, text=text, embedding=vector_to_bytes(vector),
+            embedding_model=EMBEDDING_MODEL_NAME, embedding_dim=vector.shape[0],
+        )
+        for applicant, (chunks, vectors) in zip(applicants, chunked)
+        for position, (text, vector) in enumerate(zip(chunks, vectors))
+    ]
+    with stage_timer("db_write", items=len(rows)), transaction.atomic():
+        ApplicantChunk.objects.filter(applicant__in=[a.pk for a in applicants]).delete()
+        ApplicantChunk.objects.bulk_create(rows)
+
+
+def best_passages(applicant_ids: list, query_vector) -> dict:
+    """Best-matching stored passage per applicant: {str(u_id): (text, cosine)}, no re-encoding."""
+    query_vector = np.asarray(query_vector, dtype=EMBEDDING_DTYPE).reshape(-1)
+    rows = list(
+        ApplicantChunk.objects.filter(
+            applicant__in=applicant_ids, embedding_model=EMBEDDING_MODEL_NAME, embedding_dim=query_vector.shape[0],
+        ).values_list("applicant_id", "text", "embedding")
+    )
+    if not rows:
+        return {}
+    scores = stack_vectors([row[2] for row in rows], query_vector.shape[0]) @ query_vector
+    best = {}
+    for (applicant_id, text, _), score in zip(rows, scores):
+        key = str(applicant_id)
+        if key not in best or score > best[key][1]:
+            best[key] = (text, float(score))
+    return best
+
+
+def score_applicants(applicants: list, job_embedding) -> int:
+    """
+    Score `applicants` against the job vector and persist relevance + vectors.
+    Stored vectors are reused; applicants without a vector for the current model
+    are chunked and encoded together in one batch, and their chunk vectors are
+    stored. Scoring is one matrix-vector product.
+    """
+    missing = [
+        a for a in applicants
+        if not a.embedding or a.embedding_model != EMBEDDING_MODEL_NAME
+    ]
+    to_encode = [(a, applicant_text(a)) for a in missing]
+    to_encode = [(a, t) for a, t in to_encode if t]
+    if to_encode:
+        # All chunks of all resumes go through the model in one batch, then are pooled per resume
+        vectors, chunked = encode_long_texts([t for _, t in to_encode])
+        for (applicant, _), vector in zip(to_encode, vectors):
+            store_embedding(applicant, vector)
+        store_chunks([a for a, _ in to_encode], chunked)
+
+    scorable = [a for a in applicants if a.embedding and a.embedding_model == EMBEDDING_MODEL_NAME]
+    if not scorable:
+        return 0
+
+    dim = scorable[0].embedding_dim
+    scorable = [a for a in scorable if a.embedding_dim == dim]
+    scores = relevance_scores(job_embedding, stack_vectors([a.embedding for a in scorable], dim))
+    for applicant, score in zip(scorable, scores):
+        applicant.relevance = int(score)
+        applicant.embedding_stored = True
+    with stage_timer("db_write", items=len(scorable)):
+        Applicant.objects.bulk_update(scorable, ["relevance", "embedding_stored", *EMBEDDING_FIELDS])
+    invalidate(job_ids=[a.job_applied_id for a in scorable])
+    return len(scorable)
+
+
+def pending_applicants(job=None):
+    """Applicants with extracted text but no relevance yet (rows still being ingested have no text)."""
+    qs = Applicant.objects.filter(embedding_stored=False).exclude(resume_text="")
+    return qs.filter(job_applied=job) if job is not None else qs
+
+
+def backfill_job_vectors(limit: int = None) -> int:
+    """
+    Encode the vector of jobs that have applicants but none for the current
+    model (read requests skip vector features until then). Returns jobs encoded.
+    """
+    jobs = (
+        Job.objects.filter(applicants__isnull=False)
+        .exclude(embedding__isnull=False, embedding_model=EMBEDDING_MODEL_NAME)
+        .distinct()
+    )
+    encoded = [job.u_id for job in (jobs[:limit] if limit else jobs) if encode_job(job) is not None]
+    # Shortlists and best passages of these jobs become available
+    invalidate(job_ids=encoded)
+    return len(encoded)
+
+
+def backfill_scores(job=None, chunk_size: int = EMBEDDING_BATCH_SIZE, limit: int = None) -> int:
+    """
+    Score pending applicants job by job: one job encoding, then keyset-ordered
+    chunks that are batch-encoded, bulk-updated and added to the vector index.
+    Stops after about `limit` applicants. Returns the number scored.
+    """
+    job_ids = pending_applicants(job).values_list("job_applied_id", flat=True).distinct()
+    scored = 0
+    for pending_job in Job.objects.filter(u_id__in=list(job_ids)):
+        job_embedding = encode_job(pending_job)
+        last = None
+        while True:
+            qs = pending_applicants(pending_job).order_by("u_id")
+            if last is not None:
+                qs = qs.filter(u_id__gt=last)
+            chunk = list(qs[:chunk_size])
+            if not chunk:
+                break
+            scored += score_applicants(chunk, job_embedding)
+            index_applicants(chunk)
+            last = chunk[-1].u_id
+            if limit and scored >= limit:
+                return scored
+    return scored
+
+
+def write_relevance(ids: list, scores, chunk_size: int = RESCORE_CHUNK_SIZE) -> None:
+    """
+    Bulk-write relevance scores. Scores are small integers (0-100), so rows are
+    grouped by score and written as `UPDATE ... WHERE u_id IN (...)` chunks:
+    at most ~101 statements per chunk of ids instead of a CASE per row.
+    """
+    by_score = {}
+    for u_id, score in zip(ids, scores):
+        by_score.setdefault(int(score), []).append(u_id)
+    with transaction.atomic():
+        for score, group in by_score.items():
+            for start in range(0, len(group), chunk_size):
+                Applicant.objects.filter(u_id__in=group[start:start + chunk_size]).update(
+                    relevance=score, embedding_stored=True,
+                )
+
+
+def rescore_job(job, chunk_size: int = RESCORE_CHUNK_SIZE, reencode: bool = False) -> dict:
+    """
+    Recompute relevance for every applicant of `job` from stored vectors.
+    All vectors are loaded as one matrix and scored in a single product;
+    results are written back in chunked bulk updates. Applicants without a
+    vector for the current model are re-encoded (and indexed) only if
+    `reencode` is set.
+    """
+    job_embedding = encode_job(job)
+    applicants_qs = Applicant.objects.filter(job_applied=job)
+
+    dim = job_embedding.shape[0]
+    current = Q(embedding_model=EMBEDDING_MODEL_NAME, embedding__isnull=False, embedding_dim=dim)
+
+    rows = list(applicants_qs.filter(current).values_list("u_id", "embedding"))
+    scores = relevance_scores(job_embedding, stack_vectors([row[1] for row in rows], dim))
+    write_relevance([row[0] for row in rows], scores, chunk_size)
+    invalidate(job_ids=[job.u_id])
+
+    stale_qs = applicants_qs.exclude(current)
+    stale = stale_qs.count()
+    reencoded = 0
+    if reencode and stale:
+        ids = list(stale_qs.values_list("u_id", flat=True))
+        for start in range(0, len(ids), chunk_size):
+            chunk = list(Applicant.objects.filter(u_id__in=ids[start:start + chunk_size]))
+            reencoded += score_applicants(chunk, job_embedding)
+            index_applicants(chunk)
+
+    return {"rescored": len(rows), "reencoded": reencoded, "stale": stale - reencoded}
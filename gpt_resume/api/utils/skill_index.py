@@ -0,0 +1,108 @@
+from django.db import transaction
+
+from ..models import Applicant, ApplicantSkill, ProfessionalExperience, Project, Skill
+from .response_cache import invalidate
+from .skills import get_skill_matcher
+
+
+# ---------------------------
+# Extraction
+# ---------------------------
+def applicant_skill_names(text: str, tech_stacks=()) -> list:
+    """Canonical skills found in the resume text plus every parsed tech stack."""
+    matcher = get_skill_matcher()
+    found = set(matcher.find(text or ""))
+    for stack in tech_stacks:
+        if isinstance(stack, list):
+            found.update(matcher.find_in_list(stack))
+    return sorted(found, key=matcher.order.get)
+
+
+def parsed_tech_stacks(parsed: dict) -> list:
+    """Tech stacks of the projects and experiences in an LLM parse result."""
+    entries = (parsed or {}).get("projects") or [], (parsed or {}).get("professional_experiences") or []
+    return [entry.get("tech_stack") for rows in entries for entry in rows if isinstance(entry, dict)]
+
+
+# ---------------------------
+# Index
+# ---------------------------
+def skill_ids(names: list) -> dict:
+    """{name: Skill id}, creating the missing Skill rows."""
+    names = set(names)
+    ids = dict(Skill.objects.filter(name__in=names).values_list("name", "pk"))
+    missing = names - set(ids)
+    if missing:
+        Skill.objects.bulk_create([Skill(name=name) for name in missing], ignore_conflicts=True)
+        ids.update(Skill.objects.filter(name__in=missing).values_list("name", "pk"))
+    return ids
+
+
+def index_skills(entries: list) -> int:
+    """
+    Replace the ApplicantSkill rows of every (applicant, skill names) entry:
+    one delete and one bulk insert for the whole batch. Returns rows written.
+    """
+    if not entries:
+        return 0
+    ids = skill_ids([name for _, names in entries for name in names])
+    rows = [
+        ApplicantSkill(applicant_id=applicant.pk, skill_id=ids[name])
+        for applicant, names in entries for name in set(names)
+    ]
+    with transaction.atomic():
+        ApplicantSkill.objects.filter(applicant__in=[applicant.pk for applicant, _ in entries]).delete()
+        ApplicantSkill.objects.bulk_create(rows)
+        # Skill filters of these jobs' applicant lists change
+        invalidate(job_ids=[applicant.job_applied_id for applicant, _ in entries])
+    return len(rows)
+
+
+def reindex_skills(queryset=None, chunk_size: int = 500) -> int:
+    """
+    Rebuild the index from stored data (resume text + project/experience tech
+    stacks), e.g. after changing settings.SKILL_TAXONOMY. Returns applicants indexed.
+    """
+    queryset = (queryset if queryset is not None else Applicant.objects.all()).order_by("u_id")
+    done, last = 0, None
+    while True:
+        qs = queryset.filter(u_id__gt=last) if last is not None else queryset
+        applicants = list(qs.only("u_id", "job_applied_id", "resume_text")[:chunk_size])
+        if not applicants:
+            return done
+        stacks = {}
+        for model in (Project, ProfessionalExperience):
+            for applicant_id, stack in model.objects.filter(applicant__in=applicants).values_list("applicant_id", "tech_stack"):
+                stacks.setdefault(applicant_id, []).append(stack)
+        index_skills([
+            (applicant, applicant_skill_names(applicant.resume_text, stacks.get(applicant.pk, [])))
+            for applicant in applicants
+        ])
+        done += len(applicants)
+        last = applicants[-1].u_id
+
+
+# ---------------------------
+# Query
+# ---------------------------
+def resolve_skills(names: list) -> tuple:
+    """Split requested skill names/aliases into (canonical names, unknown names)."""
+    matcher = get_skill_matcher()
+    canonical, unknown = [], []
+    for name in names:
+        skill = matcher.normalize(name)
+        if skill:
+            canonical.append(skill)
+        else:
+            unknown.append(name)
+    return list(dict.fromkeys(canonical)), unknown
+
+
+def filter_by_skills(queryset, skills: list):
+    """
+    Applicants having every skill in `skills` (canonical names). Each skill is
+    an indexed `IN (SELECT applicant_id ...)` on ApplicantSkill's (skill, applicant) key.
+    """
+    for skill in skills:
+        queryset = queryset.filter(u_id__in=ApplicantSkill.objects.filter(skill__name=skill).values("applicant_id"))
+    return queryset
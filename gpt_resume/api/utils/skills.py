@@ -0,0 +1,215 @@
+import re
+
+# ---------------------------
+# Skill taxonomy
+# ---------------------------
+# Canonical skill -> aliases, matched as whole tokens; case-insensitively except
+# for the names covered by `_exact_case`.
+# Extend or override with settings.SKILL_TAXONOMY.
+DEFAULT_SKILL_TAXONOMY = {
+    # Languages
+    "Python": ["python3"],
+    "Java": [],
+    "JavaScript": ["JS", "ecmascript", "ES6"],
+    "TypeScript": [],
+    "C++": ["cpp"],
+    "C#": ["csharp", "c sharp"],
+    "Go": ["golang"],
+    "Rust": [],
+    "Ruby": [],
+    "PHP": [],
+    "Kotlin": [],
+    "Swift": [],
+    "Scala": [],
+    "MATLAB": [],
+    "Bash": ["shell scripting"],
+    "SQL": [],
+    "HTML": ["html5"],
+    "CSS": ["css3"],
+    # Web frameworks
+    "React": ["react.js", "reactjs"],
+    "Angular": ["angularjs", "angular.js"],
+    "Vue.js": ["vue", "vuejs"],
+    "Next.js": ["nextjs"],
+    "Node.js": ["nodejs"],
+    "Express": ["express.js", "expressjs"],
+    "Django": ["django rest framework", "drf"],
+    "Flask": [],
+    "FastAPI": [],
+    "Spring": ["spring boot", "springboot"],
+    ".NET": ["dotnet", "asp.net"],
+    "Ruby on Rails": ["rails"],
+    "GraphQL": [],
+    "REST": ["rest api", "restful", "rest apis"],
+    # Data & ML
+    "Machine Learning": ["ML"],
+    "Deep Learning": [],
+    "NLP": ["natural language processing"],
+    "Computer Vision": [],
+    "TensorFlow": [],
+    "PyTorch": ["torch"],
+    "Keras": [],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "Pandas": [],
+    "NumPy": [],
+    "Spark": ["apache spark", "pyspark"],
+    "Hadoop": [],
+    "Tableau": [],
+    "Power BI": ["powerbi"],
+    "Excel": ["ms excel", "microsoft excel"],
+    "OpenCV": [],
+    "LLM": ["LLMs", "large language models"],
+    # Databases
+    "PostgreSQL": ["postgres", "psql"],
+    "MySQL": [],
+    "SQLite": [],
+    "MongoDB": ["mongo"],
+    "Redis": [],
+    "Elasticsearch": ["elastic search"],
+    "Oracle": [],
+    # Cloud & DevOps
+    "AWS": ["amazon web services"],
+    "Azure": ["microsoft azure"],
+    "GCP": ["google cloud", "google cloud platform"],
+    "Docker": [],
+    "Kubernetes": ["k8s"],
+    "Terraform": [],
+    "Jenkins": [],
+    "CI/CD": ["ci cd", "continuous integration"],
+    "Git": ["github", "gitlab"],
+    "Linux": ["unix"],
+    "Kafka": ["apache kafka"],
+    "RabbitMQ": [],
+    # Mobile
+    "Android": [],
+    "iOS": [],
+    "Flutter": [],
+    "React Native": [],
+}
+
+# Names that are also ordinary words (or short acronyms) only match with the
+# exact capitalisation written in the taxonomy: "Go" but not "go", "REST" but not "rest".
+COMMON_WORD_SKILLS = {"Go", "Swift", "Spring", "Express", "Excel", "Oracle", "Rust", "Ruby", "Spark", "Flask", "Git"}
+
+
+def _exact_case(name: str) -> bool:
+    return name in COMMON_WORD_SKILLS or (name.isupper() and len(name) <= 4)
+
+
+# Characters that continue a token (after lower-casing), so "Java" does not
+# match inside "JavaScript" and "C++" does not match inside "C++11x".
+_TOKEN_CHARS = r"a-z0-9_+#"
+
+
+def lower_aligned(text: str) -> str:
+    """
+    `text.lower()` with the same length as `text`, so match offsets in the
+    lowered copy are valid in the original. Matching a lowered copy is much
+    faster than re.IGNORECASE.
+    """
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # A few characters (e.g. "İ") lower-case to two code points
+        lowered = "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+    return lowered
+
+
+def trie_pattern(words: list) -> str:
+    """
+    Prefix-factored alternation of `words` (lower-cased). The regex engine
+    then walks one trie per position instead of trying every alternative.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node) -> str:
+        end = "" in node
+        branches = [
+            (r"\s+" if char == " " else re.escape(char)) + build(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if end:
+            # Both shorter and longer words end here; prefer the longer one.
+            return "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+class SkillMatcher:
+    """One compiled, single-pass matcher for every skill name and alias in a taxonomy."""
+
+    def __init__(self, taxonomy: dict):
+        self.canonical = {}
+        # lower-cased name -> spellings it must match exactly (absent = any case)
+        self.exact = {}
+        for skill, aliases in taxonomy.items():
+            for name in [skill, *aliases]:
+                key = " ".join(name.lower().split())
+                self.canonical.setdefault(key, skill)
+                if _exact_case(name):
+                    self.exact.setdefault(key, set()).add(name)
+        self.order = {skill: i for i, skill in enumerate(taxonomy)}
+        # Matched against lower_aligned(text)
+        self.pattern = re.compile(
+            rf"(?<![{_TOKEN_CHARS}])({trie_pattern(list(self.canonical))})(?![{_TOKEN_CHARS}])"
+        )
+
+    def find(self, text: str, lowered: str = None) -> list:
+        """Canonical skills mentioned in `text`, in taxonomy order. Pass `lowered` if already computed."""
+        text = text or ""
+        lowered = lowered if lowered is not None else lower_aligned(text)
+        found = set()
+        for match in self.pattern.finditer(lowered):
+            key = " ".join(match.group(1).split())
+            if key in self.exact and text[match.start():match.end()] not in self.exact[key]:
+                continue
+            skill = self.canonical.get(key)
+            if skill:
+                found.add(skill)
+        return sorted(found, key=self.order.__getitem__)
+
+    def normalize(self, name: str):
+        """Canonical skill for a skill name or alias in any case ("k8s" -> "Kubernetes"); None if unknown."""
+        return self.canonical.get(" ".join((name or "").lower().split()))
+
+    def find_in_list(self, names: list) -> list:
+        """Canonical skills in a free-form list such as an LLM `tech_stack`."""
+        found = set()
+        for name in names or []:
+            if not isinstance(name, str):
+                continue
+            skill = self.normalize(name)
+            found.update([skill] if skill else self.find(name))
+        return sorted(found, key=self.order.__getitem__)
+
+
+def skill_taxonomy() -> dict:
+    """Default taxonomy merged with settings.SKILL_TAXONOMY (when Django is configured)."""
+    taxonomy = dict(DEFAULT_SKILL_TAXONOMY)
+    try:
+        from django.conf import settings
+
+        if settings.configured:
+            taxonomy.update(getattr(settings, "SKILL_TAXONOMY", {}))
+    except ImportError:
+        pass
+    return taxonomy
+
+
+_matcher = None
+
+
+def get_skill_matcher() -> SkillMatcher:
+    """Process-wide matcher, compiled on first use."""
+    global _matcher
+    if _matcher is None:
+        _matcher = SkillMatcher(skill_taxonomy())
+    return _matcher
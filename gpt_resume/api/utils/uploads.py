@@ -0,0 +1,49 @@
+import hashlib, os, uuid
+from dataclasses import dataclass
+from django.conf import settings
+from django.core.files.move import file_move_safe
+
+UPLOAD_CHUNK_SIZE = getattr(settings, "UPLOAD_CHUNK_SIZE", 256 * 1024)
+
+
+@dataclass
+class StoredUpload:
+    original_name: str
+    name: str          # path relative to MEDIA_ROOT, e.g. "resumes/<uuid>_cv.pdf"
+    path: str
+    sha256: str
+    size: int
+
+
+def store_upload(file_obj, subdir: str = "resumes") -> StoredUpload:
+    """
+    Put an uploaded file under MEDIA_ROOT/<subdir> in a single pass while
+    hashing it. In-memory uploads are streamed to disk chunk by chunk;
+    uploads Django already spooled to a temp file are hashed and then
+    moved (renamed) into place instead of being copied again.
+    """
+    # Use base filename to avoid Windows absolute-path issues
+    original_name = os.path.basename(getattr(file_obj, "name", str(file_obj)))
+    name = f"{uuid.uuid4()}_{original_name}"
+    directory = os.path.join(settings.MEDIA_ROOT, subdir)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name)
+
+    digest = hashlib.sha256()
+    size = 0
+    temp_path = getattr(file_obj, "temporary_file_path", None)
+    if temp_path is not None:
+        for chunk in file_obj.chunks(UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+            size += len(chunk)
+        # Move before closing: closing a TemporaryUploadedFile deletes its temp file
+        file_move_safe(temp_path(), path)
+        file_obj.close()
+    else:
+        with open(path, "xb") as out:
+            for chunk in file_obj.chunks(UPLOAD_CHUNK_SIZE):
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+
+    return StoredUpload(original_name, f"{subdir}/{name}", path, digest.hexdigest(), size)
@@ -0,0 +1,493 @@
+import json, logging, os, threading, time, uuid
+import numpy as np
+from django.conf import settings
+
+from ..models import Applicant
+from .embeddings import EMBEDDING_DTYPE, EMBEDDING_MODEL_NAME, stack_vectors
+
+try:
+    import faiss
+except ImportError:  # pragma: no cover - numpy fallback keeps the API usable without faiss
+    faiss = None
+
+logger = logging.getLogger(__name__)
+
+VECTOR_INDEX = {
+    "DIRECTORY": os.path.join(settings.MEDIA_ROOT, "vector_indexes"),
+    "TYPE": "flat",          # "flat" (exact), "hnsw" or "ivf"
+    "METRIC": "ip",          # "ip" (cosine on normalised vectors) or "l2"
+    "HNSW_M": 32,
+    "HNSW_EF_SEARCH": 64,
+    "IVF_NLIST": 256,
+    "IVF_NPROBE": 16,
+    # Shard rows that trigger a full snapshot: max(COMPACT_MIN_ROWS, COMPACT_RATIO * snapshot rows)
+    "COMPACT_RATIO": 0.25,
+    "COMPACT_MIN_ROWS": 4096,
+    # Above this many shard files they are merged into one (without rewriting the snapshot)
+    "MAX_SHARDS": 64,
+    # Minimum seconds between two looks at the index directory from the request path
+    "REFRESH_SECONDS": 1.0,
+    **getattr(settings, "VECTOR_INDEX", {}),
+}
+# IVF needs enough points to train its centroids; below this a flat index is used.
+IVF_MIN_TRAIN = VECTOR_INDEX["IVF_NLIST"] * 39
+
+
+# ---------------------------
+# Index
+# ---------------------------
+class VectorIndex:
+    """
+    Append-only ANN index persisted as a snapshot (`<name>.faiss` plus
+    `<name>.ids.json`) and append-only shards (`<name>.shard-*.npz`) holding
+    the vectors added since. Each write stores only the new vectors as a
+    shard; the snapshot is rewritten once the shards reach COMPACT_RATIO of
+    it, so persisting costs amortised O(new rows). FAISS row ids are
+    positions in the ids list, which maps them back to Applicant u_ids.
+    Without faiss installed, an exact numpy index is used.
+    """
+
+    def __init__(self, name: str, dim: int, index_type: str = VECTOR_INDEX["TYPE"],
+                 metric: str = VECTOR_INDEX["METRIC"], directory: str = None):
+        self.name = name
+        self.dim = dim
+        self.index_type = index_type
+        self.metric = metric
+        self.directory = directory or VECTOR_INDEX["DIRECTORY"]
+        self.ids = []
+        self.positions = {}
+        self.index = None
+        self.matrix = np.empty((0, dim), dtype=EMBEDDING_DTYPE)  # numpy fallback storage
+        self.loaded_mtime = None
+        self.shards = {}         # shard file name -> rows, for every shard loaded or written
+        self.pending = []        # (ids, vectors) added since the last flush()
+        self.needs_snapshot = False
+        self.checked_at = 0.0
+        self._reloading = None  # background snapshot reload thread
+        self.lock = threading.RLock()
+
+    # ---- paths & persistence ----
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.directory, f"{self.name}.{'faiss' if faiss else 'npy'}")
+
+    @property
+    def ids_path(self) -> str:
+        return os.path.join(self.directory, f"{self.name}.ids.json")
+
+    def _disk_mtime(self):
+        try:
+            return os.path.getmtime(self.ids_path)
+        except OSError:
+            return None
+
+    def _disk_shards(self) -> list:
+        """Shard file names on disk, oldest first (names start with a timestamp)."""
+        prefix = f"{self.name}.shard-"
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        return sorted(n for n in names if n.startswith(prefix) and n.endswith(".npz"))
+
+    def _read_shard(self, shard: str):
+        """(ids, vectors) of a shard, or None if it is gone or was written for another model."""
+        try:
+            with np.load(os.path.join(self.directory, shard), allow_pickle=False) as data:
+                if str(data["model"]) != EMBEDDING_MODEL_NAME or data["vectors"].shape[1:] != (self.dim,):
+                    return None
+                return [str(u_id) for u_id in data["ids"]], data["vectors"].astype(EMBEDDING_DTYPE, copy=False)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_shard(self, ids: list, vectors: np.ndarray) -> str:
+        shard = f"{self.name}.shard-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.npz"
+        path = os.path.join(self.directory, shard)
+        with open(f"{path}.tmp", "wb") as f:
+            np.savez(f, ids=np.array(ids), vectors=vectors, model=np.array(EMBEDDING_MODEL_NAME))
+        os.replace(f"{path}.tmp", path)
+        self.shards[shard] = len(ids)
+        return shard
+
+    def _delete_shards(self, shards) -> None:
+        for shard in shards:
+            try:
+                os.remove(os.path.join(self.directory, shard))
+            except FileNotFoundError:  # compacted by another process
+                pass
+            self.shards.pop(shard, None)
+
+    def load_shards(self) -> int:
+        """Add the vectors of shards written (by any process) since the last look. Returns rows added."""
+        with self.lock:
+            on_disk = self._disk_shards()
+            # Shards merged or compacted away elsewhere no longer count towards compaction
+            present = set(on_disk)
+            self.shards = {shard: rows for shard, rows in self.shards.items() if shard in present}
+            added = 0
+            for shard in on_disk:
+                if shard in self.shards:
+                    continue
+                data = self._read_shard(shard)
+                # Shards of another embedding model are dropped at the next snapshot
+                self.shards[shard] = len(data[0]) if data is not None else 0
+                if data is not None:
+                    added += self._append(*data)
+            return added
+
+    def refresh(self, force: bool = False) -> None:
+        """
+        Pick up what other processes wrote, without blocking on a full load:
+        new shards are read inline (they are small), a newer snapshot is
+        loaded on a background thread while searches keep using the current
+        index. Looks at the disk at most every REFRESH_SECONDS unless `force`.
+        """
+        now = time.monotonic()
+        if not force and now - self.checked_at < VECTOR_INDEX["REFRESH_SECONDS"]:
+            return
+        with self.lock:
+            self.checked_at = now
+            mtime = self._disk_mtime()
+            if mtime is not None and mtime != self.loaded_mtime:
+                self._reload_in_background()
+            self.load_shards()
+
+    def _reload_in_background(self) -> None:
+        if self._reloading is not None and self._reloading.is_alive():
+            return
+        self._reloading = threading.Thread(
+            target=self._reload, args=(self.loaded_mtime,), name=f"vector-index-{self.name}", daemon=True,
+        )
+        self._reloading.start()
+
+    def _reload(self, started_mtime) -> None:
+        fresh = VectorIndex(self.name, self.dim, self.index_type, self.metric, self.directory)
+        try:
+            fresh.load()
+        except Exception as e:
+            logger.exception(f"Reloading vector index {self.name} failed: {e}")
+            return
+        with self.lock:
+            if self.loaded_mtime != started_mtime:
+                return  # this process saved a snapshot meanwhile; the next refresh compares again
+            self.ids, self.positions, self.index, self.matrix = fresh.ids, fresh.positions, fresh.index, fresh.matrix
+            self.shards, self.loaded_mtime = fresh.shards, fresh.loaded_mtime
+            self.load_shards()
+
+    def load(self) -> bool:
+        """Load the snapshot (if any) and every shard. Returns False if nothing usable is on disk."""
+        with self.lock:
+            self.ids, self.positions, self.index, self.shards, self.pending = [], {}, None, {}, []
+            self.matrix = np.empty((0, self.dim), dtype=EMBEDDING_DTYPE)
+            self.checked_at = time.monotonic()
+            loaded = self._load_snapshot()
+            return self.load_shards() > 0 or loaded
+
+    def _load_snapshot(self) -> bool:
+        if not os.path.exists(self.ids_path) or not os.path.exists(self.index_path):
+            return False
+        mtime = self._disk_mtime()
+        with open(self.ids_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("dim") != self.dim or meta.get("model") != EMBEDDING_MODEL_NAME:
+            return False
+        if faiss:
+            self.index = faiss.read_index(self.index_path)
+            self._tune(self.index)
+        else:
+            self.matrix = np.load(self.index_path)
+        self.ids = meta["ids"]
+        self.positions = {u_id: i for i, u_id in enumerate(self.ids)}
+        self.loaded_mtime = mtime
+        return True
+
+    def save(self) -> None:
+        """Write a full snapshot and drop the shards it now contains."""
+        with self.lock:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_index = f"{self.index_path}.tmp"
+            if faiss:
+                faiss.write_index(self.index, tmp_index)
+            else:
+                with open(tmp_index, "wb") as f:
+                    np.save(f, self.matrix)
+            os.replace(tmp_index, self.index_path)
+            tmp_ids = f"{self.ids_path}.tmp"
+            with open(tmp_ids, "w", encoding="utf-8") as f:
+                json.dump({"model": EMBEDDING_MODEL_NAME, "dim": self.dim, "metric": self.metric,
+                           "type": self.index_type, "ids": self.ids}, f)
+            os.replace(tmp_ids, self.ids_path)
+            self.loaded_mtime = self._disk_mtime()
+            self._delete_shards(list(self.shards))
+            self.pending = []
+            self.needs_snapshot = False
+
+    def flush(self) -> None:
+        """
+        Persist what was added since the last flush: a new shard normally, a
+        full snapshot once the shards outgrow COMPACT_RATIO of it (or after an
+        IVF retrain renumbered the rows), and a shard merge when there are
+        more than MAX_SHARDS files.
+        """
+        with self.lock:
+            if not self.pending and not self.needs_snapshot:
+                return
+            shard_rows = sum(self.shards.values()) + sum(len(ids) for ids, _ in self.pending)
+            snapshot_rows = len(self.ids) - shard_rows
+            threshold = max(VECTOR_INDEX["COMPACT_MIN_ROWS"], VECTOR_INDEX["COMPACT_RATIO"] * snapshot_rows)
+            if self.needs_snapshot or shard_rows >= threshold:
+                self.save()
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            self._write_shard(
+                [u_id for ids, _ in self.pending for u_id in ids], np.vstack([v for _, v in self.pending]),
+            )
+            self.pending = []
+            if len(self.shards) > VECTOR_INDEX["MAX_SHARDS"]:
+                self._merge_shards()
+
+    def _merge_shards(self) -> None:
+        """Rewrite the known shards as one file: O(shard rows), the snapshot is left alone."""
+        shards = list(self.shards)
+        parts = [data for data in map(self._read_shard, shards) if data is not None]
+        if parts:
+            self._write_shard([u_id for ids, _ in parts for u_id in ids], np.vstack([v for _, v in parts]))
+        self._delete_shards(shards)
+
+    # ---- building ----
+    def _tune(self, index) -> None:
+        if hasattr(index, "hnsw"):
+            index.hnsw.efSearch = VECTOR_INDEX["HNSW_EF_SEARCH"]
+        if hasattr(index, "nprobe"):
+            index.nprobe = VECTOR_INDEX["IVF_NPROBE"]
+
+    def _new_faiss_index(self, n: int):
+        metric = faiss.METRIC_INNER_PRODUCT if self.metric == "ip" else faiss.METRIC_L2
+        if self.index_type == "hnsw":
+            index = faiss.IndexHNSWFlat(self.dim, VECTOR_INDEX["HNSW_M"], metric)
+        elif self.index_type == "ivf" and n >= IVF_MIN_TRAIN:
+            quantizer = faiss.IndexFlatIP(self.dim) if self.metric == "ip" else faiss.IndexFlatL2(self.dim)
+            index = faiss.IndexIVFFlat(quantizer, self.dim, VECTOR_INDEX["IVF_NLIST"], metric)
+        else:
+            index = faiss.IndexFlatIP(self.dim) if self.metric == "ip" else faiss.IndexFlatL2(self.dim)
+        self._tune(index)
+        return index
+
+    def rebuild(self, ids: list, vectors: np.ndarray) -> None:
+        """Replace the whole index (used for first build and IVF (re)training)."""
+        with self.lock:
+            vectors = np.ascontiguousarray(vectors, dtype=EMBEDDING_DTYPE).reshape(-1, self.dim)
+            self.ids = [str(u_id) for u_id in ids]
+            self.positions = {u_id: i for i, u_id in enumerate(self.ids)}
+            if faiss:
+                self.index = self._new_faiss_index(len(self.ids))
+                if not self.index.is_trained:
+                    self.index.train(vectors)
+                if len(self.ids):
+                    self.index.add(vectors)
+            else:
+                self.matrix = vectors.copy()
+
+    def add(self, ids: list, vectors: np.ndarray) -> int:
+        """Append vectors for ids not already in the index; flush() persists them. Returns the number added."""
+        with self.lock:
+            vectors = np.asarray(vectors, dtype=EMBEDDING_DTYPE).reshape(-1, self.dim)
+            keep = [i for i, u_id in enumerate(ids) if str(u_id) not in self.positions]
+            if not keep:
+                return 0
+            new_ids = [str(ids[i]) for i in keep]
+            new_vectors = np.ascontiguousarray(vectors[keep])
+            self._append(new_ids, new_vectors)
+            self.pending.append((new_ids, new_vectors))
+            return len(new_ids)
+
+    def _append(self, ids: list, vectors: np.ndarray) -> int:
+        """Add rows in memory (skipping known ids), retraining into IVF when it becomes worthwhile."""
+        keep = [i for i, u_id in enumerate(ids) if u_id not in self.positions]
+        if not keep:
+            return 0
+        if len(keep) < len(ids):
+            ids, vectors = [ids[i] for i in keep], vectors[keep]
+        vectors = np.ascontiguousarray(vectors, dtype=EMBEDDING_DTYPE)
+
+        if faiss and (self.index is None or self._needs_ivf_upgrade(len(ids))):
+            old = self.index.reconstruct_n(0, self.index.ntotal) if self.index is not None else vectors[:0]
+            self.rebuild(self.ids + ids, np.vstack([old, vectors]))
+            # Persist the trained IVF index, so other processes don't retrain it on load
+            self.needs_snapshot = self.needs_snapshot or old.shape[0] > 0
+            return len(ids)
+
+        if faiss:
+            self.index.add(vectors)
+        else:
+            self.matrix = np.vstack([self.matrix, vectors])
+        for u_id in ids:
+            self.positions[u_id] = len(self.ids)
+            self.ids.append(u_id)
+        return len(ids)
+
+    def _needs_ivf_upgrade(self, incoming: int) -> bool:
+        return (
+            self.index_type == "ivf"
+            and not isinstance(self.index, faiss.IndexIVF)
+            and len(self.ids) + incoming >= IVF_MIN_TRAIN
+        )
+
+    # ---- querying ----
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def search(self, vector, k: int) -> list:
+        """Top-k (u_id, score) pairs; higher score is better for both metrics."""
+        with self.lock:
+            if not self.ids or k <= 0:
+                return []
+            k = min(k, len(self.ids))
+            query = np.asarray(vector, dtype=EMBEDDING_DTYPE).reshape(1, -1)
+            if faiss:
+                scores, positions = self.index.search(query, k)
+                scores, positions = scores[0], positions[0]
+            else:
+                if self.metric == "ip":
+                    all_scores = self.matrix @ query[0]
+                else:
+                    all_scores = -np.sum((self.matrix - query) ** 2, axis=1)
+                positions = np.argpartition(-all_scores, k - 1)[:k]
+                positions = positions[np.argsort(-all_scores[positions])]
+                scores = all_scores[positions]
+            if faiss and self.metric == "l2":
+                scores = -scores
+            return [(self.ids[p], float(s)) for p, s in zip(positions, scores) if p >= 0]
+
+
+# ---------------------------
+# Index service
+# ---------------------------
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(name: str, dim: int) -> VectorIndex:
+    """
+    Process-wide VectorIndex for `name`, loaded from disk on first use and
+    then kept current by refresh() (new shards inline, snapshots in the background).
+    """
+    with _indexes_lock:
+        index = _indexes.get(name)
+        if index is None or index.dim != dim:
+            index = VectorIndex(name, dim)
+            index.load()
+            _indexes[name] = index
+    index.refresh()
+    return index
+
+
+GLOBAL_INDEX_NAME = "global"
+# Candidates fetched per requested result, to leave room for duplicate resumes.
+SEARCH_OVERFETCH = 2
+
+
+def job_index_name(job_id) -> str:
+    return f"job-{job_id}"
+
+
+def _current_vectors(applicants_qs, dim: int):
+    return applicants_qs.filter(embedding_model=EMBEDDING_MODEL_NAME, embedding__isnull=False, embedding_dim=dim)
+
+
+def sync_index(index: VectorIndex, applicants_qs) -> int:
+    """
+    Add stored vectors from `applicants_qs` that the index does not have yet.
+    Compares id sets rather than counts: the index keeps the ids of deleted
+    applicants (searches skip them), so a count would hide new rows.
+    """
+    with index.lock:
+        stored_ids = {str(u_id) for u_id in _current_vectors(applicants_qs, index.dim).values_list("u_id", flat=True)}
+        if stored_ids.issubset(index.positions):
+            return 0
+        index.refresh(force=True)  # maybe another process already indexed them
+        missing = list(stored_ids.difference(index.positions))
+        if not missing:
+            return 0
+        rows = []
+        for start in range(0, len(missing), 500):
+            rows += list(
+                Applicant.objects.filter(u_id__in=missing[start:start + 500]).values_list("u_id", "embedding")
+            )
+        added = index.add([u_id for u_id, _ in rows], stack_vectors([blob for _, blob in rows], index.dim))
+        index.flush()
+        return added
+
+
+def job_index(job, dim: int) -> VectorIndex:
+    """The job's index, built or topped up from stored vectors as needed."""
+    index = get_index(job_index_name(job.u_id), dim)
+    sync_index(index, Applicant.objects.filter(job_applied=job))
+    return index
+
+
+def global_index(dim: int) -> VectorIndex:
+    """Index over every stored resume vector, across all jobs."""
+    index = get_index(GLOBAL_INDEX_NAME, dim)
+    sync_index(index, Applicant.objects.all())
+    return index
+
+
+def _add_to_index(name: str, group: list) -> None:
+    dim = group[0].embedding_dim
+    group = [a for a in group if a.embedding_dim == dim]
+    index = get_index(name, dim)
+    with index.lock:
+        if index.add([a.u_id for a in group], stack_vectors([a.embedding for a in group], dim)):
+            index.flush()
+
+
+def index_applicants(applicants: list) -> None:
+    """Incrementally add freshly encoded applicants to their job indexes and the global index."""
+    applicants = [a for a in applicants if a.embedding and a.embedding_model == EMBEDDING_MODEL_NAME]
+    if not applicants:
+        return
+    by_job = {}
+    for applicant in applicants:
+        by_job.setdefault(applicant.job_applied_id, []).append(applicant)
+    for job_id, group in by_job.items():
+        _add_to_index(job_index_name(job_id), group)
+    _add_to_index(GLOBAL_INDEX_NAME, applicants)
+
+
+def top_k_for_job(job, job_embedding, k: int) -> list:
+    """Top-k (u_id, score) for a job from its persisted index."""
+    return job_index(job, job_embedding.shape[0]).search(job_embedding, k)
+
+
+def search_all_jobs(query_embedding, offset: int, limit: int, max_results: int) -> tuple:
+    """
+    Cross-job search over the global index, deduplicated by resume content
+    hash (the best-scoring copy wins). Returns (page of (u_id, score), has_more).
+    Only stored vectors are searched; nothing is re-encoded.
+    """
+    index = global_index(query_embedding.shape[0])
+    want = min(offset + limit, max_results)
+    k = want * SEARCH_OVERFETCH
+    while True:
+        hits = index.search(query_embedding, k + 1)
+        hashes = {}
+        hit_ids = [u_id for u_id, _ in hits]
+        for start in range(0, len(hit_ids), 500):
+            hashes.update(
+                (str(u_id), text_hash) for u_id, text_hash in
+                Applicant.objects.filter(u_id__in=hit_ids[start:start + 500]).values_list("u_id", "text_hash")
+            )
+        unique, seen = [], set()
+        for u_id, score in hits:
+            if u_id not in hashes:  # deleted since it was indexed
+                continue
+            key = hashes[u_id] or u_id
+            if key in seen:
+                continue
+            seen.add(key)
+            unique.append((u_id, score))
+        if len(unique) > want or len(hits) >= len(index):
+            break
+        k *= 2
+    return unique[offset:want], len(unique) > want and want < max_results
@@ -1,20 +1,26 @@
 from rest_framework import generics, views, status
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from django.core.files.storage import FileSystemStorage
-from django.core.files import File
-import uuid, os, logging
-from sentence_transformers import SentenceTransformer, util
-
-from .models import Job, Applicant
-from .serializers import JobSerializer, ApplicantSerializer, ApplicantSummarySerializer
-from .utils.resume_dispatcher import ApplicantHandler
+import logging
+
+from .models import Job, Applicant, IngestionBatch
+from .serializers import (
+    JobSerializer, ApplicantListSerializer, ApplicantSummarySerializer, ApplicantSummaryBulkSerializer,
+    IngestionBatchSerializer,
+    CandidateSearchSerializer, ApplicantSearchResultSerializer, passage_data,
+)
+from .pagination import ApplicantCursorPagination
+from .utils.response_cache import CachedResponseMixin, applicant_token_key, job_token_key
+from .utils.ingestion import enqueue_upload, ensure_workers
+from .utils.metrics import stage_timer
+from .utils.skill_index import filter_by_skills
+from .utils.scoring import (
+    best_passages, encode_batch, encode_job, pending_applicants, rescore_job, stored_job_vector,
+)
+from .utils.vector_index import search_all_jobs, top_k_for_job
 
 logger = logging.getLogger(__name__)
 
-# Load SBERT once
-embedder = SentenceTransformer("all-MiniLM-L6-v2")
-
 
 # ---------------------------
 # Job APIs
@@ -30,14 +36,59 @@ class JobCreateAPI(generics.CreateAPIView):
     serializer_class = JobSerializer
 
 
+class JobRescoreAPI(views.APIView):
+    """Recompute every applicant's relevance for a job from stored vectors."""
+    permission_classes = (AllowAny,)
+
+    def post(self, request, *args, **kwargs):
+        job = Job.objects.filter(u_id=self.kwargs.get("job_u_id")).first()
+        if not job:
+            return Response({"message": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        reencode = str(request.data.get("reencode", "")).lower() in ("1", "true", "yes")
+        result = rescore_job(job, reencode=reencode)
+        return Response({"message": "Job rescored", "job_u_id": str(job.u_id), **result}, status=status.HTTP_200_OK)
+
+
 # ---------------------------
 # Applicant APIs
 # ---------------------------
-class ApplicantListAPI(generics.ListAPIView):
+class ApplicantListAPI(CachedResponseMixin, generics.ListAPIView):
     permission_classes = (AllowAny,)
-    serializer_class = ApplicantSerializer
+    serializer_class = ApplicantListSerializer
+    pagination_class = ApplicantCursorPagination
+    cached_headers = ("X-Pending-Scoring",)
+
+    def cache_key_parts(self) -> list:
+        return ["applicant-list", self.kwargs.get("job_u_id")]
+
+    def cache_dependencies(self) -> list:
+        return [job_token_key(self.kwargs.get("job_u_id"))]
+
+    def get(self, request, *args, **kwargs):
+        # Timed as a whole, cache hits included
+        with stage_timer("listing"):
+            return super().get(request, *args, **kwargs)
+
+    def get_fields(self) -> list:
+        if not hasattr(self, "_fields"):
+            self._fields = ApplicantListSerializer.parse_fields(self.request.query_params.get("fields", ""))
+        return self._fields
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs["fields"] = self.get_fields()
+        return super().get_serializer(*args, **kwargs)
 
     def get_queryset(self):
+        # Only load the requested columns (never resume_text / embedding blobs)
+        return self._filtered_queryset().only(*{"u_id", "relevance", *self.get_fields()})
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        response["X-Pending-Scoring"] = str(getattr(self, "pending_scoring", 0))
+        return response
+
+    def _filtered_queryset(self):
         job_u_id = self.kwargs.get("job_u_id")
         job = Job.objects.filter(u_id=job_u_id).first()
         if not job:
@@ -45,121 +96,147 @@ class ApplicantListAPI(generics.ListAPIView):
             # return empty queryset instead of raising so frontend gets 200 + empty list
             return Applicant.objects.none()
 
-        type_param = self.request.query_params.get("type", "")
-        # safe job description fallback
-        job_text = job.job_description or ""
-        if not job_text.strip():
-            logger.warning(f"Job {job.u_id} has empty description")
-            return Applicant.objects.filter(job_applied=job).order_by("-relevance")
-
-        # compute job embedding once
-        try:
-            job_embedding = embedder.encode(job_text, convert_to_tensor=True)
-        except Exception as e:
-            logger.exception(f"Failed to encode job description for job {job.u_id}: {e}")
-            return Applicant.objects.filter(job_applied=job).order_by("-relevance")
-
-        applicants_qs = Applicant.objects.filter(job_applied=job)
-
-        # update relevance only for applicants missing embeddings
-        for applicant in applicants_qs:
-            parsed_text = ""
-            if applicant.parsed:
-                # parsed can be dict or string; handle both
-                parsed_text = applicant.parsed.get("text", "") if isinstance(applicant.parsed, dict) else str(applicant.parsed)
-            parsed_text = (parsed_text or applicant.resume_text or "").strip()
-
-            # skip if no text available
-            if not parsed_text:
-                continue
-
-            if not getattr(applicant, "embedding_stored", False):
-                try:
-                    resume_embedding = embedder.encode(parsed_text, convert_to_tensor=True)
-                    score = util.cos_sim(job_embedding, resume_embedding).item() * 100
-                    applicant.relevance = int(round(score))
-                    # only set embedding attr if model has such a field (safe)
-                    if hasattr(applicant, "embedding"):
-                        applicant.embedding = resume_embedding.tolist()
-                        update_fields = ["relevance", "embedding_stored", "embedding"]
-                    else:
-                        update_fields = ["relevance", "embedding_stored"]
-
-                    applicant.embedding_stored = True
-                    applicant.save(update_fields=update_fields)
-                except Exception as e:
-                    logger.exception(f"Embedding failed for applicant {getattr(applicant, 'u_id', 'unknown')}: {e}")
+        # Read-only: unscored applicants are scored by the backfill worker, not by this request
+        self.pending_scoring = pending_applicants(job).count()
+        if self.pending_scoring:
+            ensure_workers()
 
+        type_param = self.request.query_params.get("type", "")
         # Queryset filtering by type with a tunable threshold (default 50)
         threshold = int(self.request.query_params.get("threshold", 50))
-        queryset = applicants_qs
+        queryset = Applicant.objects.filter(job_applied=job)
+
+        # Optional ANN shortlist: only the top_k nearest resumes from the job's vector index.
+        # Uses the stored job vector only; without one (not encoded yet) the shortlist is skipped
+        # and the backfill worker encodes it.
+        top_k = self.request.query_params.get("top_k")
+        if top_k and top_k.isdigit():
+            job_vector = stored_job_vector(job)
+            if job_vector is None:
+                ensure_workers()
+            else:
+                try:
+                    hits = top_k_for_job(job, job_vector, int(top_k))
+                    queryset = queryset.filter(u_id__in=[u_id for u_id, _ in hits])
+                except Exception as e:
+                    logger.exception(f"Vector index search failed for job {job.u_id}: {e}")
         if type_param == "rec":
             queryset = queryset.filter(relevance__gte=threshold)
         elif type_param == "norec":
             queryset = queryset.filter(relevance__lt=threshold)
 
-        return queryset.order_by("-relevance")
+        # Applicants having every requested skill (aliases accepted), via the ApplicantSkill index
+        skills = self.request.query_params.get("skills")
+        if skills:
+            queryset = filter_by_skills(queryset, ApplicantListSerializer.parse_skills(skills))
 
+        return queryset.order_by("-relevance", "u_id")
 
-class ApplicantSummaryAPI(generics.RetrieveAPIView):
+
+class ApplicantSummaryAPI(CachedResponseMixin, generics.RetrieveAPIView):
     permission_classes = (AllowAny,)
     serializer_class = ApplicantSummarySerializer
 
+    def cache_key_parts(self) -> list:
+        return ["applicant-summary", self.kwargs.get("u_id")]
+
+    def cache_dependencies(self) -> list:
+        # Relevance changes are job-wide bulk updates, so the summary also depends on the job
+        u_id = self.kwargs.get("u_id")
+        job_id = Applicant.objects.filter(u_id=u_id).values_list("job_applied_id", flat=True).first()
+        return [applicant_token_key(u_id), job_token_key(job_id)]
+
     def get_object(self):
         u_id = self.kwargs.get("u_id")
-        return Applicant.objects.filter(u_id=u_id).first()
+        return ApplicantSummarySerializer.prefetch(Applicant.objects.filter(u_id=u_id)).first()
+
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        # Passage of the resume that best matches the job, from the stored chunk and job vectors
+        job = Job.objects.filter(applicants__u_id=self.kwargs.get("u_id")).first()
+        job_vector = stored_job_vector(job) if job else None
+        passage = None
+        if job_vector is not None:
+            try:
+                passage = best_passages([self.kwargs.get("u_id")], job_vector).get(str(self.kwargs.get("u_id")))
+            except Exception as e:
+                logger.exception(f"Best passage lookup failed for applicant {self.kwargs.get('u_id')}: {e}")
+        response.data["best_passage"] = passage_data(passage)
+        return response
+
+
+class ApplicantSummaryBulkAPI(views.APIView):
+    """Summaries for many applicants (candidate comparison) in a fixed number of queries."""
+    permission_classes = (AllowAny,)
+
+    def post(self, request, *args, **kwargs):
+        serializer = ApplicantSummaryBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        u_ids = list(dict.fromkeys(serializer.validated_data["u_ids"]))
+
+        applicants = ApplicantSummarySerializer.prefetch(Applicant.objects.filter(u_id__in=u_ids))
+        by_id = {applicant.u_id: applicant for applicant in applicants}
+        found = [by_id[u_id] for u_id in u_ids if u_id in by_id]
+        return Response({
+            "results": ApplicantSummarySerializer(found, many=True).data,
+            "missing": [str(u_id) for u_id in u_ids if u_id not in by_id],
+        }, status=status.HTTP_200_OK)
 
 
 # ---------------------------
-# Helper: Process resume
+# Cross-job Candidate Search
 # ---------------------------
-def process_resume(file_obj, job, fs, job_embedding):
-    try:
-        # Use base filename to avoid Windows absolute-path issues
-        original_name = os.path.basename(getattr(file_obj, "name", str(file_obj)))
-        filename = f"{uuid.uuid4()}_{original_name}"
-
-        # fs.save returns the saved filename (relative to FS location)
-        saved_name = fs.save(filename, file_obj)
-        file_path = fs.path(saved_name)
-
-        # Create applicant *without* attempting to re-save the uploaded file by Django.
-        applicant = Applicant.objects.create(job_applied=job)
-        # set the resume field to a relative path that Django understands.
-        applicant.resume.name = os.path.join("resumes", saved_name) if not saved_name.startswith("resumes/") else saved_name
-        applicant.save(update_fields=["resume"])
-
-        # Parse and populate applicant using existing handler
-        handler = ApplicantHandler(applicant)
-        handler.populate_fields()
-
-        # Compute relevance (if parsed text exists)
-        parsed_text = applicant.parsed.get("text", "") if applicant.parsed and isinstance(applicant.parsed, dict) else (applicant.parsed or applicant.resume_text or "")
-        if parsed_text and str(parsed_text).strip():
-            try:
-                resume_embedding = embedder.encode(str(parsed_text), convert_to_tensor=True)
-                score = util.cos_sim(job_embedding, resume_embedding).item() * 100
-                applicant.relevance = int(round(score))
-                applicant.embedding_stored = True
-                # set embedding only if field exists
-                if hasattr(applicant, "embedding"):
-                    applicant.embedding = resume_embedding.tolist()
-                    applicant.save(update_fields=["relevance", "embedding_stored", "embedding"])
-                else:
-                    applicant.save(update_fields=["relevance", "embedding_stored"])
-            except Exception as e:
-                logger.exception(f"Failed to compute embedding for applicant {applicant.u_id}: {e}")
+class CandidateSearchAPI(views.APIView):
+    """Top-k applicants across all jobs for free text or an existing job, from stored vectors."""
+    permission_classes = (AllowAny,)
+
+    def post(self, request, *args, **kwargs):
+        params = CandidateSearchSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        if data.get("job_u_id"):
+            job = Job.objects.filter(u_id=data["job_u_id"]).first()
+            if not job:
+                return Response({"message": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
+            query_embedding = encode_job(job)
+        else:
+            query_embedding = encode_batch([data["query"]])[0]
+
+        page, page_size = data["page"], data["page_size"]
+        hits, has_more = search_all_jobs(query_embedding, (page - 1) * page_size, page_size, data["top_k"])
+
+        scores = dict(hits)
+        applicants = Applicant.objects.filter(u_id__in=list(scores)).select_related("job_applied")
+        ranked = sorted(applicants, key=lambda a: -scores[str(a.u_id)])
+        return Response({
+            "page": page,
+            "page_size": page_size,
+            "has_more": has_more,
+            "results": ApplicantSearchResultSerializer(ranked, many=True, context={
+                "scores": scores, "passages": best_passages(list(scores), query_embedding),
+            }).data,
+        }, status=status.HTTP_200_OK)
+
+
+# ---------------------------
+# Ingestion Batch Status
+# ---------------------------
+class IngestionBatchStatusAPI(generics.RetrieveAPIView):
+    permission_classes = (AllowAny,)
+    serializer_class = IngestionBatchSerializer
+    lookup_field = "u_id"
+    queryset = IngestionBatch.objects.prefetch_related("items__applicant")
 
-        return {
-            "applicant_id": str(applicant.u_id),
-            "filename": original_name,
-            "relevance": applicant.relevance,
-            "parsed": applicant.parsed,
-        }
 
-    except Exception as e:
-        logger.exception(f"Error processing resume {getattr(file_obj, 'name', 'unknown')}: {str(e)}")
-        return {"filename": getattr(file_obj, "name", "unknown"), "error": str(e)}
+def queued_response(job, batch):
+    """202 payload returned by both upload endpoints once files are queued."""
+    return Response({
+        "message": "Resumes queued for processing",
+        "job_u_id": str(job.u_id),
+        "batch_id": str(batch.u_id),
+        "progress": batch.progress(),
+    }, status=status.HTTP_202_ACCEPTED)
 
 
 # ---------------------------
@@ -181,15 +258,9 @@ class ResumeUploadAPI(views.APIView):
         if not files:
             return Response({"message": "No files uploaded"}, status=status.HTTP_400_BAD_REQUEST)
 
-        fs = FileSystemStorage(location="media/resumes")
-        job_embedding = embedder.encode(job.job_description, convert_to_tensor=True)
-        responses = [process_resume(file, job, fs, job_embedding) for file in files]
-
-        return Response({
-            "message": "Resumes uploaded successfully",
-            "job_u_id": str(job.u_id),
-            "data": responses,
-        }, status=status.HTTP_201_CREATED)
+        batch = enqueue_upload(files, job)
+        ensure_workers()
+        return queued_response(job, batch)
 
 
 # ---------------------------
@@ -211,12 +282,6 @@ class ResumeUploadWithJobAPI(views.APIView):
 
         job = Job.objects.create(job_title=job_title, job_description=job_description)
 
-        fs = FileSystemStorage(location="media/resumes")
-        job_embedding = embedder.encode(job.job_description, convert_to_tensor=True)
-        responses = [process_resume(doc, job, fs, job_embedding) for doc in documents]
-
-        return Response({
-            "message": "Resumes uploaded successfully",
-            "job_u_id": str(job.u_id),
-            "data": responses,
-        }, status=status.HTTP_201_CREATED)
+        batch = enqueue_upload(documents, job)
+        ensure_workers()
+        return queued_response(job, batch)
@@ -26,6 +26,64 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
     raise RuntimeError("OPENAI_API_KEY not loaded! Please set it in .env")
 
+# OpenAI model and client-side rate limits (OPENAI_BASE_URL lets you point at a proxy or a local fake server)
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+# Ask for the ranking explanation inside the structured parse call (one round trip per resume)
+OPENAI_SINGLE_CALL = os.getenv("OPENAI_SINGLE_CALL", "True") == "True"
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))
+OPENAI_REQUESTS_PER_MINUTE = int(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "500"))
+OPENAI_TOKENS_PER_MINUTE = int(os.getenv("OPENAI_TOKENS_PER_MINUTE", "200000"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "5"))
+
+# Cache of OpenAI parse/explain results, keyed by resume text, job text, model and prompt
+LLM_CACHE = {
+    "BACKEND": os.getenv("LLM_CACHE_BACKEND", "db"),  # "db", "disk" or "none"
+    "TTL": int(os.getenv("LLM_CACHE_TTL", str(30 * 24 * 3600))),
+    "MAX_ENTRIES": int(os.getenv("LLM_CACHE_MAX_ENTRIES", "50000")),
+}
+
+# Sentence embeddings (resume / job relevance)
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+RESCORE_CHUNK_SIZE = int(os.getenv("RESCORE_CHUNK_SIZE", "1000"))
+# Long resumes are split into passages of EMBEDDING_CHUNK_WORDS words (the model truncates
+# at 256 word pieces), encoded together and pooled ("mean" or "max") into one vector.
+EMBEDDING_CHUNK_WORDS = int(os.getenv("EMBEDDING_CHUNK_WORDS", "180"))
+EMBEDDING_CHUNK_OVERLAP = int(os.getenv("EMBEDDING_CHUNK_OVERLAP", "40"))
+EMBEDDING_POOLING = os.getenv("EMBEDDING_POOLING", "mean")
+JOB_EMBEDDING_CACHE_SIZE = int(os.getenv("JOB_EMBEDDING_CACHE_SIZE", "256"))
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
+# Models are loaded lazily on first use; list names here ("embedder", "nlp", "keybert", "openai")
+# to load them up front in each gunicorn worker (see gunicorn.conf.py).
+MODEL_PRELOAD = [name for name in os.getenv("MODEL_PRELOAD", "").split(",") if name]
+
+# Persistent per-job ANN index of resume embeddings (stored under MEDIA_ROOT/vector_indexes)
+VECTOR_INDEX = {
+    "TYPE": os.getenv("VECTOR_INDEX_TYPE", "flat"),  # "flat", "hnsw" or "ivf"
+    "METRIC": os.getenv("VECTOR_INDEX_METRIC", "ip"),  # "ip" (cosine) or "l2"
+}
+
+# Resume ingestion queue (uploads return 202 and are drained by worker threads)
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", "2"))
+INGESTION_CLAIM_SIZE = int(os.getenv("INGESTION_CLAIM_SIZE", "16"))
+INGESTION_AUTOSTART = os.getenv("INGESTION_AUTOSTART", "True") == "True"
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(256 * 1024)))
+
+# PDF text extraction process pool (WORKERS=0 extracts inline in the ingestion thread)
+PDF_EXTRACTION = {
+    "WORKERS": int(os.getenv("PDF_EXTRACT_WORKERS", str(max(1, (os.cpu_count() or 2) - 1)))),
+    "TIMEOUT": float(os.getenv("PDF_EXTRACT_TIMEOUT", "30")),
+    "MAX_PAGES": int(os.getenv("PDF_MAX_PAGES", "3")),
+}
+
+# Duplicate resumes (same file, same text or near-identical vector) reuse an earlier parse
+RESUME_DEDUP = {
+    "ENABLED": os.getenv("RESUME_DEDUP", "True") == "True",
+    "NEAR_DUPLICATE_SIMILARITY": float(os.getenv("RESUME_DEDUP_SIMILARITY", "0.98")),
+    "NEAR_DUPLICATE_CANDIDATES": int(os.getenv("RESUME_DEDUP_CANDIDATES", "5")),
+}
+
 # Application definition
 INSTALLED_APPS = [
     'django.contrib.admin',
@@ -76,6 +134,7 @@ CORS_ALLOWED_ORIGINS = [
     "http://127.0.0.1:3000"
 ]
 CORS_ALLOW_ALL_ORIGINS = DEBUG  # Only allow all origins in DEBUG mode
+CORS_EXPOSE_HEADERS = ["ETag", "X-Pending-Scoring"]
 
 # Optional: CSRF trusted origins for frontend
 CSRF_TRUSTED_ORIGINS = [
@@ -83,13 +142,54 @@ CSRF_TRUSTED_ORIGINS = [
     "http://127.0.0.1:3000"
 ]
 
-# Database
-DATABASES = {
+# Database: DB_ENGINE=postgres for concurrent workers, SQLite (WAL mode) otherwise
+DB_ENGINE = os.getenv("DB_ENGINE", "sqlite")
+if DB_ENGINE == "postgres":
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv("DB_NAME", "gpt_resume"),
+            'USER': os.getenv("DB_USER", "postgres"),
+            'PASSWORD': os.getenv("DB_PASSWORD", ""),
+            'HOST': os.getenv("DB_HOST", "localhost"),
+            'PORT': os.getenv("DB_PORT", "5432"),
+            'CONN_MAX_AGE': int(os.getenv("DB_CONN_MAX_AGE", "60")),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
+    }
+    # psycopg 3 connection pool (pip install "psycopg[binary,pool]"); replaces persistent connections
+    if os.getenv("DB_POOL", "False") == "True":
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+            'max_size': int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+            'timeout': int(os.getenv("DB_POOL_TIMEOUT", "10")),
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv("DB_NAME", str(BASE_DIR / 'db.sqlite3')),
+            'OPTIONS': {
+                # Readers don't block the writer; writers wait instead of failing with "database is locked"
+                'timeout': int(os.getenv("DB_BUSY_TIMEOUT", "20")),
+                'transaction_mode': 'IMMEDIATE',
+                'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+            },
+        }
+    }
+
+# Cache (applicant list/summary responses). The file backend is shared by every
+# process on the host (gunicorn workers, ingestion workers); use locmem only for
+# a single-process dev server.
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': os.getenv("CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache"),
+        'LOCATION': os.getenv("CACHE_LOCATION", str(BASE_DIR / 'cache')),
     }
 }
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", "3600"))
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -115,3 +215,25 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 # Default primary key
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Logging: one structured line per record (LOG_FORMAT=json for log shippers, "text" for key=value)
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "structured": {
+            "()": "api.utils.log_format.StructuredFormatter",
+            "json_output": os.getenv("LOG_FORMAT", "text") == "json",
+        },
+    },
+    "handlers": {
+        "console": {"class": "logging.StreamHandler", "formatter": "structured"},
+    },
+    "root": {"handlers": ["console"], "level": os.getenv("LOG_LEVEL", "INFO")},
+    "loggers": {
+        "django": {"handlers": ["console"], "level": os.getenv("DJANGO_LOG_LEVEL", "WARNING"), "propagate": False},
+        # Per-request / import chatter from libraries
+        "httpx": {"level": "WARNING"},
+        "faiss": {"level": "WARNING"},
+    },
+}
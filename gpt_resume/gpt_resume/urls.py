@@ -10,6 +10,8 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.http import HttpResponse
 
+from api.utils.metrics import CONTENT_TYPE_LATEST, render as render_metrics
+
 app_name = "gpt_resume"  # Namespace for URL reversing
 
 def health_check(request):
@@ -17,6 +19,11 @@ def health_check(request):
     return HttpResponse("OK", content_type="text/plain")
 
 
+def metrics(request):
+    """Pipeline metrics in the Prometheus text format (all processes with PROMETHEUS_MULTIPROC_DIR)."""
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE_LATEST)
+
+
 urlpatterns = [
     # Admin site
     path("admin/", admin.site.urls),
@@ -27,6 +34,7 @@ urlpatterns = [
     # Health check endpoints
     path("", health_check, name="health"),             # root URL returns "OK"
     path("health/", health_check, name="health-check"),  # /health/ endpoint
+    path("metrics", metrics, name="metrics"),            # Prometheus scrape endpoint
 ]
 
 # Serve media files in development only
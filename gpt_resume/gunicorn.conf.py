@@ -0,0 +1,53 @@
+# gunicorn -c gunicorn.conf.py gpt_resume.wsgi
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def on_starting(server):
+    # Multiprocess metrics: drop the files of processes from an earlier run, so
+    # counters restart with the server; running ingestion workers keep theirs.
+    directory = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    for name in os.listdir(directory):
+        pid = name.rsplit("_", 1)[-1].split(".")[0]
+        if pid.isdigit() and not _process_alive(int(pid)):
+            os.remove(os.path.join(directory, name))
+
+
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def post_fork(server, worker):
+    # Load settings.MODEL_PRELOAD in each worker so the first request doesn't pay for it
+    import django
+
+    # wsgi.py sets this too, but only once the app is imported, after post_fork
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "gpt_resume.settings")
+    django.setup()
+    from django.conf import settings
+    from api.utils.model_registry import preload_models
+    from api.utils.pdf_extraction import get_extraction_pool
+
+    preload_models()
+    # Ingestion threads run in this worker: start the PDF extraction processes now
+    if getattr(settings, "INGESTION_AUTOSTART", True):
+        get_extraction_pool().warm_up()